@@ -0,0 +1,183 @@
+"""
+HTML parser backend benchmark
+Checks every backend against the golden results of a corpus of saved pages and
+reports pages/sec of parse_category_listing and parse_book_detail per backend
+
+Corpus layout (pages saved from the sites, e.g. with "Save page as" or debug_html.py):
+    <corpus>/books/listing/*.html
+    <corpus>/books/detail/<product_id>.html
+    <corpus>/eslite/listing/*.html
+    <corpus>/eslite/detail/<product_id>.html
+The golden result of each page is kept next to it as <page>.json;
+--update-golden writes them from the reference bs4 backend. A small corpus is
+committed in parser_corpus and checked by tests/test_parser_corpus.py
+
+Usage:
+    python benchmark_parsers.py [--corpus parser_corpus] [--backends bs4 lxml selectolax] [--repeat 5] [--update-golden]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from typing import Dict, List, Tuple
+
+CRAWLER_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(CRAWLER_DIR, "crawler_common"))
+# Each crawler directory has its own config module, so the parsers are imported
+# through their directory instead of putting both directories on the path
+sys.path.insert(0, CRAWLER_DIR)
+from html_backend import BACKENDS, parse_html
+from crawler_books.books_com_tw_parser import BooksComTwParser
+from crawler_eslite.eslite_parser import EsliteParser
+
+# Parser class and the detail page argument built from a page's file name
+SITES = {
+    "books": (BooksComTwParser, lambda page_id: page_id),
+    "eslite": (EsliteParser, lambda page_id: f"https://www.eslite.com/product/{page_id}"),
+}
+KINDS = ("listing", "detail")
+
+
+def load_pages(corpus: str, site: str, kind: str) -> List[Tuple[str, str]]:
+    """
+    Read the saved pages of one site and page kind
+    Returns (path, html) pairs sorted by file name
+    """
+    directory = os.path.join(corpus, site, kind)
+    if not os.path.isdir(directory):
+        return []
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".html", ".htm")):
+            path = os.path.join(directory, name)
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                pages.append((path, f.read()))
+    return pages
+
+
+def parse_page(parser, site: str, kind: str, path: str, html: str):
+    """
+    Run the parser method for one page, with the parsers' diagnostics silenced
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        if kind == "listing":
+            return parser.parse_category_listing(html)
+        page_id = os.path.splitext(os.path.basename(path))[0]
+        return parser.parse_book_detail(html, SITES[site][1](page_id))
+
+
+def normalize(result):
+    """
+    Round-trip a result through JSON so it compares equal to a stored golden file
+    """
+    return json.loads(json.dumps(result, ensure_ascii=False, sort_keys=True))
+
+
+def golden_path(path: str) -> str:
+    return f"{os.path.splitext(path)[0]}.json"
+
+
+def update_golden(corpus: str) -> int:
+    """
+    Write the reference (bs4) result of every page as its golden file
+    Returns number of files written
+    """
+    written = 0
+    for site, (parser_class, _) in SITES.items():
+        parser = parser_class("bs4")
+        for kind in KINDS:
+            for path, html in load_pages(corpus, site, kind):
+                with open(golden_path(path), "w", encoding="utf-8") as f:
+                    json.dump(normalize(parse_page(parser, site, kind, path, html)), f, ensure_ascii=False, indent=2, sort_keys=True)
+                written += 1
+    return written
+
+
+def available_backends(backends: List[str]) -> List[str]:
+    """
+    Drop backends whose packages are not installed
+    """
+    available = []
+    for backend in backends:
+        try:
+            parse_html("<html><body></body></html>", backend)
+            available.append(backend)
+        except ImportError as e:
+            print(f"Skipping {backend}: {e}")
+    return available
+
+
+def benchmark(corpus: str, backends: List[str], repeat: int) -> int:
+    """
+    Check and time every backend on every site and page kind
+    Returns number of pages whose result differs from the golden result
+    """
+    total_mismatches = 0
+    print(f"{'site':<8} {'kind':<8} {'backend':<11} {'pages':>6} {'pages/s':>10} {'speedup':>8} {'mismatches':>11}")
+    for site, (parser_class, _) in SITES.items():
+        for kind in KINDS:
+            pages = load_pages(corpus, site, kind)
+            if not pages:
+                continue
+
+            # Golden results: stored files where present, the reference backend otherwise
+            reference = parser_class("bs4")
+            expected: Dict[str, object] = {}
+            for path, html in pages:
+                if os.path.exists(golden_path(path)):
+                    with open(golden_path(path), "r", encoding="utf-8") as f:
+                        expected[path] = json.load(f)
+                else:
+                    expected[path] = normalize(parse_page(reference, site, kind, path, html))
+
+            baseline = None
+            for backend in backends:
+                parser = parser_class(backend)
+                mismatches = [
+                    path for path, html in pages
+                    if normalize(parse_page(parser, site, kind, path, html)) != expected[path]
+                ]
+
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    for path, html in pages:
+                        parse_page(parser, site, kind, path, html)
+                rate = len(pages) * repeat / (time.perf_counter() - start)
+                baseline = baseline or rate
+
+                print(f"{site:<8} {kind:<8} {backend:<11} {len(pages):>6} {rate:>10.1f} {rate / baseline:>7.1f}x {len(mismatches):>11}")
+                for path in mismatches:
+                    print(f"    differs from golden result: {path}")
+                total_mismatches += len(mismatches)
+    return total_mismatches
+
+
+def main():
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Check and benchmark HTML parser backends on saved pages")
+    parser.add_argument("--corpus", default=os.path.join(CRAWLER_DIR, "parser_corpus"), help="Directory of saved pages")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS, help="Backends to run (bs4 first as the speedup baseline)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes over the corpus")
+    parser.add_argument("--update-golden", action="store_true", help="Rewrite golden results from the bs4 backend and exit")
+    args = parser.parse_args()
+
+    if args.update_golden:
+        print(f"Wrote {update_golden(args.corpus)} golden results")
+        return 0
+
+    backends = available_backends(args.backends)
+    mismatches = benchmark(args.corpus, backends, args.repeat)
+    if mismatches:
+        print(f"\n{mismatches} page result(s) differ from the golden results")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,38 +3,65 @@ Books.com.tw website client module
 Handles HTTP requests and basic interaction with the Books.com.tw website
 """
 
+import os
+import sys
 import time
-import random
+import threading
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from typing import Dict, List, Optional
 import config
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crawler_common"))
+from rate_controller import AdaptiveRateController, BACKOFF_STATUSES
+from response_cache import ResponseCache
+
 
 class BooksComTwClient:
     """
     Client for interacting with Books.com.tw website
     Handles HTTP requests with proper headers, delays, and error handling
+    
+    Safe to share between detail worker threads: each thread gets its own
+    session, while the rate controller and cache are shared
     """
     
-    def __init__(self):
+    def __init__(self, rate_controller: Optional[AdaptiveRateController] = None):
         self.base_url = config.BOOKS_COM_TW_BASE_URL
-        self.session = self._create_session()
-        self.request_delay = config.REQUEST_DELAY
-        self.random_delay_range = config.RANDOM_DELAY_RANGE
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+        # Adaptive per-host pacing replaces the fixed random delay before every request
+        self.rate_controller = rate_controller or AdaptiveRateController.from_config(config)
+        self.cache = ResponseCache.from_config(config)
+        self.cache_max_age: Optional[float] = None  # Overrides CACHE_TTL; 0 revalidates every cached page
         
+    @property
+    def session(self) -> requests.Session:
+        """
+        Session of the calling thread, created on first use
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._create_session()
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+    
     def _create_session(self) -> requests.Session:
         """
         Create a requests session with retry strategy and proper headers
         """
         session = requests.Session()
         
-        # Configure retry strategy
+        # Configure retry strategy for connection errors only;
+        # 429/5xx are retried in fetch_page so the rate controller sees them
         retry_strategy = Retry(
             total=config.MAX_RETRIES,
             backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=[],
             allowed_methods=["GET", "POST"]
         )
         
@@ -54,13 +81,6 @@ class BooksComTwClient:
         
         return session
     
-    def _random_delay(self):
-        """
-        Add random delay between requests to avoid pattern detection
-        """
-        delay = random.uniform(*self.random_delay_range)
-        time.sleep(delay)
-    
     def fetch_page(self, url: str, params: Optional[Dict] = None) -> Optional[str]:
         """
         Fetch a web page with error handling and retry logic
@@ -71,28 +91,72 @@ class BooksComTwClient:
             
         Returns:
             HTML content as string, or None if failed
+        
+        Fresh cached pages are returned without a request or delay;
+        stale ones are revalidated with ETag / If-Modified-Since
+        Requests are paced per host by the adaptive rate controller
         """
-        try:
-            self._random_delay()
-            
-            response = self.session.get(
-                url,
-                params=params,
-                timeout=config.TIMEOUT
-            )
-            
-            response.raise_for_status()
-            
-            # Check if response is HTML
-            content_type = response.headers.get("Content-Type", "")
-            if "text/html" not in content_type:
-                print(f"Warning: Unexpected content type: {content_type}")
-            
-            return response.text
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching {url}: {e}")
-            return None
+        cache_key = None
+        cached = None
+        if self.cache:
+            cache_key = self.cache.make_key("GET", url, params)
+            cached = self.cache.get(cache_key, self.cache_max_age)
+            if cached and cached["fresh"]:
+                return cached["body"].decode("utf-8")
+        
+        for attempt in range(config.MAX_RETRIES):
+            response = None
+            start = time.monotonic()
+            try:
+                self.rate_controller.acquire(url)
+                start = time.monotonic()
+                
+                response = self.session.get(
+                    url,
+                    params=params,
+                    headers=ResponseCache.validation_headers(cached),
+                    timeout=config.TIMEOUT
+                )
+                
+                self.rate_controller.record_response(
+                    url,
+                    response.status_code,
+                    time.monotonic() - start,
+                    response.headers.get("Retry-After")
+                )
+                
+                if response.status_code == 304 and cached:
+                    self.cache.mark_revalidated(cache_key)
+                    return cached["body"].decode("utf-8")
+                
+                # The controller has already slowed this host down, so just try again
+                if response.status_code in BACKOFF_STATUSES and attempt < config.MAX_RETRIES - 1:
+                    continue
+                
+                response.raise_for_status()
+                
+                # Check if response is HTML
+                content_type = response.headers.get("Content-Type", "")
+                if "text/html" not in content_type:
+                    print(f"Warning: Unexpected content type: {content_type}")
+                
+                if self.cache:
+                    self.cache.put(
+                        cache_key,
+                        response.text.encode("utf-8"),
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified")
+                    )
+                
+                return response.text
+                
+            except requests.exceptions.RequestException as e:
+                if response is None:
+                    self.rate_controller.record_response(url, None, time.monotonic() - start)
+                print(f"Error fetching {url}: {e}")
+                return None
+        
+        return None
     
     def get_category_page(self, category_url: str, page: int = 1) -> Optional[str]:
         """
@@ -151,8 +215,12 @@ class BooksComTwClient:
     
     def close(self):
         """
-        Close the session
+        Close the sessions of every thread
         """
-        if self.session:
-            self.session.close()
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+        if self.cache:
+            self.cache.close()
 
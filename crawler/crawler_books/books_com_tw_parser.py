@@ -3,19 +3,83 @@ Books.com.tw HTML parser module
 Extracts structured book data from HTML pages
 """
 
-from bs4 import BeautifulSoup
+import os
+import sys
 from typing import Dict, List, Optional
 import re
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crawler_common"))
+from html_backend import HtmlNode, PageText, parse_html
+from selector_plan import SelectorPlan
+
+
+# Candidate selectors for each detail page field, in order of preference
+DETAIL_SELECTORS = {
+    # Books.com.tw typically has title in h1 or specific div
+    "name": (
+        "h1[itemprop='name']",
+        "h1.title",
+        "div[class*='title'] h1",
+        "h1",
+    ),
+    # Author is often in a specific div or span with itemprop="author"
+    "author": (
+        "span[itemprop='author']",
+        "div[class*='author']",
+        "a[href*='author']",
+        "span.author",
+    ),
+    # Publisher is often in a div or span
+    "publisher": (
+        "span[itemprop='publisher']",
+        "div[class*='publisher']",
+        "a[href*='publisher']",
+        "span.publisher",
+    ),
+    # Price is usually in a specific div with class containing "price"
+    "price": (
+        "span[itemprop='price']",
+        "li[class*='price']",
+        "div[class*='price']",
+        "span.price",
+        "strong.price",
+    ),
+    # ISBN is often in metadata or specific div
+    "isbn": (
+        "span[itemprop='isbn']",
+        "div[class*='isbn']",
+        "span.isbn",
+    ),
+}
+
+# ISBN-13 (13 digits) or ISBN-10 (10 digits)
+# Common patterns: ISBN: 9781234567890, ISBN 978-123-456-789-0, etc.
+ISBN_PATTERNS = [
+    re.compile(r"ISBN[：:\s]*(\d{13})"),  # ISBN-13
+    re.compile(r"ISBN[：:\s]*(\d{10})"),  # ISBN-10
+    re.compile(r"(\d{13})"),  # Just 13 digits
+    re.compile(r"(\d{10})"),  # Just 10 digits
+]
+
+# Labels on listing cards, e.g. "作者：某某，出版社：某出版社，出版日期：2024-01-01 優惠價：79折237元"
+CARD_LABEL_PATTERN = re.compile(r"(作者|譯者|繪者|出版社|出版日期|定價|優惠價|特價|ISBN)\s*[：:]")
+
 
 class BooksComTwParser:
     """
     Parser for extracting book information from Books.com.tw HTML pages
     Handles both listing pages and detail pages
+    
+    backend selects the HTML tree builder ("bs4", "lxml" or "selectolax",
+    see crawler_common/html_backend.py); extraction results are the same.
+    Detail pages are parsed with a selector plan that learns which candidate
+    selector finds each field on this site and tries it first, going back to
+    the declared order every revalidate_every pages
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, backend: str = "bs4", revalidate_every: int = 50):
+        self.backend = backend
+        self.detail_plan = SelectorPlan(DETAIL_SELECTORS, revalidate_every)
     
     def parse_category_listing(self, html: str) -> List[Dict]:
         """
@@ -33,7 +97,7 @@ class BooksComTwParser:
             return books
         
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            document = parse_html(html, self.backend)
             
             # Books.com.tw uses various structures for listing pages
             # Try multiple selectors to find book items
@@ -48,7 +112,7 @@ class BooksComTwParser:
             
             book_elements = []
             for selector in book_selectors:
-                elements = soup.select(selector)
+                elements = document.select(selector)
                 if elements:
                     book_elements = elements
                     break
@@ -56,14 +120,14 @@ class BooksComTwParser:
             # If no elements found, try to find links to product pages
             if not book_elements:
                 # Look for links containing "/products/"
-                product_links = soup.find_all("a", href=re.compile(r"/products/\d+"))
+                product_links = document.links(r"/products/\d+")
                 for link in product_links:
-                    product_id = self._extract_product_id_from_url(link.get("href", ""))
+                    product_id = self._extract_product_id_from_url(link.attr("href"))
                     if product_id:
                         books.append({
                             "product_id": product_id,
-                            "url": link.get("href", ""),
-                            "title": self._clean_text(link.get_text())
+                            "url": link.attr("href"),
+                            "title": self._clean_text(link.text())
                         })
                 return books
             
@@ -93,7 +157,7 @@ class BooksComTwParser:
             return None
         
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            document = parse_html(html, self.backend)
             
             book_data = {
                 "product_id": product_id,
@@ -105,102 +169,30 @@ class BooksComTwParser:
                 "url": f"https://www.books.com.tw/products/{product_id}"
             }
             
-            # Extract book title
-            # Books.com.tw typically has title in h1 or specific div
-            title_selectors = [
-                "h1[itemprop='name']",
-                "h1.title",
-                "div[class*='title'] h1",
-                "h1",
-            ]
-            
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    book_data["name"] = self._clean_text(title_elem.get_text())
-                    break
-            
-            # Extract author
-            # Author is often in a specific div or span with itemprop="author"
-            author_selectors = [
-                "span[itemprop='author']",
-                "div[class*='author']",
-                "a[href*='author']",
-                "span.author",
-            ]
-            
-            for selector in author_selectors:
-                author_elem = soup.select_one(selector)
-                if author_elem:
-                    author_text = self._clean_text(author_elem.get_text())
-                    # Remove common prefixes like "作者：", "作者:", etc.
-                    author_text = re.sub(r"^作者[：:]\s*", "", author_text)
-                    if author_text:
-                        book_data["author"] = author_text
-                        break
-            
-            # Extract publisher
-            # Publisher is often in a div or span
-            publisher_selectors = [
-                "span[itemprop='publisher']",
-                "div[class*='publisher']",
-                "a[href*='publisher']",
-                "span.publisher",
-            ]
-            
-            for selector in publisher_selectors:
-                publisher_elem = soup.select_one(selector)
-                if publisher_elem:
-                    publisher_text = self._clean_text(publisher_elem.get_text())
-                    # Remove common prefixes
-                    publisher_text = re.sub(r"^出版社[：:]\s*", "", publisher_text)
-                    publisher_text = re.sub(r"^出版[：:]\s*", "", publisher_text)
-                    if publisher_text:
-                        book_data["publisher"] = publisher_text
-                        break
-            
-            # Extract price
-            # Price is usually in a specific div with class containing "price"
-            price_selectors = [
-                "span[itemprop='price']",
-                "li[class*='price']",
-                "div[class*='price']",
-                "span.price",
-                "strong.price",
-            ]
+            # Look up each field's first-choice selector in one pass over the page,
+            # then try its remaining candidates only if that found nothing
+            validating = self.detail_plan.begin_page()
+            orders = {field: self.detail_plan.order(field, validating) for field in DETAIL_SELECTORS}
+            first_matches = document.select_first([order[0] for order in orders.values()])
             
-            for selector in price_selectors:
-                price_elem = soup.select_one(selector)
-                if price_elem:
-                    price_text = self._clean_text(price_elem.get_text())
-                    price_value = self._parse_price(price_text)
-                    if price_value is not None:
-                        book_data["price"] = price_value
-                        break
+            for (field, order), element in zip(orders.items(), first_matches):
+                matched = order[0] if element is not None else None
+                value = self._field_value(field, element) if element is not None else None
+                if value is None:
+                    matched = None
+                    for selector in order[1:]:
+                        element = document.select_one(selector)
+                        if element is not None:
+                            value = self._field_value(field, element)
+                            if value is not None:
+                                matched = selector
+                                break
+                self.detail_plan.record(field, matched, validating)
+                book_data[field] = value
             
-            # Extract ISBN
-            # ISBN is often in metadata or specific div
-            isbn_selectors = [
-                "span[itemprop='isbn']",
-                "div[class*='isbn']",
-                "span.isbn",
-            ]
-            
-            for selector in isbn_selectors:
-                isbn_elem = soup.select_one(selector)
-                if isbn_elem:
-                    isbn_text = self._clean_text(isbn_elem.get_text())
-                    isbn_value = self._extract_isbn(isbn_text)
-                    if isbn_value:
-                        book_data["isbn"] = isbn_value
-                        break
-            
-            # If ISBN not found in dedicated element, search in all text
+            # If ISBN not found in dedicated element, search the page text (flattened once)
             if not book_data["isbn"]:
-                page_text = soup.get_text()
-                isbn_value = self._extract_isbn(page_text)
-                if isbn_value:
-                    book_data["isbn"] = isbn_value
+                book_data["isbn"] = self._extract_isbn_from_page(PageText(document))
             
             # Validate that we have at least name (required field)
             if not book_data["name"]:
@@ -212,36 +204,161 @@ class BooksComTwParser:
             print(f"Error parsing book detail for {product_id}: {e}")
             return None
     
-    def _extract_book_from_listing_element(self, element) -> Optional[Dict]:
+    def _field_value(self, field: str, element: HtmlNode):
+        """
+        Value of a detail page field from the element a selector matched
+        
+        Args:
+            field: Field name (a key of DETAIL_SELECTORS)
+            element: Matched element
+            
+        Returns:
+            Field value, or None to try the field's next selector
+        """
+        text = self._clean_text(element.text())
+        
+        if field == "name":
+            # The first title element counts even when empty
+            return text
+        
+        if field == "author":
+            # Remove common prefixes like "作者：", "作者:", etc.
+            text = re.sub(r"^作者[：:]\s*", "", text)
+            return text or None
+        
+        if field == "publisher":
+            # Remove common prefixes
+            text = re.sub(r"^出版社[：:]\s*", "", text)
+            text = re.sub(r"^出版[：:]\s*", "", text)
+            return text or None
+        
+        if field == "price":
+            return self._parse_price(text)
+        
+        return self._extract_isbn(text)
+    
+    def _extract_isbn_from_page(self, page_text: PageText) -> Optional[str]:
+        """
+        Extract ISBN from the text of a whole page
+        
+        Args:
+            page_text: Flattened page text with its label index
+            
+        Returns:
+            ISBN string, or None if not found
+        """
+        # A page's first "ISBN" is usually its "ISBN：<13 digits>" label; that is
+        # exactly what the first pattern would find, without scanning the page
+        labelled = page_text.label("ISBN")
+        if labelled and labelled[0] == page_text.text.find("ISBN"):
+            match = re.match(r"\d{13}", labelled[1])
+            if match:
+                return match.group(0)
+        
+        return self._extract_isbn(page_text.text)
+    
+    def _extract_book_from_listing_element(self, element: HtmlNode) -> Optional[Dict]:
         """
         Extract book information from a listing page element
         
         Args:
-            element: BeautifulSoup element containing book info
+            element: Parsed element containing book info
             
         Returns:
-            Dictionary with product_id and url, or None if extraction failed
+            Dictionary with product_id, url and title plus the book fields shown
+            on the card (name, author, publisher, price, isbn; None if missing),
+            or None if extraction failed
         """
         try:
             # Find link to product page
-            link = element.find("a", href=re.compile(r"/products/\d+"))
-            if not link:
+            links = element.links(r"/products/\d+")
+            if not links:
                 return None
             
-            href = link.get("href", "")
+            link = links[0]
+            href = link.attr("href")
             product_id = self._extract_product_id_from_url(href)
             
             if product_id:
-                return {
+                title = self._clean_text(link.text())
+                book_info = {
                     "product_id": product_id,
                     "url": href if href.startswith("http") else f"https://www.books.com.tw{href}",
-                    "title": self._clean_text(link.get_text())
+                    "title": title
                 }
+                book_info.update(self._extract_card_fields(element, links, title))
+                return book_info
         except Exception as e:
             print(f"Error extracting book from listing element: {e}")
         
         return None
     
+    def _extract_card_fields(self, element: HtmlNode, links: List[HtmlNode], title: str) -> Dict:
+        """
+        Extract the book fields a listing card shows, so the book can be stored
+        without requesting its detail page
+        
+        Args:
+            element: Listing card element
+            links: The card's product page links
+            title: Text of the first product link
+            
+        Returns:
+            Dictionary with name, author, publisher, price and isbn (None if missing)
+        """
+        # The first product link is often the cover image; use the first one with text
+        name = next((text for text in (self._clean_text(link.text()) for link in links) if text), "")
+        if not name:
+            cover = links[0].select_one("img[alt]")
+            name = self._clean_text(cover.attr("alt")) if cover is not None else title
+        
+        labels = self._split_card_labels(element.text())
+        # Prefer the list price, as on detail pages; otherwise the selling price
+        price_text = labels.get("定價") or labels.get("優惠價") or labels.get("特價")
+        
+        return {
+            "name": name or None,
+            "author": labels.get("作者") or None,
+            "publisher": labels.get("出版社") or None,
+            "price": self._parse_card_price(price_text) if price_text else None,
+            "isbn": self._extract_isbn(f"ISBN {labels['ISBN']}") if labels.get("ISBN") else None
+        }
+    
+    def _split_card_labels(self, text: str) -> Dict[str, str]:
+        """
+        Split listing card text into the values following each known label
+        
+        Args:
+            text: Text of a listing card
+            
+        Returns:
+            Dictionary of label to cleaned value (first occurrence of each label)
+        """
+        matches = list(CARD_LABEL_PATTERN.finditer(text))
+        values = {}
+        for match, following in zip(matches, matches[1:] + [None]):
+            value = text[match.end():following.start() if following else len(text)]
+            # A value ends at the next label, line break or separator (not a thousands comma)
+            value = re.split(r"[\n，|]|,(?!\d)", value.strip())[0]
+            values.setdefault(match.group(1), self._clean_text(value))
+        return values
+    
+    def _parse_card_price(self, price_text: str) -> Optional[float]:
+        """
+        Parse a listing card price such as "79折237元" or "NT$ 300"
+        
+        Args:
+            price_text: Price value from a listing card
+            
+        Returns:
+            Price as float, or None if parsing failed
+        """
+        # The amount is the number before 元; a leading discount ("79折") is not a price
+        match = re.search(r"(\d+(?:\.\d+)?)\s*元", price_text.replace(",", ""))
+        if match:
+            return float(match.group(1))
+        return self._parse_price(price_text)
+    
     def _extract_product_id_from_url(self, url: str) -> Optional[str]:
         """
         Extract product ID from Books.com.tw URL
@@ -299,17 +416,8 @@ class BooksComTwParser:
         if not text:
             return None
         
-        # Look for ISBN-13 (13 digits) or ISBN-10 (10 digits)
-        # Common patterns: ISBN: 9781234567890, ISBN 978-123-456-789-0, etc.
-        patterns = [
-            r"ISBN[：:\s]*(\d{13})",  # ISBN-13
-            r"ISBN[：:\s]*(\d{10})",  # ISBN-10
-            r"(\d{13})",  # Just 13 digits
-            r"(\d{10})",  # Just 10 digits
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        for pattern in ISBN_PATTERNS:
+            match = pattern.search(text)
             if match:
                 isbn = match.group(1)
                 # Validate ISBN length
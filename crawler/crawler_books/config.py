@@ -3,6 +3,8 @@ Configuration file for Books.com.tw scraper
 Contains website URLs, database settings, and scraping parameters
 """
 
+import os
+
 # Books.com.tw website URLs
 BOOKS_COM_TW_BASE_URL = "https://www.books.com.tw"
 # Search URL - format: https://search.books.com.tw/search/query/key/{keyword}
@@ -15,6 +17,60 @@ MAX_RETRIES = 3  # Maximum number of retry attempts
 RETRY_DELAY = 5  # Delay before retry in seconds
 TIMEOUT = 30  # Request timeout in seconds
 
+# Adaptive rate control (AIMD per host, see crawler_common/rate_controller.py)
+INITIAL_REQUESTS_PER_SECOND = 2 / sum(RANDOM_DELAY_RANGE)  # Start at the mean of the random delay range
+MIN_REQUESTS_PER_SECOND = 1 / (RETRY_DELAY * 2)  # Never back off below this rate
+MAX_REQUESTS_PER_SECOND = 1 / RANDOM_DELAY_RANGE[0]  # Never ramp up beyond the shortest random delay
+RATE_INCREASE_STEP = 0.02  # Added to the rate after each healthy response
+RATE_DECREASE_FACTOR = 0.5  # Rate multiplier on 429/5xx, failures or rising latency
+LATENCY_BACKOFF_FACTOR = 3.0  # Back off when latency exceeds this multiple of the baseline
+
+# Separate (initial, min, max) requests/sec budget per host: listing and detail pages on www
+# and search pages on search.books.com.tw are paced independently, so one never stalls the other
+HOST_RATE_LIMITS = {
+    "www.books.com.tw": (INITIAL_REQUESTS_PER_SECOND, MIN_REQUESTS_PER_SECOND, MAX_REQUESTS_PER_SECOND),
+    "search.books.com.tw": (INITIAL_REQUESTS_PER_SECOND, MIN_REQUESTS_PER_SECOND, MAX_REQUESTS_PER_SECOND),
+}
+
+# Concurrent crawling (categories and detail pages)
+DETAIL_WORKERS = 4  # Threads fetching product pages at once, within their host's rate budget; 1 fetches one at a time
+CATEGORY_WORKERS = 3  # Categories browsed at once, each with its own page cursor; their links feed the detail workers as they arrive
+
+# Response cache settings (shared on-disk cache, see crawler_common/response_cache.py)
+CACHE_ENABLED = True  # Serve repeated requests from the local cache
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache")
+CACHE_MAX_SIZE_MB = 500  # Least recently used entries are evicted above this size
+CACHE_TTL = 7 * 24 * 3600  # Seconds before an entry is revalidated with the server
+
+# Dedupe store settings (see crawler_common/dedupe_store.py)
+# "memory" keeps known books in a Python set reloaded from the database on every run;
+# "disk" uses a memory-mapped Bloom filter plus an exact SQLite table that persists
+# across runs and only loads books stored since the last run
+DEDUPE_BACKEND = "memory"
+DEDUPE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dedupe.db")
+DEDUPE_EXPECTED_ITEMS = 10000000  # Known product IDs the Bloom filter is sized for
+DEDUPE_FALSE_POSITIVE_RATE = 0.001  # Bloom false positives cost one extra SQLite lookup
+DEDUPE_SYNC_OVERLAP = 300  # Seconds of stored books re-read on each sync; must exceed the longest insert transaction
+
+# Crawl journal (completed listing pages and fetched products, used by --resume)
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crawl_journal.jsonl")
+
+# HTML parser backend (see crawler_common/html_backend.py)
+# "bs4" is BeautifulSoup with html.parser; "lxml" (needs lxml and cssselect) and
+# "selectolax" (lexbor engine) parse several times faster with the same results,
+# checked on saved pages with benchmark_parsers.py
+HTML_PARSER_BACKEND = "bs4"
+SELECTOR_REVALIDATE_EVERY = 50  # Detail pages between full-order selector checks of the learned plan; 1 always uses the full order
+
+# Listing harvest mode (main.py --listing-only)
+# Listing cards already show title, author, publisher and price; books whose card
+# has every required field are stored without requesting their detail page
+LISTING_HARVEST = False
+LISTING_REQUIRED_FIELDS = ("name", "author", "publisher", "price", "isbn")  # Card fields a book needs to skip its detail page; keep "isbn" so stored rows stay dedupable by ISBN
+
+# Refresh mode (main.py --refresh)
+REFRESH_AFTER_DAYS = 30  # Books not updated for this many days are fetched again
+
 # User agent for web requests
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
@@ -26,10 +82,14 @@ DB_CONFIG = {
     "user": "amy",
     "password": "postgres"
 }
+DB_POOL_SIZE = 4  # Maximum pooled database connections; each worker borrows its own per operation
 
 # Scraping settings
 TARGET_BOOK_COUNT = 1000  # Target number of books to scrape
 BATCH_SIZE = 20  # Number of books to process in each batch (smaller for web scraping)
+COPY_THRESHOLD = 5000  # Batches of at least this many rows are loaded with COPY through a staging table
+FLUSH_INTERVAL = 5  # Seconds before the writer thread stores a partial batch
+WRITE_QUEUE_SIZE = 500  # Processed books waiting for the writer thread; a full queue pauses fetching
 PAGE_SIZE = 20  # Number of books per page on Books.com.tw
 
 # Category codes for systematic browsing (optional, if you have correct URLs)
@@ -3,15 +3,30 @@ Main entry point for the Books.com.tw book scraper
 """
 
 from scraper import BooksComTwScraper
+import config
 import sys
+import argparse
 
 
 def main():
     """
     Main function to run the book scraper
     """
+    parser = argparse.ArgumentParser(description="Scrape books from Books.com.tw")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from the crawl journal")
+    parser.add_argument("--listing-only", action="store_true",
+                        help="Store books from listing cards and fetch detail pages only for incomplete cards")
+    parser.add_argument("--refresh", action="store_true", help="Re-fetch stored books and update the ones that changed")
+    parser.add_argument("--refresh-days", type=int, default=config.REFRESH_AFTER_DAYS,
+                        help="Refresh books not updated for this many days (default: %(default)s)")
+    args = parser.parse_args()
+    
     try:
-        scraper = BooksComTwScraper()
+        if args.refresh:
+            # Refreshing keeps the crawl journal of the last crawl intact
+            BooksComTwScraper(resume=True).run_refresh(args.refresh_days)
+            return
+        scraper = BooksComTwScraper(resume=args.resume, listing_harvest=args.listing_only or config.LISTING_HARVEST)
         scraper.run()
     except KeyboardInterrupt:
         print("\n\nScraping interrupted by user")
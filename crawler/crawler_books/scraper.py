@@ -4,27 +4,56 @@ Orchestrates the scraping process using all other modules
 """
 
 import time
-from typing import Dict, List, Set
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from books_com_tw_client import BooksComTwClient
+from book_database import BookDatabase
+from book_writer import BookWriter
+from category_crawler import CategoryCrawler
+from crawl_journal import CrawlJournal
+from dedupe_store import DedupeStore, create_dedupe_store
 from books_com_tw_parser import BooksComTwParser
 from data_processor import BooksComTwDataProcessor
-from database_handler import DatabaseHandler
 import config
 
 
+# Detail pages that failed to download are retried by a resumed run; other failures are journaled
+FETCH_FAILED = "Failed to fetch detail page"
+
+
 class BooksComTwScraper:
     """
     Main scraper class that coordinates the entire scraping process
     Handles category browsing, data retrieval, processing, and storage
+    
+    Progress is written to a crawl journal; with resume=True a run continues
+    each category and keyword from its last completed page instead of starting over
+    
+    With listing_harvest=True books are stored from their listing cards, and a
+    detail page is requested only for books whose card lacks one of
+    LISTING_REQUIRED_FIELDS
     """
     
-    def __init__(self):
+    def __init__(self, resume: bool = False, listing_harvest: bool = False):
         self.client = BooksComTwClient()
-        self.parser = BooksComTwParser()
+        self.parser = BooksComTwParser(config.HTML_PARSER_BACKEND, config.SELECTOR_REVALIDATE_EVERY)
         self.processor = BooksComTwDataProcessor()
-        self.db_handler = DatabaseHandler()
+        self.db_handler = BookDatabase.from_config(config)
+        # Detail fetching hands processed books to this thread instead of waiting for the database
+        self.writer = BookWriter(
+            self.db_handler,
+            config.BATCH_SIZE,
+            config.FLUSH_INTERVAL,
+            config.WRITE_QUEUE_SIZE,
+            on_flush=self._record_written_batch
+        )
         self.target_count = config.TARGET_BOOK_COUNT
         self.batch_size = config.BATCH_SIZE
+        self.detail_workers = max(1, config.DETAIL_WORKERS)
+        self.resume = resume
+        self.listing_harvest = listing_harvest
+        self.journal = CrawlJournal(config.JOURNAL_PATH, resume)
         
         # Statistics tracking
         self.stats = {
@@ -33,11 +62,16 @@ class BooksComTwScraper:
             "total_inserted": 0,
             "total_failed": 0,
             "total_duplicates": 0,
-            "total_skipped": 0
+            "total_skipped": 0,
+            "total_resumed": 0,
+            "total_from_listing": 0,
+            "total_links": 0,
+            "total_refreshed": 0,
+            "total_updated": 0
         }
         
         # Track processed product IDs to avoid duplicates
-        self.processed_product_ids: Set[str] = set()
+        self.processed_product_ids: DedupeStore = create_dedupe_store(config)
     
     def initialize_database(self):
         """
@@ -47,15 +81,19 @@ class BooksComTwScraper:
         self.db_handler.connect()
         self.db_handler.create_table_if_not_exists()
         
-        # Load existing book IDs to avoid duplicates
-        existing_ids = self.db_handler.get_existing_book_ids()
-        # Filter for Books.com.tw IDs
-        self.processed_product_ids = {
-            id.replace("BOOKS_COM_TW_", "") 
-            for id in existing_ids 
-            if id.startswith("BOOKS_COM_TW_")
-        }
-        print(f"Loaded {len(self.processed_product_ids)} existing Books.com.tw books from database")
+        # Stream existing Books.com.tw IDs into the dedupe store to avoid duplicates;
+        # a disk store only reads books stored since its last sync
+        loaded = self.processed_product_ids.sync_stored(
+            self.db_handler.iter_existing_book_ids("BOOKS_COM_TW_", self.processed_product_ids.sync_since()),
+            lambda row: [row[0].replace("BOOKS_COM_TW_", "")] if row[0].startswith("BOOKS_COM_TW_") else []
+        )
+        print(f"Loaded {loaded} existing Books.com.tw books from database ({len(self.processed_product_ids)} known)")
+        
+        if self.resume:
+            # Links found by the earlier run come from the journal, not from new pages
+            for items in self.journal.items.values():
+                self.processed_product_ids.update(item["product_id"] for item in items if item.get("product_id"))
+            print(f"Resuming from journal: {self.journal.summary()}")
     
     def collect_book_links_from_search(self) -> List[Dict]:
         """
@@ -76,11 +114,19 @@ class BooksComTwScraper:
             if len(book_links) >= self.target_count:
                 break
                 
+            source = f"search:{keyword}"
+            books_from_keyword = list(self.journal.source_items(source))
+            if self.journal.is_finished(source):
+                book_links.extend(books_from_keyword)
+                continue
+            
             print(f"\nSearching for: {keyword}")
             
-            page = 1
-            books_from_keyword = []
+            # Continue after the last journaled page
+            last_page = self.journal.last_cursor(source)
+            page = 1 if last_page is None else last_page + 1
             max_pages = 10  # Limit pages per keyword to avoid too many requests
+            exhausted = False
             
             while len(books_from_keyword) < books_per_keyword and page <= max_pages:
                 print(f"  Fetching search results page {page}...")
@@ -95,6 +141,7 @@ class BooksComTwScraper:
                 
                 if not books:
                     print(f"  No books found on page {page}, moving to next keyword")
+                    exhausted = True
                     break
                 
                 # Filter out already processed books
@@ -107,16 +154,20 @@ class BooksComTwScraper:
                 
                 books_from_keyword.extend(new_books)
                 self.stats["total_fetched"] += len(books)
+                self.journal.record_page(source, page, new_books)
                 
                 print(f"  Found {len(new_books)} new books (total for '{keyword}': {len(books_from_keyword)})")
                 
                 # Check if we've reached the end (no new books found)
                 if len(new_books) == 0:
                     print(f"  No new books found, moving to next keyword")
+                    exhausted = True
                     break
                 
                 page += 1
             
+            if exhausted or page > max_pages or len(books_from_keyword) >= books_per_keyword:
+                self.journal.finish_source(source)
             book_links.extend(books_from_keyword)
             print(f"  Collected {len(books_from_keyword)} books from keyword '{keyword}'")
             
@@ -128,161 +179,292 @@ class BooksComTwScraper:
         print(f"\nSearch phase complete. Collected {len(book_links)} book links")
         return book_links[:self.target_count]
     
-    def collect_book_links_from_categories(self) -> List[Dict]:
+    def iter_book_links_from_categories(self) -> Iterator[Dict]:
         """
-        Collect book product IDs from category pages (optional, if category URLs are provided)
-        Returns list of product IDs and URLs
+        Stream book links from category pages (optional, if category URLs are provided)
+        CATEGORY_WORKERS categories are browsed at once, each with its own page
+        cursor, within the host's rate budget; links are yielded as pages arrive
         """
         if not config.BOOK_CATEGORIES:
-            return []
-            
-        print("Starting category browsing phase...")
-        book_links = []
+            return
         
-        for category_name, category_url, max_books in config.BOOK_CATEGORIES:
-            print(f"\nBrowsing category: {category_name}")
-            
-            page = 1
-            books_from_category = []
-            
-            while len(books_from_category) < max_books:
-                print(f"  Fetching page {page}...")
-                
-                html = self.client.get_category_page(category_url, page)
-                if not html:
-                    print(f"  Failed to fetch page {page}, moving to next category")
-                    break
-                
-                # Parse listing page
-                books = self.parser.parse_category_listing(html)
-                
-                if not books:
-                    print(f"  No books found on page {page}, moving to next category")
-                    break
-                
-                # Filter out already processed books
-                new_books = []
-                for book in books:
-                    product_id = book.get("product_id")
-                    if product_id and product_id not in self.processed_product_ids:
-                        new_books.append(book)
-                        self.processed_product_ids.add(product_id)
-                
-                books_from_category.extend(new_books)
-                self.stats["total_fetched"] += len(books)
-                
-                print(f"  Found {len(new_books)} new books (total in category: {len(books_from_category)})")
+        print(f"Starting category browsing phase ({config.CATEGORY_WORKERS} categories at a time)...")
+        crawler = CategoryCrawler(
+            config.BOOK_CATEGORIES,
+            self._fetch_category_listing,
+            self.journal,
+            self.processed_product_ids,
+            self.target_count,
+            config.CATEGORY_WORKERS
+        )
+        collected = 0
+        try:
+            for book_link in crawler.links():
+                collected += 1
+                yield book_link
+        finally:
+            self.stats["total_fetched"] += crawler.books_seen
+        
+        print(f"\nCategory browsing complete. Collected {collected} book links")
+    
+    def _fetch_category_listing(self, category_url: str, page: int) -> Optional[List[Dict]]:
+        """
+        Fetch and parse one category listing page on a category worker thread
+        Returns the books on the page, or None if the page could not be fetched
+        """
+        html = self.client.get_category_page(category_url, page)
+        if not html:
+            return None
+        return self.parser.parse_category_listing(html)
+    
+    def iter_book_links(self) -> Iterator[Dict]:
+        """
+        Stream book links for the detail stage: categories first, then search
+        (if configured) for whatever the categories did not cover
+        """
+        collected = 0
+        for book_link in self.iter_book_links_from_categories():
+            collected += 1
+            yield book_link
+        
+        if collected < self.target_count:
+            remaining = self.target_count - collected
+            print(f"\nCategory browsing collected {collected} books.")
+            if config.SEARCH_KEYWORDS and len(config.SEARCH_KEYWORDS) > 0:
+                print(f"Using search to collect remaining {remaining} books...")
+                for book_link in self.collect_book_links_from_search()[:remaining]:
+                    collected += 1
+                    yield book_link
+            elif collected:
+                print(f"Search keywords not configured. Collected {collected} books from categories only.")
+            else:
+                print("No category URLs configured and no search keywords provided. Cannot collect books.")
+        
+        self.stats["total_links"] = collected
+    
+    def fetch_and_process_book_details(self, book_links: Iterable[Dict]) -> int:
+        """
+        Fetch detailed information for collected book links
+        Links may be a stream (e.g. from concurrent category browsing); detail
+        pages are fetched as links arrive
+        DETAIL_WORKERS threads fetch detail pages concurrently, paced by the
+        per-host rate budget; results are handled here in link order
+        In listing harvest mode, books whose listing card has every required
+        field are processed from the card without a detail request
+        Each processed book is handed to the writer thread, so database writes
+        overlap with fetching the next pages
+        Returns number of processed books
+        """
+        print(f"\nStarting detail fetching phase ({self.detail_workers} workers)...")
+        processed_count = 0
+        requested = 0
+        
+        # Enough queued detail pages to keep every worker busy, without draining the link stream
+        in_flight = deque()
+        max_in_flight = self.detail_workers * 2
+        executor = ThreadPoolExecutor(max_workers=self.detail_workers, thread_name_prefix="detail")
+        try:
+            for book_link in book_links:
+                product_id = book_link.get("product_id")
                 
-                # Check if we have enough books from this category
-                if len(books_from_category) >= max_books:
-                    break
+                if not product_id:
+                    self.stats["total_skipped"] += 1
+                    continue
                 
-                # Check if we've reached the end (no new books found)
-                if len(new_books) == 0:
-                    print(f"  No new books found, moving to next category")
-                    break
+                if self.journal.was_fetched(product_id):
+                    self.stats["total_resumed"] += 1
+                    continue
                 
-                page += 1
+                if self.listing_harvest and self._has_listing_fields(book_link):
+                    processed = self._process_book(self._listing_book_data(book_link))
+                    if processed:
+                        self.writer.put(processed)
+                        processed_count += 1
+                        self.stats["total_processed"] += 1
+                        self.stats["total_from_listing"] += 1
+                        print(f"  [listing] {product_id}: {processed['name'][:50]}...")
+                        continue
                 
-                # Safety limit: don't fetch more than 50 pages per category
-                if page > 50:
-                    print(f"  Reached page limit for category")
-                    break
-            
-            book_links.extend(books_from_category[:max_books])
-            print(f"  Collected {len(books_from_category)} books from {category_name}")
+                requested += 1
+                in_flight.append((requested, book_link, executor.submit(self._fetch_book_detail, book_link)))
+                while len(in_flight) >= max_in_flight:
+                    processed_count += self._handle_detail_result(*in_flight.popleft(), processed_count)
             
-            # Check if we have enough books total
-            if len(book_links) >= self.target_count:
-                print(f"\nReached target count of {self.target_count} books")
-                break
+            while in_flight:
+                processed_count += self._handle_detail_result(*in_flight.popleft(), processed_count)
+        finally:
+            # Drop detail pages not started yet when interrupted
+            executor.shutdown(wait=True, cancel_futures=True)
         
-        print(f"\nCategory browsing complete. Collected {len(book_links)} book links")
-        return book_links[:self.target_count]
+        if self.listing_harvest:
+            print(f"  {self.stats['total_from_listing']} books stored from listing cards, "
+                  f"{requested} needed their detail page")
+        print(f"\nDetail fetching complete. Processed {processed_count} books")
+        return processed_count
     
-    def fetch_and_process_book_details(self, book_links: List[Dict]) -> List[Dict]:
+    def _handle_detail_result(self, i: int, book_link: Dict, future, processed_count: int) -> int:
         """
-        Fetch detailed information for collected book links
-        Returns list of processed book data
+        Wait for one detail page and hand the processed book to the writer thread
+        Returns 1 if the book was processed, 0 if it failed
         """
-        print("\nStarting detail fetching phase...")
-        processed_books = []
+        product_id = book_link["product_id"]
+        processed, error = future.result()
+        if error:
+            print(f"  [{i}] {product_id}: {error}")
+            self.stats["total_failed"] += 1
+            if error != FETCH_FAILED:
+                self.journal.record_fetched([product_id])
+            return 0
         
-        total_links = len(book_links)
+        self.writer.put(processed)
+        self.stats["total_processed"] += 1
         
-        for i, book_link in enumerate(book_links, 1):
-            product_id = book_link.get("product_id")
-            
-            if not product_id:
-                self.stats["total_skipped"] += 1
-                continue
-            
-            print(f"  [{i}/{total_links}] Fetching details for product {product_id}...")
-            
-            # Fetch detail page
-            html = self.client.get_book_detail_page(product_id)
-            if not html:
-                print(f"    Failed to fetch detail page")
-                self.stats["total_failed"] += 1
-                continue
-            
-            # Parse detail page
-            raw_data = self.parser.parse_book_detail(html, product_id)
-            if not raw_data:
-                print(f"    Failed to parse detail page")
-                self.stats["total_failed"] += 1
-                continue
-            
-            # Process data
-            processed = self.processor.process_book_data(raw_data)
-            if not processed:
-                print(f"    Failed to process book data")
-                self.stats["total_failed"] += 1
-                continue
-            
-            # Validate data
-            if not self.processor.validate_book_data(processed):
-                print(f"    Invalid book data")
-                self.stats["total_failed"] += 1
-                continue
-            
-            processed_books.append(processed)
-            self.stats["total_processed"] += 1
-            
-            print(f"    Success: {processed['name'][:50]}...")
-            
-            # Print progress every 10 books
-            if i % 10 == 0:
-                self._print_progress(len(processed_books), total_links)
+        print(f"  [{i}] {product_id}: {processed['name'][:50]}...")
+        
+        # Print progress every 10 books
+        if i % 10 == 0:
+            self._print_progress(processed_count + 1, self.target_count)
+        return 1
+    
+    def _fetch_book_detail(self, book_link: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Fetch, parse, process and validate one detail page on a worker thread
+        In listing harvest mode, fields the detail page lacks are taken from the listing card
+        Returns (processed book, None), or (None, reason) if the book failed
+        """
+        product_id = book_link["product_id"]
+        html = self.client.get_book_detail_page(product_id)
+        if not html:
+            return None, FETCH_FAILED
         
-        print(f"\nDetail fetching complete. Processed {len(processed_books)} books")
-        return processed_books
+        raw_data = self.parser.parse_book_detail(html, product_id)
+        if not raw_data:
+            return None, "Failed to parse detail page"
+        
+        if self.listing_harvest:
+            for field, value in self._listing_book_data(book_link).items():
+                if raw_data.get(field) is None:
+                    raw_data[field] = value
+        
+        processed = self.processor.process_book_data(raw_data)
+        if not processed:
+            return None, "Failed to process book data"
+        
+        if not self.processor.validate_book_data(processed):
+            return None, "Invalid book data"
+        
+        return processed, None
+    
+    def _has_listing_fields(self, book_link: Dict) -> bool:
+        """
+        Check whether a listing card carries every field required to skip the detail page
+        """
+        return all(book_link.get(field) for field in config.LISTING_REQUIRED_FIELDS)
     
-    def save_books_to_database(self, books_data: List[Dict]) -> int:
+    def _listing_book_data(self, book_link: Dict) -> Dict:
         """
-        Save processed books to database
+        Raw book data (as parse_book_detail returns it) built from a listing card
+        """
+        product_id = book_link["product_id"]
+        return {
+            "product_id": product_id,
+            "name": book_link.get("name"),
+            "author": book_link.get("author"),
+            "publisher": book_link.get("publisher"),
+            "price": book_link.get("price"),
+            "isbn": book_link.get("isbn"),
+            "url": f"https://www.books.com.tw/products/{product_id}"
+        }
+    
+    def _process_book(self, raw_data: Dict) -> Optional[Dict]:
+        """
+        Process and validate raw book data
+        Returns the processed book, or None if it is invalid
+        """
+        processed = self.processor.process_book_data(raw_data)
+        if not processed or not self.processor.validate_book_data(processed):
+            return None
+        return processed
+    
+    def save_books_to_database(self) -> int:
+        """
+        Wait for the writer thread to store every processed book
         Returns number of successfully inserted books
         """
-        print("\nStarting database insertion phase...")
+        self.writer.close()
+        print(f"\nDatabase insertion complete. Inserted {self.stats['total_inserted']} new books")
+        return self.stats["total_inserted"]
+    
+    def _record_written_batch(self, batch: List[Dict], inserted: int):
+        """
+        Writer thread callback: count a stored batch and journal its books as fetched
+        """
+        self.stats["total_inserted"] += inserted
+        self.stats["total_duplicates"] += (len(batch) - inserted)
+        self.journal.record_fetched(book["book_id"].replace("BOOKS_COM_TW_", "") for book in batch)
         
-        if not books_data:
-            print("No books to insert")
-            return 0
+        print(f"  Inserted {inserted}/{len(batch)} books")
+        self._print_progress(self.stats["total_inserted"], self.target_count)
+    
+    def refresh_stale_books(self, older_than_days: int) -> int:
+        """
+        Refresh mode: fetch stored books again and write only those whose content changed
+        Every cached page is revalidated with a conditional request, so pages
+        that did not change mostly cost a 304 and no database write
+        Returns number of updated books
+        """
+        print(f"Refreshing books not updated for {older_than_days} days...")
+        self.client.cache_max_age = 0
+        after = None
         
-        # Insert in batches
-        total_inserted = 0
-        for i in range(0, len(books_data), self.batch_size):
-            batch = books_data[i:i + self.batch_size]
-            inserted = self.db_handler.insert_books_batch(batch)
-            total_inserted += inserted
-            self.stats["total_inserted"] += inserted
-            self.stats["total_duplicates"] += (len(batch) - inserted)
+        while True:
+            rows = self.db_handler.get_stale_books(older_than_days, after, self.batch_size, prefix="BOOKS_COM_TW_")
+            if not rows:
+                break
+            after = (rows[-1][4], rows[-1][0])
             
-            print(f"  Batch {i//self.batch_size + 1}: Inserted {inserted}/{len(batch)} books")
-            self._print_progress(total_inserted, len(books_data))
+            refreshed = []
+            for book_id, _, _, source_url, _ in rows:
+                product_id = book_id.replace("BOOKS_COM_TW_", "")
+                html = self.client.get_book_detail_page(product_id)
+                raw_data = self.parser.parse_book_detail(html, product_id) if html else None
+                processed = self.processor.process_book_data(raw_data) if raw_data else None
+                if not processed or not self.processor.validate_book_data(processed):
+                    print(f"    Failed to refresh {book_id}")
+                    self.stats["total_failed"] += 1
+                    continue
+                # Update the stored row even if the page now reports another product ID
+                processed["book_id"] = book_id
+                refreshed.append(processed)
+            
+            updated = self.db_handler.update_changed_books(refreshed)
+            self.stats["total_refreshed"] += len(refreshed)
+            self.stats["total_updated"] += updated
+            print(f"  Checked {len(rows)} books, updated {updated}")
+        
+        print(f"\nRefresh complete. Updated {self.stats['total_updated']} of {self.stats['total_refreshed']} refreshed books")
+        return self.stats["total_updated"]
+    
+    def run_refresh(self, older_than_days: int):
+        """
+        Refresh stored books instead of collecting new ones
+        """
+        print("=" * 60)
+        print("Books.com.tw Book Refresh")
+        print("=" * 60)
         
-        print(f"\nDatabase insertion complete. Inserted {total_inserted} new books")
-        return total_inserted
+        try:
+            self.db_handler.connect()
+            self.db_handler.create_table_if_not_exists()
+            self.refresh_stale_books(older_than_days)
+            print(f"Total failed: {self.stats['total_failed']}")
+        finally:
+            if self.client:
+                self.client.close()
+            if self.db_handler.pool:
+                self.db_handler.disconnect()
+            self.journal.close()
+            self.processed_product_ids.close()
     
     def run(self):
         """
@@ -297,42 +479,22 @@ class BooksComTwScraper:
             # Initialize database
             self.initialize_database()
             
-            # Collect book links - try categories first, then use search
-            book_links = self.collect_book_links_from_categories()
-            
-            # If category browsing didn't yield enough books, use search (if configured)
-            if len(book_links) < self.target_count:
-                remaining = self.target_count - len(book_links)
-                print(f"\nCategory browsing collected {len(book_links)} books.")
-                if config.SEARCH_KEYWORDS and len(config.SEARCH_KEYWORDS) > 0:
-                    print(f"Using search to collect remaining {remaining} books...")
-                    search_links = self.collect_book_links_from_search()
-                    book_links.extend(search_links)
-                    book_links = book_links[:self.target_count]
-                else:
-                    print(f"Search keywords not configured. Collected {len(book_links)} books from categories only.")
-            elif len(book_links) == 0:
-                # If no categories configured, use search (if configured)
-                if config.SEARCH_KEYWORDS and len(config.SEARCH_KEYWORDS) > 0:
-                    print("No category URLs configured. Using search strategy...")
-                    book_links = self.collect_book_links_from_search()
-                else:
-                    print("No category URLs configured and no search keywords provided. Cannot collect books.")
+            # Category pages (then search, if needed) stream links into the detail
+            # stage as they arrive; the writer thread stores books meanwhile
+            self.writer.start()
+            processed_count = self.fetch_and_process_book_details(self.iter_book_links())
             
-            if not book_links:
+            if not self.stats["total_links"]:
                 print("No book links found. Exiting.")
                 return
             
-            # Fetch detailed information
-            books_data = self.fetch_and_process_book_details(book_links)
+            # Wait for the remaining writes
+            self.save_books_to_database()
             
-            if not books_data:
+            if not processed_count:
                 print("No book data processed. Exiting.")
                 return
             
-            # Save to database
-            self.save_books_to_database(books_data)
-            
             # Print final statistics
             self._print_final_stats()
             
@@ -342,11 +504,14 @@ class BooksComTwScraper:
             traceback.print_exc()
             raise
         finally:
-            # Close connections
+            # Flush queued books before closing connections
+            self.writer.close()
             if self.client:
                 self.client.close()
-            if self.db_handler.connection:
+            if self.db_handler.pool:
                 self.db_handler.disconnect()
+            self.journal.close()
+            self.processed_product_ids.close()
     
     def _print_progress(self, current: int, total: int):
         """
@@ -368,5 +533,10 @@ class BooksComTwScraper:
         print(f"Total duplicates skipped: {self.stats['total_duplicates']}")
         print(f"Total failed: {self.stats['total_failed']}")
         print(f"Total skipped: {self.stats['total_skipped']}")
+        print(f"Already fetched in an earlier run: {self.stats['total_resumed']}")
+        if self.listing_harvest:
+            print(f"Stored from listing cards (no detail request): {self.stats['total_from_listing']}")
+        self.client.rate_controller.print_stats()
+        self.parser.detail_plan.print_stats("detail pages")
         print("=" * 60)
 
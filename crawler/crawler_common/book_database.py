@@ -0,0 +1,299 @@
+"""
+Book database module
+Pooled PostgreSQL access to the books table shared by every crawler
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from bulk_loader import load_books, upsert_changed_books
+
+
+class BookDatabase:
+    """
+    Books table operations over a thread-safe connection pool
+
+    Every operation borrows its own connection and cursor from the pool and
+    commits before returning it, so detail workers, insert threads and the
+    search stage can use one BookDatabase at the same time. When all
+    pool_size connections are in use, callers wait for one to be returned.
+    """
+
+    # Columns whose change makes update_changed_books write a refreshed row
+    refresh_columns: Tuple[str, ...] = ("name", "publisher", "author", "price", "isbn")
+
+    def __init__(self, db_config: Dict, pool_size: int = 4, copy_threshold: int = 5000):
+        self.db_config = db_config
+        self.pool_size = pool_size
+        self.copy_threshold = copy_threshold
+        self.pool = None
+        # ThreadedConnectionPool raises instead of waiting when it is exhausted
+        self._available = threading.BoundedSemaphore(pool_size)
+
+    @classmethod
+    def from_config(cls, settings) -> "BookDatabase":
+        """
+        Build the database from a crawler config module
+        """
+        return cls(settings.DB_CONFIG, settings.DB_POOL_SIZE, settings.COPY_THRESHOLD)
+
+    def connect(self):
+        """
+        Open the connection pool
+        """
+        try:
+            self.pool = ThreadedConnectionPool(
+                1,
+                self.pool_size,
+                host=self.db_config["host"],
+                port=self.db_config["port"],
+                database=self.db_config["database"],
+                user=self.db_config["user"],
+                password=self.db_config["password"]
+            )
+            print(f"Database connection pool established successfully (up to {self.pool_size} connections)")
+        except psycopg2.Error as e:
+            print(f"Error connecting to database: {e}")
+            raise
+
+    def disconnect(self):
+        """
+        Close every pooled connection
+        """
+        if self.pool:
+            self.pool.closeall()
+            self.pool = None
+        print("Database connection closed")
+
+    def acquire(self):
+        """
+        Borrow a connection for longer-lived use, e.g. a work queue
+        Must be handed back with release()
+        """
+        self._available.acquire()
+        try:
+            return self.pool.getconn()
+        except Exception:
+            self._available.release()
+            raise
+
+    def release(self, connection):
+        """
+        Return a borrowed connection to the pool; an open transaction is rolled back
+        """
+        try:
+            if self.pool:
+                self.pool.putconn(connection)
+        finally:
+            self._available.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a with block
+        The caller commits; uncommitted work is rolled back when it is returned
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    @contextmanager
+    def cursor(self):
+        """
+        Borrow a connection and cursor for one transaction
+        Commits when the with block completes and rolls back if it raises
+        """
+        with self.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    yield cursor
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+
+    def create_table_if_not_exists(self):
+        """
+        Create books table if it doesn't exist
+        """
+        create_table_query = """
+        CREATE TABLE IF NOT EXISTS books (
+            book_id VARCHAR(255) PRIMARY KEY,
+            name TEXT NOT NULL,
+            publisher TEXT,
+            author TEXT,
+            price NUMERIC(10, 2) DEFAULT 0,
+            isbn VARCHAR(20),
+            open_library_id VARCHAR(255),
+            source_url TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_isbn ON books(isbn);
+        CREATE INDEX IF NOT EXISTS idx_open_library_id ON books(open_library_id);
+        CREATE INDEX IF NOT EXISTS idx_updated_at ON books(updated_at);
+        """
+
+        try:
+            with self.cursor() as cursor:
+                cursor.execute(create_table_query)
+            print("Books table created/verified successfully")
+        except psycopg2.Error as e:
+            print(f"Error creating table: {e}")
+            raise
+
+    def book_exists(self, book_id: str, isbn: Optional[str] = None) -> bool:
+        """
+        Check if a book already exists in the database, by book_id or by ISBN if provided
+        """
+        try:
+            with self.cursor() as cursor:
+                cursor.execute(
+                    "SELECT EXISTS (SELECT 1 FROM books WHERE book_id = %s OR (%s IS NOT NULL AND isbn = %s))",
+                    (book_id, isbn, isbn)
+                )
+                return cursor.fetchone()[0]
+        except psycopg2.Error as e:
+            print(f"Error checking if book exists: {e}")
+            return False
+
+    def insert_book(self, book_data: Dict) -> bool:
+        """
+        Insert a single book into the database
+        Returns True if inserted, False if already stored or on error
+        """
+        return self.insert_books_batch([book_data]) == 1
+
+    def insert_books_batch(self, books_data: List[Dict]) -> int:
+        """
+        Insert multiple books in a batch
+        Books whose book_id or ISBN is already stored are skipped set-based in one
+        statement; batches of copy_threshold rows or more are streamed with COPY
+        through a staging table (see bulk_loader.py)
+        Returns number of successfully inserted books
+        """
+        if not books_data:
+            return 0
+
+        try:
+            with self.cursor() as cursor:
+                return load_books(cursor, books_data, self.copy_threshold)
+        except psycopg2.Error as e:
+            print(f"Error in batch insert: {e}")
+            return 0
+
+    def update_changed_books(self, books_data: List[Dict]) -> int:
+        """
+        Upsert refreshed books, writing only rows whose refresh_columns changed
+        Changed rows get a new updated_at; unchanged rows are not written at all
+        Returns number of updated books
+        """
+        if not books_data:
+            return 0
+
+        try:
+            with self.cursor() as cursor:
+                return upsert_changed_books(cursor, books_data, self.refresh_columns)
+        except psycopg2.Error as e:
+            print(f"Error updating refreshed books: {e}")
+            return 0
+
+    def get_book_count(self) -> int:
+        """
+        Get total number of books in database
+        """
+        try:
+            with self.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM books")
+                return cursor.fetchone()[0]
+        except psycopg2.Error as e:
+            print(f"Error getting book count: {e}")
+            return 0
+
+    def _iter_rows(self, name: str, query: str, params: List, batch_size: int) -> Iterator[List[Tuple]]:
+        """
+        Stream query results in batches through a server-side cursor on a borrowed connection
+        """
+        with self.connection() as connection:
+            cursor = connection.cursor(name=name)
+            cursor.itersize = batch_size
+            try:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            except psycopg2.Error as e:
+                print(f"Error reading {name}: {e}")
+            finally:
+                cursor.close()
+                connection.rollback()
+
+    def iter_existing_books(self, since: Optional[datetime] = None, batch_size: int = 10000) -> Iterator[List[Tuple]]:
+        """
+        Stream (book_id, open_library_id, isbn, created_at) rows of stored books
+        With since, only rows created at or after it are returned
+        """
+        query = "SELECT book_id, open_library_id, isbn, created_at FROM books"
+        params = []
+        if since is not None:
+            query += " WHERE created_at >= %s"
+            params.append(since)
+        return self._iter_rows("existing_books", query, params, batch_size)
+
+    def iter_existing_book_ids(self, prefix: str, since: Optional[datetime] = None, batch_size: int = 10000) -> Iterator[List[Tuple]]:
+        """
+        Stream (book_id, created_at) rows whose book_id starts with prefix
+        With since, only rows created at or after it are returned
+        """
+        query = "SELECT book_id, created_at FROM books WHERE book_id LIKE %s"
+        params = [f"{prefix}%"]
+        if since is not None:
+            query += " AND created_at >= %s"
+            params.append(since)
+        return self._iter_rows("existing_book_ids", query, params, batch_size)
+
+    def get_stale_books(
+        self,
+        older_than_days: int,
+        after: Optional[Tuple] = None,
+        limit: int = 500,
+        prefix: Optional[str] = None,
+        open_library_only: bool = False
+    ) -> List[Tuple]:
+        """
+        Get books not updated for older_than_days, oldest first, optionally only
+        book_ids starting with prefix or books with an open_library_id
+        Pages are chained by passing the (updated_at, book_id) of the previous page's last row as after
+        Returns list of (book_id, isbn, open_library_id, source_url, updated_at) rows
+        """
+        query = """
+        SELECT book_id, isbn, open_library_id, source_url, updated_at FROM books
+        WHERE updated_at < NOW() - make_interval(days => %s)
+        """
+        params = [older_than_days]
+        if prefix:
+            query += " AND book_id LIKE %s"
+            params.append(f"{prefix}%")
+        if open_library_only:
+            query += " AND open_library_id IS NOT NULL"
+        if after:
+            query += " AND (updated_at, book_id) > (%s, %s)"
+            params.extend(after)
+        query += " ORDER BY updated_at, book_id LIMIT %s"
+        params.append(limit)
+
+        try:
+            with self.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        except psycopg2.Error as e:
+            print(f"Error getting stale books: {e}")
+            return []
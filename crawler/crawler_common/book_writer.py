@@ -0,0 +1,111 @@
+"""
+Book writer module
+Write-behind thread that stores processed books while the crawl continues
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class BookWriter:
+    """
+    Background thread that inserts processed books with group commits
+
+    Fetch and parse workers put() processed books and carry on; the writer
+    thread collects them and flushes once batch_size books are waiting or
+    flush_interval seconds have passed since the last flush, writing each
+    flush in one transaction. close() flushes whatever is still queued and
+    stops the thread. When max_pending books are waiting, put() blocks, so a
+    slow database throttles the crawl instead of growing memory.
+
+    on_flush(batch, inserted) runs on the writer thread after every flush,
+    e.g. to update statistics and the crawl journal
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        database,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int = 0,
+        on_flush: Optional[Callable[[List[Dict], int], None]] = None
+    ):
+        self.database = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.inserted = 0
+        self.flushes = 0
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Start the writer thread
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="book-writer", daemon=True)
+            self._thread.start()
+
+    def put(self, book: Dict):
+        """
+        Queue one processed book for writing
+        """
+        if self._thread is None:
+            raise RuntimeError("BookWriter.put() called before start()")
+        self._queue.put(book)
+
+    def close(self):
+        """
+        Flush queued books and stop the writer thread; safe to call more than once
+        """
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        """
+        Writer thread: collect books and flush them by size or time
+        """
+        batch = []
+        deadline = None
+        while True:
+            # With nothing waiting there is no deadline, so block until a book arrives
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                book = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                book = None
+
+            stop = book is self._STOP
+            if book is not None and not stop:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(book)
+
+            if batch and (stop or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+            if stop:
+                break
+
+    def _flush(self, batch: List[Dict]):
+        """
+        Write one batch in a single transaction and report it
+        """
+        try:
+            inserted = self.database.insert_books_batch(batch)
+            self.inserted += inserted
+            self.flushes += 1
+            if self.on_flush:
+                self.on_flush(batch, inserted)
+        except Exception as e:
+            # Keep the thread alive so put() and close() never hang
+            print(f"Error writing batch of {len(batch)} books: {e}")
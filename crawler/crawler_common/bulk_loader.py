@@ -0,0 +1,183 @@
+"""
+Bulk loader module
+Batch inserts and refresh upserts of book rows into PostgreSQL, with a COPY path for large loads
+"""
+
+import csv
+import tempfile
+from typing import Dict, List, Tuple
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+
+BOOK_COLUMNS = ("book_id", "name", "publisher", "author", "price", "isbn", "open_library_id", "source_url")
+
+# NULL marker of the COPY CSV stream; empty strings stay empty strings
+COPY_NULL = "\\N"
+
+
+def book_row(book: Dict) -> Tuple:
+    """
+    Turn a processed book dictionary into a row in BOOK_COLUMNS order
+    """
+    return (
+        book["book_id"],
+        book["name"],
+        book.get("publisher"),
+        book.get("author"),
+        book.get("price", 0),
+        book.get("isbn"),
+        book.get("open_library_id"),
+        book.get("source_url")
+    )
+
+
+def insert_books_values(cursor, books_data: List[Dict], table: str = "books") -> int:
+    """
+    Insert books with execute_values from a VALUES list
+    Books whose book_id or ISBN is already stored are skipped by an anti-join
+    in the same statement, instead of one existence check per book, and of
+    several new books with the same ISBN only the lowest book_id is kept
+    Returns number of inserted books
+    """
+    query = sql.SQL("""
+    INSERT INTO {table} (
+        book_id, name, publisher, author, price,
+        isbn, open_library_id, source_url
+    )
+    SELECT book_id, name, publisher, author, price,
+           isbn, open_library_id, source_url
+    FROM (
+        SELECT v.*, row_number() OVER (PARTITION BY v.isbn ORDER BY v.book_id) AS isbn_rank
+        FROM (VALUES %s) AS v (
+            book_id, name, publisher, author, price,
+            isbn, open_library_id, source_url
+        )
+        WHERE NOT EXISTS (SELECT 1 FROM {table} b WHERE b.book_id = v.book_id)
+          AND (v.isbn IS NULL OR NOT EXISTS (SELECT 1 FROM {table} b WHERE b.isbn = v.isbn))
+    ) v
+    WHERE v.isbn IS NULL OR v.isbn_rank = 1
+    ON CONFLICT (book_id) DO NOTHING
+    RETURNING book_id
+    """).format(table=sql.Identifier(table))
+
+    inserted = execute_values(
+        cursor,
+        query,
+        [book_row(book) for book in books_data],
+        # Typed so all-NULL columns of a VALUES list still match the table
+        template="(%s, %s, %s, %s, %s::numeric, %s, %s, %s)",
+        page_size=100,
+        fetch=True
+    )
+    return len(inserted)
+
+
+def copy_books(cursor, books_data: List[Dict], table: str = "books", spool_bytes: int = 64 * 1024 * 1024) -> int:
+    """
+    Stream books into a temporary staging table with COPY FROM STDIN and merge
+    them into table with one INSERT ... SELECT
+    The CSV stream is kept in memory up to spool_bytes and spills to a temporary
+    file beyond that. The merge skips books whose book_id or ISBN is already
+    stored, keeps one of several staged rows with the same book_id and, of
+    staged books sharing an ISBN, only the one with the lowest book_id.
+    The staging table is emptied when the caller commits.
+    Returns number of inserted books
+    """
+    staging = sql.Identifier(f"{table}_staging")
+    target = sql.Identifier(table)
+    columns = sql.SQL(", ").join(map(sql.Identifier, BOOK_COLUMNS))
+
+    with tempfile.SpooledTemporaryFile(max_size=spool_bytes, mode="w+", encoding="utf-8", newline="") as buffer:
+        writer = csv.writer(buffer)
+        for book in books_data:
+            writer.writerow([COPY_NULL if value is None else value for value in book_row(book)])
+        buffer.seek(0)
+
+        cursor.execute(sql.SQL(
+            "CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        ).format(staging=staging, target=target))
+        cursor.copy_expert(
+            sql.SQL("COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, NULL {null})").format(
+                staging=staging,
+                columns=columns,
+                null=sql.Literal(COPY_NULL)
+            ).as_string(cursor),
+            buffer
+        )
+
+    cursor.execute(sql.SQL("""
+    INSERT INTO {target} ({columns})
+    SELECT {columns}
+    FROM (
+        SELECT s.*, row_number() OVER (PARTITION BY s.isbn ORDER BY s.book_id) AS isbn_rank
+        FROM (SELECT DISTINCT ON (book_id) * FROM {staging} ORDER BY book_id) s
+        WHERE NOT EXISTS (SELECT 1 FROM {target} b WHERE b.book_id = s.book_id)
+          AND (s.isbn IS NULL OR NOT EXISTS (SELECT 1 FROM {target} b WHERE b.isbn = s.isbn))
+    ) s
+    WHERE s.isbn IS NULL OR s.isbn_rank = 1
+    ON CONFLICT (book_id) DO NOTHING
+    """).format(
+        target=target,
+        staging=staging,
+        columns=columns
+    ))
+    return cursor.rowcount
+
+
+def load_books(cursor, books_data: List[Dict], copy_threshold: int, table: str = "books") -> int:
+    """
+    Insert books with COPY from copy_threshold rows on, with execute_values below
+    Does not commit; returns number of inserted books
+    """
+    if not books_data:
+        return 0
+    if copy_threshold and len(books_data) >= copy_threshold:
+        return copy_books(cursor, books_data, table)
+    return insert_books_values(cursor, books_data, table)
+
+
+# Refreshed fields that keep their stored value when the new data lacks them
+KEEP_IF_MISSING = ("publisher", "author", "isbn")
+
+
+def upsert_changed_books(cursor, books_data: List[Dict], compare_columns: Tuple[str, ...], table: str = "books") -> int:
+    """
+    Upsert refreshed books, writing only rows whose compare_columns changed
+    Changed rows get a new updated_at; unchanged rows are not written at all.
+    Publisher, author and isbn missing from the refreshed data keep their stored value
+    Does not commit; returns number of updated books
+    """
+    # A row may only be upserted once per statement
+    books_data = list({book["book_id"]: book for book in books_data}.values())
+    if not books_data:
+        return 0
+
+    target = sql.Identifier(table)
+    new_values = [
+        sql.SQL("COALESCE(EXCLUDED.{column}, {target}.{column})" if column in KEEP_IF_MISSING else "EXCLUDED.{column}").format(
+            column=sql.Identifier(column),
+            target=target
+        )
+        for column in compare_columns
+    ]
+    query = sql.SQL("""
+    INSERT INTO {target} ({columns}) VALUES %s
+    ON CONFLICT (book_id) DO UPDATE SET
+        {assignments},
+        updated_at = CURRENT_TIMESTAMP
+    WHERE ({stored}) IS DISTINCT FROM ({new_values})
+    RETURNING book_id
+    """).format(
+        target=target,
+        columns=sql.SQL(", ").join(map(sql.Identifier, BOOK_COLUMNS)),
+        assignments=sql.SQL(", ").join(
+            sql.SQL("{} = {}").format(sql.Identifier(column), value)
+            for column, value in zip(compare_columns, new_values)
+        ),
+        stored=sql.SQL(", ").join(sql.SQL("{}.{}").format(target, sql.Identifier(column)) for column in compare_columns),
+        new_values=sql.SQL(", ").join(new_values)
+    )
+
+    updated = execute_values(cursor, query, [book_row(book) for book in books_data], page_size=100, fetch=True)
+    return len(updated)
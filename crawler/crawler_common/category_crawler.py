@@ -0,0 +1,224 @@
+"""
+Category crawler module
+Browses configured categories concurrently and streams the book links they yield
+"""
+
+import queue
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class CategoryTask:
+    """
+    One configured category with its own pagination cursor and link quota
+    """
+
+    def __init__(self, name: str, url: str, max_books: int, page: int, links: List[Dict]):
+        self.name = name
+        self.url = url
+        self.max_books = max_books
+        self.source = f"category:{name}"
+        self.page = page
+        self.links = links
+        self.emitted = 0
+
+
+class CategoryCrawler:
+    """
+    Concurrent category browsing that yields new book links as pages arrive
+
+    Each category is an independent task that walks its pages in order. Up to
+    workers listing pages (of different categories) are fetched at once by
+    worker threads through fetch_listing(url, page), which returns the books
+    parsed from the page or None if the page could not be fetched; pacing is
+    left to the client's per-host rate budget. Everything else runs on the
+    thread iterating links(): duplicate filtering against known_ids, the
+    crawl journal, the per-category max_books quota and the global
+    target_count, so neither the dedupe store nor the quotas need locking.
+
+    A category stops when a page fails, has no books or no new books, its
+    quota is met, or max_pages pages were read. With a resumed journal,
+    finished categories only replay their journaled links and the others
+    continue after their last completed page.
+
+    on_worker_exit runs on each worker thread before it ends, e.g. to close
+    a browser owned by that thread
+    """
+
+    _STOP = None
+
+    def __init__(
+        self,
+        categories: Sequence[Tuple[str, str, int]],
+        fetch_listing: Callable[[str, int], Optional[List[Dict]]],
+        journal,
+        known_ids,
+        target_count: int,
+        workers: int = 4,
+        max_pages: int = 50,
+        on_worker_exit: Optional[Callable[[], None]] = None
+    ):
+        self.categories = categories
+        self.fetch_listing = fetch_listing
+        self.journal = journal
+        self.known_ids = known_ids
+        self.target_count = target_count
+        self.workers = max(1, workers)
+        self.max_pages = max_pages
+        self.on_worker_exit = on_worker_exit
+        self.pages_fetched = 0
+        self.books_seen = 0
+        self._requests: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+        self._threads: List[threading.Thread] = []
+
+    def links(self) -> Iterator[Dict]:
+        """
+        Yield book links from all categories in the order their pages complete,
+        at most max_books per category and target_count in total
+        """
+        emitted = 0
+        in_flight = 0
+        try:
+            for name, url, max_books in self.categories:
+                last_page = self.journal.last_cursor(f"category:{name}")
+                task = CategoryTask(name, url, max_books, 1 if last_page is None else last_page + 1,
+                                    list(self.journal.source_items(f"category:{name}")))
+
+                # Links found by an earlier run are handed on first
+                for link in task.links[:max_books]:
+                    if emitted >= self.target_count:
+                        break
+                    task.emitted += 1
+                    emitted += 1
+                    yield link
+
+                if emitted >= self.target_count:
+                    break
+                if self.journal.is_finished(task.source):
+                    continue
+                if len(task.links) >= max_books:
+                    self._finish(task)
+                    continue
+                self._request(task)
+                in_flight += 1
+
+            while in_flight and emitted < self.target_count:
+                task, books = self._results.get()
+                in_flight -= 1
+
+                new_links, more = self._handle_page(task, books)
+                for link in new_links:
+                    if emitted >= self.target_count:
+                        break
+                    emitted += 1
+                    yield link
+
+                if more and emitted < self.target_count:
+                    task.page += 1
+                    self._request(task)
+                    in_flight += 1
+
+            if emitted >= self.target_count:
+                print(f"\nReached target count of {self.target_count} books")
+        finally:
+            self.close()
+
+    def _request(self, task: CategoryTask):
+        """
+        Queue the next page of a category, starting worker threads as needed
+        """
+        if len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"category-{len(self._threads) + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._requests.put(task)
+
+    def _work(self):
+        """
+        Worker thread: fetch requested listing pages until stopped
+        """
+        try:
+            while True:
+                task = self._requests.get()
+                if task is self._STOP:
+                    break
+                print(f"  [{task.name}] Fetching page {task.page}...")
+                try:
+                    books = self.fetch_listing(task.url, task.page)
+                except Exception as e:
+                    print(f"  [{task.name}] Error fetching page {task.page}: {e}")
+                    books = None
+                self._results.put((task, books))
+        finally:
+            if self.on_worker_exit:
+                self.on_worker_exit()
+
+    def _handle_page(self, task: CategoryTask, books: Optional[List[Dict]]) -> Tuple[List[Dict], bool]:
+        """
+        Filter, journal and count one fetched page of a category
+        Returns the links to hand on and whether the category has more pages to fetch
+        """
+        if books is None:
+            print(f"  [{task.name}] Failed to fetch page {task.page}, stopping category")
+            return [], False
+
+        if not books:
+            print(f"  [{task.name}] No books found on page {task.page}, category finished")
+            self._finish(task)
+            return [], False
+
+        # Filter out already processed books
+        new_books = []
+        for book in books:
+            product_id = book.get("product_id")
+            if product_id and product_id not in self.known_ids:
+                new_books.append(book)
+                self.known_ids.add(product_id)
+
+        task.links.extend(new_books)
+        self.pages_fetched += 1
+        self.books_seen += len(books)
+        self.journal.record_page(task.source, task.page, new_books)
+
+        quota = max(0, task.max_books - task.emitted)
+        new_links = new_books[:quota]
+        task.emitted += len(new_links)
+        print(f"  [{task.name}] Page {task.page}: {len(new_books)} new books "
+              f"(total in category: {min(len(task.links), task.max_books)})")
+
+        if task.emitted >= task.max_books:
+            self._finish(task)
+            return new_links, False
+        if not new_books:
+            print(f"  [{task.name}] No new books found, category finished")
+            self._finish(task)
+            return new_links, False
+        if task.page >= self.max_pages:
+            print(f"  [{task.name}] Reached page limit for category")
+            self._finish(task)
+            return new_links, False
+        return new_links, True
+
+    def _finish(self, task: CategoryTask):
+        """
+        Journal a category as finished and report what it collected
+        """
+        self.journal.finish_source(task.source)
+        print(f"  [{task.name}] Collected {min(len(task.links), task.max_books)} books")
+
+    def close(self):
+        """
+        Stop the worker threads; pages still being fetched are completed and dropped
+        """
+        # Pages not started yet are not fetched at all
+        while True:
+            try:
+                self._requests.get_nowait()
+            except queue.Empty:
+                break
+        for _ in self._threads:
+            self._requests.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
@@ -0,0 +1,159 @@
+"""
+Crawl journal module
+Append-only record of completed crawl work, used to resume interrupted runs
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class CrawlJournal:
+    """
+    Append-only JSON-lines journal of crawl progress
+
+    Each source (search query, keyword or category) logs every completed page
+    with its cursor (offset or page number) and the items found on it; sources
+    that are exhausted are marked finished. Items whose details have been stored
+    are logged as fetched. A resumed run skips finished sources, continues each
+    source after its last completed page and re-queues found items that were
+    never fetched.
+
+    A line cut short by a crash is ignored on load. A run without resume starts
+    a new journal; an existing one is renamed with its modification time
+    appended (e.g. crawl_journal.jsonl.20240101-120000) so it can still be resumed
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self.cursors: Dict[str, int] = {}
+        self.items: Dict[str, List[Dict]] = {}
+        self.finished: Set[str] = set()
+        self.fetched: Set[str] = set()
+
+        if resume and os.path.exists(path):
+            self._load()
+        elif not resume:
+            self._rotate()
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        self._lock = threading.Lock()
+        if self._file.tell() > 0 and not self._ends_with_newline():
+            # Terminate a line cut short by a crash so new entries start cleanly
+            self._file.write("\n")
+
+    def _rotate(self):
+        """
+        Move an existing journal aside so a fresh run does not overwrite it
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(os.path.getmtime(self.path)))
+        rotated = f"{self.path}.{stamp}"
+        suffix = 1
+        while os.path.exists(rotated):
+            rotated = f"{self.path}.{stamp}-{suffix}"
+            suffix += 1
+        os.replace(self.path, rotated)
+        print(f"Previous crawl journal kept as {rotated}")
+
+    def _load(self):
+        """
+        Rebuild progress from an existing journal
+        """
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                event = entry.get("event")
+                if event == "page":
+                    source = entry["source"]
+                    self.cursors[source] = entry["cursor"]
+                    self.items.setdefault(source, []).extend(entry.get("items", []))
+                elif event == "finished":
+                    self.finished.add(entry["source"])
+                elif event == "fetched":
+                    self.fetched.update(entry.get("ids", []))
+
+    def _ends_with_newline(self) -> bool:
+        """
+        Check whether the journal file ends with a complete line
+        """
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _append(self, entry: Dict):
+        """
+        Write one entry and flush it so it survives a crash
+        """
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def record_page(self, source: str, cursor: int, items: List[Dict]):
+        """
+        Log a completed page of a source and the new items found on it
+        """
+        self.cursors[source] = cursor
+        self.items.setdefault(source, []).extend(items)
+        self._append({"event": "page", "source": source, "cursor": cursor, "items": items})
+
+    def finish_source(self, source: str):
+        """
+        Log that a source has no more pages worth fetching
+        """
+        self.finished.add(source)
+        self._append({"event": "finished", "source": source})
+
+    def record_fetched(self, item_ids: Iterable[str]):
+        """
+        Log items whose details have been fetched and stored
+        """
+        item_ids = [item_id for item_id in item_ids if item_id and item_id not in self.fetched]
+        if not item_ids:
+            return
+        self.fetched.update(item_ids)
+        self._append({"event": "fetched", "ids": item_ids})
+
+    def is_finished(self, source: str) -> bool:
+        """
+        Check whether a source was exhausted in an earlier run
+        """
+        return source in self.finished
+
+    def last_cursor(self, source: str) -> Optional[int]:
+        """
+        Get the cursor of the last completed page of a source, if any
+        """
+        return self.cursors.get(source)
+
+    def source_items(self, source: str) -> List[Dict]:
+        """
+        Get all items found so far for a source
+        """
+        return self.items.get(source, [])
+
+    def was_fetched(self, item_id: Optional[str]) -> bool:
+        """
+        Check whether an item's details were already fetched and stored
+        """
+        return bool(item_id) and item_id in self.fetched
+
+    def summary(self) -> str:
+        """
+        Describe journal contents for progress output
+        """
+        found = sum(len(items) for items in self.items.values())
+        return (f"{len(self.cursors)} sources started, {len(self.finished)} finished, "
+                f"{found} items found, {len(self.fetched)} fetched")
+
+    def close(self):
+        """
+        Close the journal file
+        """
+        self._file.close()
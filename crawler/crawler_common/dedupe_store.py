@@ -0,0 +1,266 @@
+"""
+Dedupe store module
+Set-like membership stores for already seen books, in memory or on disk
+"""
+
+import os
+import math
+import mmap
+import sqlite3
+import hashlib
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+
+class DedupeStore:
+    """
+    Membership API shared by every dedupe backend
+
+    Supports `key in store`, add(), update() and len() like a set.
+    Keys loaded from the database with load_stored() are remembered across runs
+    by persistent backends; keys added while crawling only last for the run.
+    """
+
+    synced_until: Optional[datetime] = None
+    # created_at is the inserting transaction's start time, so a row committed
+    # late can be older than rows already loaded; sync_overlap covers that gap
+    sync_overlap = timedelta(seconds=300)
+
+    def add(self, key: str):
+        """
+        Mark a key as seen for this run
+        """
+        raise NotImplementedError
+
+    def update(self, keys: Iterable[str]):
+        """
+        Mark several keys as seen for this run
+        """
+        for key in keys:
+            self.add(key)
+
+    def load_stored(self, keys: Iterable[str]):
+        """
+        Mark keys of books already stored in the database as seen
+        """
+        raise NotImplementedError
+
+    def set_synced_until(self, created_at: Optional[datetime]):
+        """
+        Remember the newest created_at loaded from the database
+        """
+        self.synced_until = created_at
+
+    def sync_since(self) -> Optional[datetime]:
+        """
+        Lower bound on created_at for the next incremental load (None loads everything)
+        Rows stored in the sync_overlap before synced_until are read again, so one
+        whose transaction committed after the last sync is not missed
+        """
+        if self.synced_until is None:
+            return None
+        return self.synced_until - self.sync_overlap
+
+    def sync_stored(self, batches: Iterable[List[Tuple]], row_keys: Callable[[Tuple], Iterable[str]]) -> int:
+        """
+        Load batches of stored rows whose last column is created_at
+        row_keys maps a row to the keys it marks as seen
+        Returns number of rows read, including rows re-read from the overlap
+        """
+        loaded = 0
+        latest = self.synced_until
+        for rows in batches:
+            keys = []
+            for row in rows:
+                keys.extend(row_keys(row))
+                created_at = row[-1]
+                if created_at is not None and (latest is None or created_at > latest):
+                    latest = created_at
+            self.load_stored(keys)
+            loaded += len(rows)
+        self.set_synced_until(latest)
+        return loaded
+
+    def close(self):
+        """
+        Release the store
+        """
+
+
+class MemoryDedupeStore(DedupeStore):
+    """
+    Python set backend, reloaded from the database on every run
+    Fastest for small crawls; memory grows with the number of books
+    """
+
+    def __init__(self):
+        self.keys: Set[str] = set()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str):
+        self.keys.add(key)
+
+    def update(self, keys: Iterable[str]):
+        self.keys.update(keys)
+
+    def load_stored(self, keys: Iterable[str]):
+        self.keys.update(keys)
+
+
+class DiskDedupeStore(DedupeStore):
+    """
+    Bloom filter in a memory-mapped file, backed by an exact SQLite table
+
+    Most lookups of unseen keys are answered by the Bloom filter without
+    touching SQLite; a Bloom hit is confirmed with an exact primary-key lookup,
+    so false positives never skip a book. Memory use is the mapped filter plus
+    SQLite's page cache, independent of the number of keys.
+
+    Keys loaded from the database persist across runs together with the newest
+    created_at seen, so later runs only load books stored since then (less
+    sync_overlap). Keys added
+    while crawling are dropped when the store is reopened.
+    """
+
+    def __init__(self, path: str, expected_items: int, false_positive_rate: float, commit_every: int = 10000):
+        self.path = path
+        self.commit_every = commit_every
+        self._pending = 0
+
+        # Used by one thread at a time, which may be an executor thread of an async crawler
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS dedupe_keys (
+                key TEXT PRIMARY KEY,
+                stored INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS dedupe_meta (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        # Keys seen but never stored by an earlier run must not block this one;
+        # their Bloom bits stay set and only cost an extra exact lookup
+        self.connection.execute("DELETE FROM dedupe_keys WHERE stored = 0")
+        self.connection.commit()
+
+        row = self.connection.execute(
+            "SELECT value FROM dedupe_meta WHERE name = 'synced_until'"
+        ).fetchone()
+        self.synced_until = datetime.fromisoformat(row[0]) if row and row[0] else None
+
+        # Standard Bloom sizing: m = -n ln p / (ln 2)^2, k = m / n ln 2
+        self.num_bits = max(64, int(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / expected_items * math.log(2)))
+        self._open_bloom(f"{path}.bloom")
+
+    def _open_bloom(self, bloom_path: str):
+        """
+        Map the Bloom filter file, rebuilding it from SQLite if missing or resized
+        """
+        size = (self.num_bits + 7) // 8
+        rebuild = not os.path.exists(bloom_path) or os.path.getsize(bloom_path) != size
+        if rebuild:
+            with open(bloom_path, "wb") as f:
+                f.truncate(size)
+
+        self._bloom_file = open(bloom_path, "r+b")
+        self._bits = mmap.mmap(self._bloom_file.fileno(), size)
+
+        if rebuild:
+            for (key,) in self.connection.execute("SELECT key FROM dedupe_keys"):
+                self._set_bits(key)
+
+    def _positions(self, key: str) -> List[int]:
+        """
+        Bit positions of a key (double hashing over one 128-bit digest)
+        """
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def _set_bits(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def _maybe_contains(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __contains__(self, key: str) -> bool:
+        if not self._maybe_contains(key):
+            return False
+        # Uncommitted inserts are visible on the same connection
+        return self.connection.execute(
+            "SELECT 1 FROM dedupe_keys WHERE key = ?", (key,)
+        ).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM dedupe_keys").fetchone()[0]
+
+    def _write(self, query: str, keys: List[str]):
+        """
+        Insert keys into SQLite and the Bloom filter, committing in large groups
+        """
+        if not keys:
+            return
+        self.connection.executemany(query, ((key,) for key in keys))
+        for key in keys:
+            self._set_bits(key)
+        self._pending += len(keys)
+        if self._pending >= self.commit_every:
+            self.connection.commit()
+            self._pending = 0
+
+    def add(self, key: str):
+        self._write("INSERT OR IGNORE INTO dedupe_keys (key, stored) VALUES (?, 0)", [key])
+
+    def update(self, keys: Iterable[str]):
+        self._write("INSERT OR IGNORE INTO dedupe_keys (key, stored) VALUES (?, 0)", list(keys))
+
+    def load_stored(self, keys: Iterable[str]):
+        self._write("INSERT OR REPLACE INTO dedupe_keys (key, stored) VALUES (?, 1)", list(keys))
+
+    def set_synced_until(self, created_at: Optional[datetime]):
+        self.synced_until = created_at
+        if created_at is not None:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO dedupe_meta (name, value) VALUES ('synced_until', ?)",
+                (created_at.isoformat(sep=" "),)
+            )
+            self.connection.commit()
+            self._pending = 0
+
+    def close(self):
+        """
+        Commit pending keys and release the mapped filter
+        """
+        self.connection.commit()
+        self.connection.close()
+        self._bits.flush()
+        self._bits.close()
+        self._bloom_file.close()
+
+
+def create_dedupe_store(settings, path: Optional[str] = None) -> DedupeStore:
+    """
+    Build the dedupe store selected by a crawler config module (DEDUPE_BACKEND)
+    path overrides DEDUPE_PATH, e.g. to give each worker process its own disk store
+    """
+    if getattr(settings, "DEDUPE_BACKEND", "memory") == "disk":
+        store: DedupeStore = DiskDedupeStore(
+            path or settings.DEDUPE_PATH,
+            settings.DEDUPE_EXPECTED_ITEMS,
+            settings.DEDUPE_FALSE_POSITIVE_RATE
+        )
+    else:
+        store = MemoryDedupeStore()
+    store.sync_overlap = timedelta(seconds=getattr(settings, "DEDUPE_SYNC_OVERLAP", 300))
+    return store
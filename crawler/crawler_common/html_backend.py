@@ -0,0 +1,249 @@
+"""
+HTML backend module
+Interchangeable HTML tree builders behind the small node API used by the site parsers
+"""
+
+import re
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple, Union
+
+
+# BeautifulSoup with html.parser is the reference the other backends are checked against
+BACKENDS = ("bs4", "lxml", "selectolax")
+
+# Elements whose content is never page text; BeautifulSoup's get_text() already skips them
+NON_TEXT_TAGS = ("script", "style", "template")
+
+# Non-standard :contains('text') pseudo-class at the end of a selector
+CONTAINS_PATTERN = re.compile(r"^(?P<base>.*?):contains\((?P<quote>['\"])(?P<text>.*?)(?P=quote)\)$")
+
+# "Label：value" pairs in flattened page text, e.g. "ISBN：9789861234567"
+LABEL_PATTERN = re.compile(r"([A-Za-z]+|[\u4e00-\u9fff]+)\s*[：:]\s*(\S*)")
+
+
+class HtmlNode:
+    """
+    Backend-independent element (or whole document)
+
+    Subclasses implement _select, text and attr for one tree builder; the
+    shared methods on top behave the same for every backend. select() and
+    select_one() only match descendants, never the node itself, and accept a
+    trailing :contains('text') that keeps matches whose text contains it.
+    """
+
+    def _select(self, css: str) -> List["HtmlNode"]:
+        """
+        Descendants matching a standard CSS selector, in document order
+        """
+        raise NotImplementedError
+
+    def text(self) -> str:
+        """
+        Concatenated text of the node and its descendants
+        """
+        raise NotImplementedError
+
+    def attr(self, name: str, default: str = "") -> str:
+        """
+        Attribute value, or default if the attribute is missing
+        """
+        raise NotImplementedError
+
+    def select(self, css: str) -> List["HtmlNode"]:
+        """
+        Descendants matching css, in document order
+        """
+        match = CONTAINS_PATTERN.match(css)
+        if match:
+            return [node for node in self._select(match.group("base")) if match.group("text") in node.text()]
+        return self._select(css)
+
+    def select_one(self, css: str) -> Optional["HtmlNode"]:
+        """
+        First descendant matching css, or None
+        """
+        nodes = self.select(css)
+        return nodes[0] if nodes else None
+
+    def select_first(self, selectors: Sequence[str]) -> List[Optional["HtmlNode"]]:
+        """
+        First descendant matching each selector, or None, in selectors order
+        """
+        return [self.select_one(css) for css in selectors]
+
+    def links(self, href_pattern: Optional[Union[str, Pattern]] = None) -> List["HtmlNode"]:
+        """
+        Descendant <a> elements with an href attribute, optionally only those
+        whose href contains a match of href_pattern
+        """
+        links = self._select("a[href]")
+        if href_pattern is None:
+            return links
+        return [link for link in links if re.search(href_pattern, link.attr("href"))]
+
+
+class Bs4Node(HtmlNode):
+    """
+    BeautifulSoup element built with Python's html.parser
+    """
+
+    _matchers: Dict[str, object] = {}
+
+    def __init__(self, element):
+        self.element = element
+
+    @classmethod
+    def _compiled(cls, css: str):
+        matcher = cls._matchers.get(css)
+        if matcher is None:
+            import soupsieve
+            matcher = soupsieve.compile(css)
+            cls._matchers[css] = matcher
+        return matcher
+
+    def _select(self, css: str) -> List[HtmlNode]:
+        return [Bs4Node(element) for element in self.element.select(css)]
+
+    def select_one(self, css: str) -> Optional[HtmlNode]:
+        if CONTAINS_PATTERN.match(css):
+            return super().select_one(css)
+        element = self.element.select_one(css)
+        return Bs4Node(element) if element is not None else None
+
+    def select_first(self, selectors: Sequence[str]) -> List[Optional[HtmlNode]]:
+        # soupsieve walks the tree in Python for every select_one(), so match
+        # all selectors in one walk that stops once each has been found
+        from bs4 import Tag
+        found: List[Optional[HtmlNode]] = [None] * len(selectors)
+        pending = {}
+        for index, css in enumerate(selectors):
+            if CONTAINS_PATTERN.match(css):
+                found[index] = self.select_one(css)
+            else:
+                pending[index] = self._compiled(css)
+        if pending:
+            for element in self.element.descendants:
+                if not isinstance(element, Tag):
+                    continue
+                for index, matcher in list(pending.items()):
+                    if matcher.match(element):
+                        found[index] = Bs4Node(element)
+                        del pending[index]
+                if not pending:
+                    break
+        return found
+
+    def text(self) -> str:
+        return self.element.get_text()
+
+    def attr(self, name: str, default: str = "") -> str:
+        value = self.element.get(name)
+        if value is None:
+            return default
+        # Multi-valued attributes such as class come back as lists
+        return " ".join(value) if isinstance(value, list) else value
+
+
+class LxmlNode(HtmlNode):
+    """
+    lxml.html element; CSS selectors are compiled once through cssselect and cached
+    """
+
+    _selectors: Dict[str, object] = {}
+
+    def __init__(self, element):
+        self.element = element
+
+    @classmethod
+    def _compiled(cls, css: str):
+        selector = cls._selectors.get(css)
+        if selector is None:
+            from lxml.cssselect import CSSSelector
+            selector = CSSSelector(css, translator="html")
+            cls._selectors[css] = selector
+        return selector
+
+    def _select(self, css: str) -> List[HtmlNode]:
+        # cssselect matches descendant-or-self
+        return [LxmlNode(element) for element in self._compiled(css)(self.element) if element is not self.element]
+
+    def text(self) -> str:
+        return str(self.element.text_content())
+
+    def attr(self, name: str, default: str = "") -> str:
+        return self.element.get(name, default)
+
+
+class SelectolaxNode(HtmlNode):
+    """
+    selectolax node on the lexbor engine
+    """
+
+    def __init__(self, node):
+        self.node = node
+
+    def _select(self, css: str) -> List[HtmlNode]:
+        return [SelectolaxNode(node) for node in self.node.css(css) if node.mem_id != self.node.mem_id]
+
+    def text(self) -> str:
+        return self.node.text(deep=True, separator="", strip=False)
+
+    def attr(self, name: str, default: str = "") -> str:
+        value = self.node.attributes.get(name)
+        return default if value is None else value
+
+
+class PageText:
+    """
+    Text of a document flattened once, indexed by the labels it contains
+
+    label() returns the position and first word after the first "label：value"
+    or "label: value" occurrence, so fallbacks that look for labelled values
+    need one dictionary lookup instead of a regex scan of the whole page
+    """
+
+    def __init__(self, document: HtmlNode):
+        self.text = document.text()
+        self._labels: Optional[Dict[str, Tuple[int, str]]] = None
+
+    def label(self, name: str) -> Optional[Tuple[int, str]]:
+        """
+        (position in text, value) of the first occurrence of label name, or None
+        """
+        if self._labels is None:
+            self._labels = {}
+            for match in LABEL_PATTERN.finditer(self.text):
+                self._labels.setdefault(match.group(1), (match.start(1), match.group(2)))
+        return self._labels.get(name)
+
+
+def parse_html(html: str, backend: str = "bs4") -> HtmlNode:
+    """
+    Parse a page with the named backend and return its document node
+    lxml needs the lxml and cssselect packages, selectolax the selectolax package
+    """
+    if backend == "bs4":
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, "html.parser")
+        # html.parser keeps <template> content as ordinary elements; drop it as the other backends do
+        for element in soup.find_all(NON_TEXT_TAGS):
+            element.decompose()
+        return Bs4Node(soup)
+
+    if backend == "lxml":
+        import lxml.html
+        from lxml import etree
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # Strings with an XML encoding declaration must be parsed as bytes
+            root = lxml.html.document_fromstring(html.encode("utf-8"))
+        etree.strip_elements(root, *NON_TEXT_TAGS, with_tail=False)
+        return LxmlNode(root)
+
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(list(NON_TEXT_TAGS))
+        return SelectolaxNode(tree.root)
+
+    raise ValueError(f"Unknown HTML parser backend: {backend} (choose from {', '.join(BACKENDS)})")
@@ -0,0 +1,203 @@
+"""
+Adaptive rate controller module
+Per-host AIMD (additive-increase / multiplicative-decrease) request pacing
+"""
+
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+from rate_limiter import TokenBucket
+
+
+# Responses that mean the server wants us to slow down
+BACKOFF_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (seconds or HTTP date) into seconds to wait
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class HostRateState:
+    """
+    Current pacing state for one host
+    """
+
+    def __init__(self, initial_rate: float, min_rate: float, max_rate: float, burst: float):
+        self.bucket = TokenBucket(initial_rate, burst)
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.latency_baseline: Optional[float] = None
+        self.last_decrease = 0.0
+        self.requests = 0
+        self.backoffs = 0
+
+
+class AdaptiveRateController:
+    """
+    Shared request pacer that adapts each host's rate to how the host responds
+
+    Every healthy response adds increase_step to the host's rate (up to
+    max_rate). A 429/5xx, a failed request, or latency above
+    latency_factor x the running baseline multiplies the rate by
+    decrease_factor (down to min_rate), at most once per pacing interval.
+    Retry-After pauses the host for the requested time.
+
+    host_limits gives individual hosts their own (initial, min, max) budget;
+    other hosts use the controller-wide rates.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float,
+        min_rate: float,
+        max_rate: float,
+        increase_step: float,
+        decrease_factor: float,
+        latency_factor: float,
+        burst: float = 1.0,
+        host_limits: Optional[Dict[str, Tuple[float, float, float]]] = None
+    ):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.burst = burst
+        self.host_limits = {host.lower(): limits for host, limits in (host_limits or {}).items()}
+        self.hosts: Dict[str, HostRateState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings, share: float = 1.0) -> "AdaptiveRateController":
+        """
+        Build a controller from a crawler config module
+        share scales the configured rates when several processes split one global budget
+        """
+        return cls(
+            settings.INITIAL_REQUESTS_PER_SECOND * share,
+            settings.MIN_REQUESTS_PER_SECOND * share,
+            settings.MAX_REQUESTS_PER_SECOND * share,
+            settings.RATE_INCREASE_STEP * share,
+            settings.RATE_DECREASE_FACTOR,
+            settings.LATENCY_BACKOFF_FACTOR,
+            getattr(settings, "RATE_LIMIT_BURST", 1),
+            {
+                host: tuple(rate * share for rate in limits)
+                for host, limits in getattr(settings, "HOST_RATE_LIMITS", {}).items()
+            }
+        )
+
+    @staticmethod
+    def host_for(url: str) -> str:
+        """
+        Get the host a URL is paced under
+        """
+        return urlparse(url).netloc.lower()
+
+    def _state(self, host: str) -> HostRateState:
+        """
+        Get or create the pacing state for host
+        """
+        with self._lock:
+            if host not in self.hosts:
+                initial_rate, min_rate, max_rate = self.host_limits.get(
+                    host, (self.initial_rate, self.min_rate, self.max_rate)
+                )
+                self.hosts[host] = HostRateState(initial_rate, min_rate, max_rate, self.burst)
+            return self.hosts[host]
+
+    def acquire(self, url: str):
+        """
+        Block the current thread until a request to url's host may be sent
+        """
+        state = self._state(self.host_for(url))
+        state.bucket.acquire()
+        with self._lock:
+            state.requests += 1
+
+    async def acquire_async(self, url: str):
+        """
+        Suspend the current coroutine until a request to url's host may be sent
+        """
+        state = self._state(self.host_for(url))
+        await state.bucket.acquire_async()
+        with self._lock:
+            state.requests += 1
+
+    def record_response(self, url: str, status: Optional[int], latency: float, retry_after: Optional[str] = None):
+        """
+        Adjust the host's rate from one response
+        status is None when the request failed without a response
+        """
+        state = self._state(self.host_for(url))
+        with self._lock:
+            slow = (
+                state.latency_baseline is not None
+                and latency > state.latency_baseline * self.latency_factor
+            )
+            if status is None or status in BACKOFF_STATUSES or slow:
+                self._decrease(state)
+            else:
+                state.rate = min(state.max_rate, state.rate + self.increase_step)
+                state.bucket.set_rate(state.rate)
+                # Baseline only tracks healthy responses
+                if state.latency_baseline is None:
+                    state.latency_baseline = latency
+                else:
+                    state.latency_baseline = 0.8 * state.latency_baseline + 0.2 * latency
+
+        retry_seconds = parse_retry_after(retry_after)
+        if retry_seconds:
+            state.bucket.pause(retry_seconds)
+
+    def _decrease(self, state: HostRateState):
+        """
+        Multiplicatively reduce a host's rate
+        Concurrent failures from one burst only count once
+        Caller must hold the lock
+        """
+        now = time.monotonic()
+        if now - state.last_decrease < 1.0 / state.rate:
+            return
+        state.last_decrease = now
+        state.rate = max(state.min_rate, state.rate * self.decrease_factor)
+        state.bucket.set_rate(state.rate)
+        state.backoffs += 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Get current rate, request count and backoff events per host
+        """
+        with self._lock:
+            return {
+                host: {
+                    "rate": state.rate,
+                    "requests": state.requests,
+                    "backoffs": state.backoffs
+                }
+                for host, state in self.hosts.items()
+            }
+
+    def print_stats(self):
+        """
+        Print per-host pacing statistics
+        """
+        for host, host_stats in self.snapshot().items():
+            print(f"Rate {host}: {host_stats['rate']:.2f} req/s, "
+                  f"{host_stats['requests']} requests, {host_stats['backoffs']} backoffs")
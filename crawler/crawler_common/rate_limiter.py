@@ -0,0 +1,83 @@
+"""
+Rate limiter module
+Token-bucket limiter that enforces a request budget for crawler clients
+"""
+
+import time
+import asyncio
+import threading
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by every request issued against one host
+    Tokens refill continuously at `rate` per second up to `capacity`
+    Usable from both threads (acquire) and coroutines (acquire_async)
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """
+        Add tokens earned since the last refill
+        Caller must hold the lock
+        """
+        if now > self.last_refill:
+            elapsed = now - self.last_refill
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def _reserve(self) -> float:
+        """
+        Take one token and return how long the caller must wait before using it
+        Tokens may go negative, which queues callers in arrival order
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            self.tokens -= 1
+            # last_refill lies in the future while the bucket is paused
+            ready_at = self.last_refill + max(0.0, -self.tokens) / self.rate
+            return max(0.0, ready_at - now)
+
+    def set_rate(self, rate: float):
+        """
+        Change the refill rate; tokens earned so far are kept
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def pause(self, seconds: float):
+        """
+        Hand out no tokens for the given number of seconds (e.g. Retry-After)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            resume_at = now + seconds
+            if resume_at > self.last_refill:
+                self.tokens = min(self.tokens, 0.0)
+                self.last_refill = resume_at
+
+    def acquire(self):
+        """
+        Block the current thread until a request may be sent
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """
+        Suspend the current coroutine until a request may be sent
+        """
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
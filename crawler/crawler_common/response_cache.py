@@ -0,0 +1,267 @@
+"""
+HTTP response cache module
+Persistent, compressed on-disk cache shared by all crawler clients
+"""
+
+import os
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Optional
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache for HTTP response bodies
+
+    Entries are keyed on method + URL + params, stored gzip-compressed under
+    cache_dir, and evicted least-recently-used once the total size exceeds
+    max_size_bytes. The total is kept in a meta row that triggers update on
+    every insert, update and delete of an entry, so a put does not sum the
+    whole index. Entries older than ttl are not discarded but returned as
+    stale so the caller can revalidate them with ETag / If-Modified-Since.
+    """
+
+    # Entries removed per statement while evicting
+    EVICT_BATCH = 64
+
+    def __init__(self, cache_dir: str, max_size_bytes: int, ttl: float):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.ttl = ttl
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "evicted": 0
+        }
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Processes sharing cache_dir: WAL lets readers run during a write,
+        # and writers wait up to timeout seconds for each other
+        self._index = sqlite3.connect(
+            os.path.join(self.cache_dir, "index.db"),
+            timeout=30,
+            check_same_thread=False
+        )
+        self._index.execute("PRAGMA journal_mode=WAL")
+        self._index.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )
+        """)
+        self._index.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)"
+        )
+        self._index.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        self._index.executescript("""
+            CREATE TRIGGER IF NOT EXISTS entries_size_insert AFTER INSERT ON entries BEGIN
+                UPDATE meta SET value = value + NEW.size WHERE name = 'total_size';
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_size_update AFTER UPDATE OF size ON entries BEGIN
+                UPDATE meta SET value = value + NEW.size - OLD.size WHERE name = 'total_size';
+            END;
+            CREATE TRIGGER IF NOT EXISTS entries_size_delete AFTER DELETE ON entries BEGIN
+                UPDATE meta SET value = value - OLD.size WHERE name = 'total_size';
+            END;
+        """)
+        # Indexes written before the meta row existed are summed once
+        self._index.execute("""
+            INSERT OR IGNORE INTO meta (name, value)
+            SELECT 'total_size', COALESCE(SUM(size), 0) FROM entries
+        """)
+        self._index.commit()
+
+    @classmethod
+    def from_config(cls, settings) -> Optional["ResponseCache"]:
+        """
+        Build a cache from a crawler config module
+        Returns None if CACHE_ENABLED is off
+        """
+        if not getattr(settings, "CACHE_ENABLED", False):
+            return None
+        return cls(
+            settings.CACHE_DIR,
+            settings.CACHE_MAX_SIZE_MB * 1024 * 1024,
+            settings.CACHE_TTL
+        )
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Optional[Dict] = None) -> str:
+        """
+        Build the cache key for a request
+        Params are stringified and sorted so equivalent requests share one entry,
+        whether a client passes page=2 or page="2"; None params are left out,
+        as HTTP clients do not send them
+        """
+        normalized = sorted(
+            (str(name), str(value))
+            for name, value in (params or {}).items()
+            if value is not None
+        )
+        canonical = json.dumps([method.upper(), url, normalized], ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path_for(self, key: str) -> str:
+        """
+        Return the file path holding the body for key
+        """
+        return os.path.join(self.cache_dir, key[:2], f"{key}.gz")
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        Look up a cached response
+        max_age overrides the TTL for this lookup (0 treats every entry as stale)
+        Returns a dict with body, etag, last_modified and fresh, or None on miss
+        """
+        with self._lock:
+            row = self._index.execute(
+                "SELECT stored_at, etag, last_modified FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if not row:
+                self.stats["misses"] += 1
+                return None
+
+            try:
+                with gzip.open(self._path_for(key), "rb") as f:
+                    body = f.read()
+            except OSError:
+                # Body file was removed externally, drop the stale index row
+                self._index.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._index.commit()
+                self.stats["misses"] += 1
+                return None
+
+            now = time.time()
+            self._index.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                (now, key)
+            )
+            self._index.commit()
+
+            stored_at, etag, last_modified = row
+            fresh = (now - stored_at) < (self.ttl if max_age is None else max_age)
+            if fresh:
+                self.stats["hits"] += 1
+        return {
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": fresh
+        }
+
+    def put(self, key: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Store a response body and its validators, evicting old entries if needed
+        """
+        path = self._path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+
+        now = time.time()
+        with self._lock:
+            # An upsert, unlike INSERT OR REPLACE, fires the size update trigger
+            self._index.execute(
+                """
+                INSERT INTO entries
+                    (key, size, stored_at, last_access, etag, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    size = excluded.size,
+                    stored_at = excluded.stored_at,
+                    last_access = excluded.last_access,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified
+                """,
+                (key, size, now, now, etag, last_modified)
+            )
+            self._index.commit()
+            self._evict()
+
+    def mark_revalidated(self, key: str):
+        """
+        Reset the TTL of an entry after the server answered 304 Not Modified
+        """
+        now = time.time()
+        with self._lock:
+            self._index.execute(
+                "UPDATE entries SET stored_at = ?, last_access = ? WHERE key = ?",
+                (now, now, key)
+            )
+            self._index.commit()
+            self.stats["revalidated"] += 1
+
+    @staticmethod
+    def validation_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """
+        Build conditional request headers for a stale entry
+        """
+        headers = {}
+        if entry and not entry["fresh"]:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _evict(self):
+        """
+        Remove least recently used entries until the cache fits max_size_bytes
+        Caller must hold the lock
+        """
+        total = self._index.execute(
+            "SELECT value FROM meta WHERE name = 'total_size'"
+        ).fetchone()[0]
+        while total > self.max_size_bytes:
+            rows = self._index.execute(
+                "SELECT key, size FROM entries ORDER BY last_access ASC LIMIT ?",
+                (self.EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_size_bytes:
+                    break
+                try:
+                    os.remove(self._path_for(key))
+                except OSError:
+                    pass
+                self._index.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                self.stats["evicted"] += 1
+            self._index.commit()
+
+    def total_size(self) -> int:
+        """
+        Return the compressed size of all cached bodies in bytes
+        """
+        with self._lock:
+            return self._index.execute(
+                "SELECT value FROM meta WHERE name = 'total_size'"
+            ).fetchone()[0]
+
+    def close(self):
+        """
+        Close the cache index
+        """
+        with self._lock:
+            self._index.close()
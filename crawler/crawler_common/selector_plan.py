@@ -0,0 +1,79 @@
+"""
+Selector plan module
+Learns which of several candidate CSS selectors finds each field on a site
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Optional, Sequence, Tuple
+
+
+class SelectorPlan:
+    """
+    Per-field order of candidate selectors, with the selector that matched first
+
+    Parsers list candidates for each field in order of preference. While a
+    field has no winner, and on every revalidate_every-th page, the
+    candidates are tried in that declared order and the selector that
+    produced the value becomes the field's winner. On the other pages the
+    winner is tried first and the rest only if it finds nothing, so a page
+    usually costs one lookup per field. Re-validation pages catch a site
+    change that makes an earlier candidate match again.
+
+    revalidate_every=1 tries the declared order on every page (no learning
+    shortcuts); 0 never re-validates once a winner is known. One plan is
+    shared by all threads parsing the same kind of page.
+    """
+
+    def __init__(self, candidates: Dict[str, Sequence[str]], revalidate_every: int = 50):
+        self.candidates: Dict[str, Tuple[str, ...]] = {field: tuple(selectors) for field, selectors in candidates.items()}
+        self.revalidate_every = revalidate_every
+        self.winners: Dict[str, str] = {}
+        self.hits: Dict[str, Counter] = {field: Counter() for field in self.candidates}
+        self.pages = 0
+        self.relearned = 0
+        self._lock = threading.Lock()
+
+    def begin_page(self) -> bool:
+        """
+        Count a new page
+        Returns True if it is a re-validation page that must use the declared order
+        """
+        with self._lock:
+            self.pages += 1
+            return self.revalidate_every > 0 and (self.pages - 1) % self.revalidate_every == 0
+
+    def order(self, field: str, validating: bool) -> Tuple[str, ...]:
+        """
+        Selectors to try for field on this page, winner first unless validating
+        """
+        candidates = self.candidates[field]
+        winner = self.winners.get(field)
+        if validating or winner is None or winner == candidates[0]:
+            return candidates
+        return (winner,) + tuple(selector for selector in candidates if selector != winner)
+
+    def record(self, field: str, selector: Optional[str], validating: bool):
+        """
+        Record which selector produced field's value (None if none did)
+        Only declared-order lookups may change the winner
+        """
+        with self._lock:
+            self.hits[field][selector] += 1
+            if selector is None:
+                return
+            winner = self.winners.get(field)
+            if winner is None or (validating and selector != winner):
+                if winner is not None:
+                    self.relearned += 1
+                self.winners[field] = selector
+
+    def print_stats(self, name: str):
+        """
+        Print each field's winning selector and how often it matched
+        """
+        print(f"Selector plan {name}: {self.pages} pages, {self.relearned} re-learned")
+        for field in self.candidates:
+            winner = self.winners.get(field)
+            hits = self.hits[field]
+            print(f"  {field}: {winner or '(none)'} ({hits[winner] if winner else 0} hits, {hits[None]} missing)")
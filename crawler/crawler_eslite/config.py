@@ -3,6 +3,8 @@ Configuration file for Eslite.com scraper
 Contains website URLs, database settings, and scraping parameters
 """
 
+import os
+
 # Eslite.com website URLs
 ESLITE_BASE_URL = "https://www.eslite.com"
 
@@ -14,6 +16,42 @@ RETRY_DELAY = 5  # Delay before retry in seconds
 TIMEOUT = 30  # Request timeout in seconds (for reference, Playwright uses its own timeout)
 PLAYWRIGHT_TIMEOUT = 60000  # Playwright timeout in milliseconds (60 seconds)
 
+# Adaptive rate control (AIMD per host, see crawler_common/rate_controller.py)
+INITIAL_REQUESTS_PER_SECOND = 2 / sum(RANDOM_DELAY_RANGE)  # Start at the mean of the random delay range
+MIN_REQUESTS_PER_SECOND = 1 / (RETRY_DELAY * 2)  # Never back off below this rate
+MAX_REQUESTS_PER_SECOND = 1 / RANDOM_DELAY_RANGE[0]  # Never ramp up beyond the shortest random delay
+RATE_INCREASE_STEP = 0.02  # Added to the rate after each healthy response
+RATE_DECREASE_FACTOR = 0.5  # Rate multiplier on 429/5xx, failures or rising latency
+LATENCY_BACKOFF_FACTOR = 3.0  # Back off when latency exceeds this multiple of the baseline
+
+# Response cache settings (shared on-disk cache, see crawler_common/response_cache.py)
+CACHE_ENABLED = True  # Serve repeated requests from the local cache
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache")
+CACHE_MAX_SIZE_MB = 500  # Least recently used entries are evicted above this size
+CACHE_TTL = 7 * 24 * 3600  # Seconds before an entry is revalidated with the server
+
+# Dedupe store settings (see crawler_common/dedupe_store.py)
+# "memory" keeps known books in a Python set reloaded from the database on every run;
+# "disk" uses a memory-mapped Bloom filter plus an exact SQLite table that persists
+# across runs and only loads books stored since the last run
+DEDUPE_BACKEND = "memory"
+DEDUPE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dedupe.db")
+DEDUPE_EXPECTED_ITEMS = 10000000  # Known product IDs the Bloom filter is sized for
+DEDUPE_FALSE_POSITIVE_RATE = 0.001  # Bloom false positives cost one extra SQLite lookup
+DEDUPE_SYNC_OVERLAP = 300  # Seconds of stored books re-read on each sync; must exceed the longest insert transaction
+
+# Crawl journal (completed listing pages and fetched products, used by --resume)
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crawl_journal.jsonl")
+
+# HTML parser backend (see crawler_common/html_backend.py)
+# "bs4" is BeautifulSoup with html.parser; "lxml" (needs lxml and cssselect) and
+# "selectolax" (lexbor engine) parse several times faster with the same results,
+# checked on saved pages with benchmark_parsers.py
+HTML_PARSER_BACKEND = "bs4"
+
+# Refresh mode (main.py --refresh)
+REFRESH_AFTER_DAYS = 30  # Books not updated for this many days are fetched again
+
 # User agent for web requests
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
@@ -25,11 +63,16 @@ DB_CONFIG = {
     "user": "amy",
     "password": "postgres"
 }
+DB_POOL_SIZE = 4  # Maximum pooled database connections; each worker borrows its own per operation
 
 # Scraping settings
 TARGET_BOOK_COUNT = 1000  # Target number of books to scrape (10 categories × 100 books)
 BATCH_SIZE = 20  # Number of books to process in each batch
+COPY_THRESHOLD = 5000  # Batches of at least this many rows are loaded with COPY through a staging table
+FLUSH_INTERVAL = 5  # Seconds before the writer thread stores a partial batch
+WRITE_QUEUE_SIZE = 500  # Processed books waiting for the writer thread; a full queue pauses fetching
 BOOKS_PER_CATEGORY = 100  # Number of books to scrape per category
+CATEGORY_WORKERS = 2  # Categories browsed at once, each in its own headless browser; their links feed the detail stage as they arrive
 
 # Category configuration
 # Format: (category_name, category_url, max_books_per_category)
@@ -4,54 +4,72 @@ Handles browser automation using Playwright to interact with the Eslite.com webs
 Eslite.com uses Vue.js to dynamically load content, so we need a browser to render JavaScript
 """
 
+import os
+import sys
 import time
-import random
+import threading
 from typing import Dict, List, Optional
 from playwright.sync_api import sync_playwright, Browser, Page, BrowserContext
 import config
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crawler_common"))
+from rate_controller import AdaptiveRateController
+from response_cache import ResponseCache
+
 
 class EsliteClient:
     """
     Client for interacting with Eslite.com website using Playwright
     Handles browser automation to wait for JavaScript-rendered content
+    
+    Playwright's sync API only works on the thread that started it, so every
+    thread using the client gets its own browser, started on first use; the
+    rate controller and cache are shared by all of them
     """
     
     def __init__(self):
         self.base_url = config.ESLITE_BASE_URL
-        self.request_delay = config.REQUEST_DELAY
-        self.random_delay_range = config.RANDOM_DELAY_RANGE
+        # Adaptive per-host pacing replaces the fixed random delay before every page load
+        self.rate_controller = AdaptiveRateController.from_config(config)
         self.timeout = getattr(config, 'PLAYWRIGHT_TIMEOUT', 60000)
-        self.playwright = None
-        self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
-        self.page: Optional[Page] = None
+        self._local = threading.local()
+        self.cache = ResponseCache.from_config(config)
+        self.cache_max_age: Optional[float] = None  # Overrides CACHE_TTL; 0 renders every page again
         self._init_browser()
+    
+    @property
+    def page(self) -> Page:
+        """
+        Browser page of the calling thread
+        """
+        if getattr(self._local, "page", None) is None:
+            self._init_browser()
+        return self._local.page
         
     def _init_browser(self):
         """
-        Initialize Playwright browser instance
+        Initialize a Playwright browser instance for the calling thread
         """
         try:
-            self.playwright = sync_playwright().start()
+            self._local.playwright = sync_playwright().start()
             # Launch browser in headless mode (set to False for debugging)
-            self.browser = self.playwright.chromium.launch(
+            self._local.browser = self._local.playwright.chromium.launch(
                 headless=True,
                 args=['--disable-blink-features=AutomationControlled']
             )
             
             # Create browser context with realistic settings
-            self.context = self.browser.new_context(
+            self._local.context = self._local.browser.new_context(
                 viewport={'width': 1920, 'height': 1080},
                 user_agent=config.USER_AGENT,
                 locale='zh-TW',
                 timezone_id='Asia/Taipei',
             )
             
-            self.page = self.context.new_page()
+            self._local.page = self._local.context.new_page()
             
             # Set extra headers
-            self.page.set_extra_http_headers({
+            self._local.page.set_extra_http_headers({
                 "Accept-Language": "zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7",
             })
             
@@ -60,13 +78,6 @@ class EsliteClient:
             print("Make sure Playwright is installed: pip install playwright && playwright install chromium")
             raise
     
-    def _random_delay(self):
-        """
-        Add random delay between requests to avoid pattern detection
-        """
-        delay = random.uniform(*self.random_delay_range)
-        time.sleep(delay)
-    
     def fetch_page(self, url: str, wait_selector: Optional[str] = None, wait_timeout: Optional[int] = None) -> Optional[str]:
         """
         Fetch a web page using Playwright and wait for content to load
@@ -78,9 +89,19 @@ class EsliteClient:
             
         Returns:
             HTML content as string after JavaScript execution, or None if failed
+        
+        Rendered pages are cached on disk; the browser cannot issue conditional
+        requests, so stale entries are simply rendered again
         """
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key("GET", url)
+            cached = self.cache.get(cache_key, self.cache_max_age)
+            if cached and cached["fresh"]:
+                return cached["body"].decode("utf-8")
+        
         try:
-            self._random_delay()
+            self.rate_controller.acquire(url)
             
             if wait_timeout is None:
                 wait_timeout = self.timeout
@@ -88,9 +109,17 @@ class EsliteClient:
             # Navigate to page - use 'domcontentloaded' instead of 'networkidle'
             # 'networkidle' can timeout if there are continuous requests (analytics, ads, etc.)
             # 'domcontentloaded' waits for DOM to be ready, then we'll wait for specific content
+            start = time.monotonic()
             try:
-                self.page.goto(url, wait_until='domcontentloaded', timeout=wait_timeout)
+                response = self.page.goto(url, wait_until='domcontentloaded', timeout=wait_timeout)
+                self.rate_controller.record_response(
+                    url,
+                    response.status if response else None,
+                    time.monotonic() - start,
+                    response.headers.get("retry-after") if response else None
+                )
             except Exception as e:
+                self.rate_controller.record_response(url, None, time.monotonic() - start)
                 print(f"  Warning: Navigation timeout or error: {e}")
                 # Continue anyway, might still have content
             
@@ -136,6 +165,8 @@ class EsliteClient:
             # Debug: Check if we got meaningful content
             if len(html) < 1000:
                 print(f"  Warning: Received very short HTML ({len(html)} chars) from {url}")
+            elif self.cache:
+                self.cache.put(cache_key, html.encode("utf-8"))
             
             return html
             
@@ -186,19 +217,35 @@ class EsliteClient:
         # Wait for book title or detail content to appear
         return self.fetch_page(book_url, wait_selector='h1, [class*="title"], [class*="product-name"]')
     
+    def close_browser(self):
+        """
+        Close the calling thread's browser, if it has one
+        """
+        try:
+            page: Optional[Page] = getattr(self._local, "page", None)
+            context: Optional[BrowserContext] = getattr(self._local, "context", None)
+            browser: Optional[Browser] = getattr(self._local, "browser", None)
+            if page:
+                page.close()
+            if context:
+                context.close()
+            if browser:
+                browser.close()
+            if getattr(self._local, "playwright", None):
+                self._local.playwright.stop()
+        except Exception as e:
+            print(f"Error closing browser: {e}")
+        finally:
+            self._local.page = self._local.context = self._local.browser = self._local.playwright = None
+    
     def close(self):
         """
         Close the browser and cleanup
+        Browsers of other threads must be closed on those threads with close_browser()
         """
+        self.close_browser()
         try:
-            if self.page:
-                self.page.close()
-            if self.context:
-                self.context.close()
-            if self.browser:
-                self.browser.close()
-            if self.playwright:
-                self.playwright.stop()
+            if self.cache:
+                self.cache.close()
         except Exception as e:
-            print(f"Error closing browser: {e}")
-
+            print(f"Error closing cache: {e}")
@@ -3,19 +3,26 @@ Eslite.com HTML parser module
 Extracts structured book data from HTML pages
 """
 
-from bs4 import BeautifulSoup
+import os
+import sys
 from typing import Dict, List, Optional
 import re
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crawler_common"))
+from html_backend import HtmlNode, parse_html
+
 
 class EsliteParser:
     """
     Parser for extracting book information from Eslite.com HTML pages
     Handles both listing pages and detail pages
+    
+    backend selects the HTML tree builder ("bs4", "lxml" or "selectolax",
+    see crawler_common/html_backend.py); extraction results are the same
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, backend: str = "bs4"):
+        self.backend = backend
     
     def parse_category_listing(self, html: str) -> List[Dict]:
         """
@@ -33,11 +40,11 @@ class EsliteParser:
             return books
         
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            document = parse_html(html, self.backend)
             
             # First, try to find all links that might be product links
             # Eslite.com might use various URL patterns
-            all_links = soup.find_all("a", href=True)
+            all_links = document.links()
             
             # Try multiple patterns for product URLs
             product_url_patterns = [
@@ -51,7 +58,7 @@ class EsliteParser:
             
             product_links = []
             for link in all_links:
-                href = link.get("href", "")
+                href = link.attr("href")
                 if not href:
                     continue
                 
@@ -65,7 +72,7 @@ class EsliteParser:
             if product_links:
                 seen_urls = set()
                 for link in product_links:
-                    href = link.get("href", "")
+                    href = link.attr("href")
                     if not href:
                         continue
                     
@@ -81,7 +88,7 @@ class EsliteParser:
                     seen_urls.add(href)
                     
                     product_id = self._extract_product_id_from_url(href)
-                    title = self._clean_text(link.get_text())
+                    title = self._clean_text(link.text())
                     
                     # Only add if we have a valid URL
                     if href and ("product" in href.lower() or "goods" in href.lower() or "item" in href.lower()):
@@ -111,7 +118,7 @@ class EsliteParser:
             book_elements = []
             for selector in book_selectors:
                 try:
-                    elements = soup.select(selector)
+                    elements = document.select(selector)
                     if elements:
                         book_elements = elements
                         print(f"  Found {len(elements)} elements using selector: {selector}")
@@ -140,9 +147,9 @@ class EsliteParser:
             # If still no books found, try to find any links with numeric IDs (might be product IDs)
             if not books:
                 # Look for links with numeric patterns that might be product pages
-                numeric_links = soup.find_all("a", href=re.compile(r"/\d+"))
+                numeric_links = document.links(r"/\d+")
                 for link in numeric_links[:20]:  # Limit to first 20 to avoid false positives
-                    href = link.get("href", "")
+                    href = link.attr("href")
                     if href and len(href) > 5:  # Filter out very short paths
                         # Check if it looks like a product page
                         if any(keyword in href.lower() for keyword in ["product", "goods", "item", "book"]):
@@ -150,7 +157,7 @@ class EsliteParser:
                             books.append({
                                 "product_id": self._extract_product_id_from_url(normalized_href) or self._generate_id_from_url(normalized_href),
                                 "url": normalized_href,
-                                "title": self._clean_text(link.get_text()) or "Unknown"
+                                "title": self._clean_text(link.text()) or "Unknown"
                             })
                     
         except Exception as e:
@@ -175,7 +182,9 @@ class EsliteParser:
             return None
         
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            document = parse_html(html, self.backend)
+            
+            page_text = None
             
             # Extract product ID from URL
             product_id = self._extract_product_id_from_url(book_url)
@@ -201,9 +210,9 @@ class EsliteParser:
             ]
             
             for selector in title_selectors:
-                title_elem = soup.select_one(selector)
+                title_elem = document.select_one(selector)
                 if title_elem:
-                    title_text = self._clean_text(title_elem.get_text())
+                    title_text = self._clean_text(title_elem.text())
                     if title_text:
                         book_data["name"] = title_text
                         break
@@ -218,9 +227,9 @@ class EsliteParser:
             ]
             
             for selector in author_selectors:
-                author_elem = soup.select_one(selector)
+                author_elem = document.select_one(selector)
                 if author_elem:
-                    author_text = self._clean_text(author_elem.get_text())
+                    author_text = self._clean_text(author_elem.text())
                     # Remove common prefixes
                     author_text = re.sub(r"^作者[：:]\s*", "", author_text)
                     author_text = re.sub(r"^Author[：:]\s*", "", author_text, flags=re.IGNORECASE)
@@ -230,7 +239,7 @@ class EsliteParser:
             
             # If author not found in dedicated element, search in all text
             if not book_data["author"]:
-                page_text = soup.get_text()
+                page_text = page_text if page_text is not None else document.text()
                 author_match = re.search(r"作者[：:]\s*([^\n\r]+)", page_text)
                 if author_match:
                     book_data["author"] = self._clean_text(author_match.group(1))
@@ -244,9 +253,9 @@ class EsliteParser:
             ]
             
             for selector in publisher_selectors:
-                publisher_elem = soup.select_one(selector)
+                publisher_elem = document.select_one(selector)
                 if publisher_elem:
-                    publisher_text = self._clean_text(publisher_elem.get_text())
+                    publisher_text = self._clean_text(publisher_elem.text())
                     # Remove common prefixes
                     publisher_text = re.sub(r"^出版社[：:]\s*", "", publisher_text)
                     publisher_text = re.sub(r"^Publisher[：:]\s*", "", publisher_text, flags=re.IGNORECASE)
@@ -256,7 +265,7 @@ class EsliteParser:
             
             # If publisher not found in dedicated element, search in all text
             if not book_data["publisher"]:
-                page_text = soup.get_text()
+                page_text = page_text if page_text is not None else document.text()
                 publisher_match = re.search(r"出版社[：:]\s*([^\n\r]+)", page_text)
                 if publisher_match:
                     book_data["publisher"] = self._clean_text(publisher_match.group(1))
@@ -270,9 +279,9 @@ class EsliteParser:
             ]
             
             for selector in price_selectors:
-                price_elem = soup.select_one(selector)
+                price_elem = document.select_one(selector)
                 if price_elem:
-                    price_text = self._clean_text(price_elem.get_text())
+                    price_text = self._clean_text(price_elem.text())
                     price_value = self._parse_price(price_text)
                     if price_value is not None:
                         book_data["price"] = price_value
@@ -280,7 +289,7 @@ class EsliteParser:
             
             # If price not found in dedicated element, search in all text
             if not book_data["price"]:
-                page_text = soup.get_text()
+                page_text = page_text if page_text is not None else document.text()
                 price_match = re.search(r"(?:售價|價格|Price)[：:]\s*[NT$]?\s*(\d+(?:,\d+)*(?:\.\d+)?)", page_text)
                 if price_match:
                     price_value = self._parse_price(price_match.group(0))
@@ -297,9 +306,9 @@ class EsliteParser:
             ]
             
             for selector in category_selectors:
-                category_elem = soup.select_one(selector)
+                category_elem = document.select_one(selector)
                 if category_elem:
-                    category_text = self._clean_text(category_elem.get_text())
+                    category_text = self._clean_text(category_elem.text())
                     if category_text and category_text not in ["首頁", "Home", "商品", "Product"]:
                         book_data["category"] = category_text
                         break
@@ -314,27 +323,26 @@ class EsliteParser:
             print(f"Error parsing book detail for {book_url}: {e}")
             return None
     
-    def _extract_book_from_listing_element(self, element) -> Optional[Dict]:
+    def _extract_book_from_listing_element(self, element: HtmlNode) -> Optional[Dict]:
         """
         Extract book information from a listing page element
         
         Args:
-            element: BeautifulSoup element containing book info
+            element: Parsed element containing book info
             
         Returns:
             Dictionary with product_id and url, or None if extraction failed
         """
         try:
             # Find link to product page
-            link = element.find("a", href=re.compile(r"/(product|goods)/"))
-            if not link:
-                # Try to find any link in the element
-                link = element.find("a")
+            product_links = element.links(r"/(product|goods)/")
+            # Otherwise try any link in the element
+            link = product_links[0] if product_links else element.select_one("a")
             
             if not link:
                 return None
             
-            href = link.get("href", "")
+            href = link.attr("href")
             if not href:
                 return None
             
@@ -344,7 +352,7 @@ class EsliteParser:
                 return {
                     "product_id": product_id or self._generate_id_from_url(href),
                     "url": href if href.startswith("http") else f"https://www.eslite.com{href}",
-                    "title": self._clean_text(link.get_text())
+                    "title": self._clean_text(link.text())
                 }
         except Exception as e:
             print(f"Error extracting book from listing element: {e}")
@@ -4,11 +4,15 @@ Orchestrates the scraping process using all other modules
 """
 
 import time
-from typing import Dict, List, Set
+from typing import Dict, Iterable, Iterator, List, Optional
 from eslite_client import EsliteClient
+from book_database import BookDatabase
+from book_writer import BookWriter
+from category_crawler import CategoryCrawler
+from crawl_journal import CrawlJournal
+from dedupe_store import DedupeStore, create_dedupe_store
 from eslite_parser import EsliteParser
 from data_processor import EsliteDataProcessor
-from database_handler import DatabaseHandler
 import config
 
 
@@ -16,15 +20,28 @@ class EsliteScraper:
     """
     Main scraper class that coordinates the entire scraping process
     Handles category browsing, data retrieval, processing, and storage
+    
+    Progress is written to a crawl journal; with resume=True a run continues
+    each category from its last completed page instead of starting over
     """
     
-    def __init__(self):
+    def __init__(self, resume: bool = False):
         self.client = EsliteClient()
-        self.parser = EsliteParser()
+        self.parser = EsliteParser(config.HTML_PARSER_BACKEND)
         self.processor = EsliteDataProcessor()
-        self.db_handler = DatabaseHandler()
+        self.db_handler = BookDatabase.from_config(config)
+        # Detail fetching hands processed books to this thread instead of waiting for the database
+        self.writer = BookWriter(
+            self.db_handler,
+            config.BATCH_SIZE,
+            config.FLUSH_INTERVAL,
+            config.WRITE_QUEUE_SIZE,
+            on_flush=self._record_written_batch
+        )
         self.target_count = config.TARGET_BOOK_COUNT
         self.batch_size = config.BATCH_SIZE
+        self.resume = resume
+        self.journal = CrawlJournal(config.JOURNAL_PATH, resume)
         
         # Statistics tracking
         self.stats = {
@@ -33,11 +50,15 @@ class EsliteScraper:
             "total_inserted": 0,
             "total_failed": 0,
             "total_duplicates": 0,
-            "total_skipped": 0
+            "total_skipped": 0,
+            "total_resumed": 0,
+            "total_links": 0,
+            "total_refreshed": 0,
+            "total_updated": 0
         }
         
         # Track processed product IDs to avoid duplicates
-        self.processed_product_ids: Set[str] = set()
+        self.processed_product_ids: DedupeStore = create_dedupe_store(config)
     
     def initialize_database(self):
         """
@@ -47,98 +68,73 @@ class EsliteScraper:
         self.db_handler.connect()
         self.db_handler.create_table_if_not_exists()
         
-        # Load existing book IDs to avoid duplicates
-        existing_ids = self.db_handler.get_existing_book_ids()
-        # Filter for Eslite IDs
-        self.processed_product_ids = {
-            id.replace("ESLITE_", "") 
-            for id in existing_ids 
-            if id.startswith("ESLITE_")
-        }
-        print(f"Loaded {len(self.processed_product_ids)} existing Eslite.com books from database")
+        # Stream existing Eslite.com IDs into the dedupe store to avoid duplicates;
+        # a disk store only reads books stored since its last sync
+        loaded = self.processed_product_ids.sync_stored(
+            self.db_handler.iter_existing_book_ids("ESLITE_", self.processed_product_ids.sync_since()),
+            lambda row: [row[0].replace("ESLITE_", "")] if row[0].startswith("ESLITE_") else []
+        )
+        print(f"Loaded {loaded} existing Eslite.com books from database ({len(self.processed_product_ids)} known)")
+        
+        if self.resume:
+            # Links found by the earlier run come from the journal, not from new pages
+            for items in self.journal.items.values():
+                self.processed_product_ids.update(item["product_id"] for item in items if item.get("product_id"))
+            print(f"Resuming from journal: {self.journal.summary()}")
     
-    def collect_book_links_from_categories(self) -> List[Dict]:
+    def iter_book_links_from_categories(self) -> Iterator[Dict]:
         """
-        Collect book links from category pages
-        Returns list of book links and basic info
+        Stream book links from category pages
+        CATEGORY_WORKERS categories are browsed at once, each with its own page
+        cursor and browser, within the host's rate budget; links are yielded as
+        pages arrive
         """
         if not config.ESLITE_CATEGORIES:
             print("No categories configured. Please add category URLs to config.py")
-            return []
-            
-        print("Starting category browsing phase...")
-        book_links = []
+            return
         
-        for category_name, category_url, max_books in config.ESLITE_CATEGORIES:
-            print(f"\nBrowsing category: {category_name}")
-            
-            page = 1
-            books_from_category = []
-            
-            while len(books_from_category) < max_books:
-                print(f"  Fetching page {page}...")
-                
-                html = self.client.get_category_page(category_url, page)
-                if not html:
-                    print(f"  Failed to fetch page {page}, moving to next category")
-                    break
-                
-                # Parse listing page
-                books = self.parser.parse_category_listing(html)
-                
-                if not books:
-                    print(f"  No books found on page {page}, moving to next category")
-                    break
-                
-                # Filter out already processed books
-                new_books = []
-                for book in books:
-                    product_id = book.get("product_id")
-                    if product_id and product_id not in self.processed_product_ids:
-                        new_books.append(book)
-                        self.processed_product_ids.add(product_id)
-                
-                books_from_category.extend(new_books)
-                self.stats["total_fetched"] += len(books)
-                
-                print(f"  Found {len(new_books)} new books (total in category: {len(books_from_category)})")
-                
-                # Check if we have enough books from this category
-                if len(books_from_category) >= max_books:
-                    break
-                
-                # Check if we've reached the end (no new books found)
-                if len(new_books) == 0:
-                    print(f"  No new books found, moving to next category")
-                    break
-                
-                page += 1
-                
-                # Safety limit: don't fetch more than 50 pages per category
-                if page > 50:
-                    print(f"  Reached page limit for category")
-                    break
-            
-            book_links.extend(books_from_category[:max_books])
-            print(f"  Collected {len(books_from_category[:max_books])} books from {category_name}")
-            
-            # Check if we have enough books total
-            if len(book_links) >= self.target_count:
-                print(f"\nReached target count of {self.target_count} books")
-                break
+        print(f"Starting category browsing phase ({config.CATEGORY_WORKERS} categories at a time)...")
+        crawler = CategoryCrawler(
+            config.ESLITE_CATEGORIES,
+            self._fetch_category_listing,
+            self.journal,
+            self.processed_product_ids,
+            self.target_count,
+            config.CATEGORY_WORKERS,
+            on_worker_exit=self.client.close_browser
+        )
+        collected = 0
+        try:
+            for book_link in crawler.links():
+                collected += 1
+                yield book_link
+        finally:
+            self.stats["total_fetched"] += crawler.books_seen
+            self.stats["total_links"] += collected
         
-        print(f"\nCategory browsing complete. Collected {len(book_links)} book links")
-        return book_links[:self.target_count]
+        print(f"\nCategory browsing complete. Collected {collected} book links")
     
-    def fetch_and_process_book_details(self, book_links: List[Dict]) -> List[Dict]:
+    def _fetch_category_listing(self, category_url: str, page: int) -> Optional[List[Dict]]:
+        """
+        Fetch and parse one category listing page on a category worker thread
+        Returns the books on the page, or None if the page could not be fetched
+        """
+        html = self.client.get_category_page(category_url, page)
+        if not html:
+            return None
+        return self.parser.parse_category_listing(html)
+    
+    def fetch_and_process_book_details(self, book_links: Iterable[Dict]) -> int:
         """
         Fetch detailed information for collected book links
-        Returns list of processed book data
+        Links may be a stream (e.g. from concurrent category browsing); each
+        detail page is fetched as soon as its link arrives
+        Each processed book is handed to the writer thread, so database writes
+        overlap with fetching the next pages
+        Returns number of processed books
         """
         print("\nStarting detail fetching phase...")
-        processed_books = []
-        
-        total_links = len(book_links)
+        processed_count = 0
         
         for i, book_link in enumerate(book_links, 1):
             book_url = book_link.get("url")
@@ -148,7 +144,11 @@ class EsliteScraper:
                 self.stats["total_skipped"] += 1
                 continue
             
-            print(f"  [{i}/{total_links}] Fetching details for {product_id or book_url}...")
+            if self.journal.was_fetched(product_id or book_url):
+                self.stats["total_resumed"] += 1
+                continue
+            
+            print(f"  [{i}] Fetching details for {product_id or book_url}...")
             
             # Fetch detail page
             html = self.client.get_book_detail_page(book_url)
@@ -162,6 +162,7 @@ class EsliteScraper:
             if not raw_data:
                 print(f"    Failed to parse detail page")
                 self.stats["total_failed"] += 1
+                self.journal.record_fetched([product_id or book_url])
                 continue
             
             # Process data
@@ -169,51 +170,107 @@ class EsliteScraper:
             if not processed:
                 print(f"    Failed to process book data")
                 self.stats["total_failed"] += 1
+                self.journal.record_fetched([product_id or book_url])
                 continue
             
             # Validate data
             if not self.processor.validate_book_data(processed):
                 print(f"    Invalid book data")
                 self.stats["total_failed"] += 1
+                self.journal.record_fetched([product_id or book_url])
                 continue
             
-            processed_books.append(processed)
+            self.writer.put(processed)
+            processed_count += 1
             self.stats["total_processed"] += 1
             
             print(f"    Success: {processed['name'][:50]}...")
             
             # Print progress every 10 books
             if i % 10 == 0:
-                self._print_progress(len(processed_books), total_links)
+                self._print_progress(processed_count, self.target_count)
         
-        print(f"\nDetail fetching complete. Processed {len(processed_books)} books")
-        return processed_books
+        print(f"\nDetail fetching complete. Processed {processed_count} books")
+        return processed_count
     
-    def save_books_to_database(self, books_data: List[Dict]) -> int:
+    def save_books_to_database(self) -> int:
         """
-        Save processed books to database
+        Wait for the writer thread to store every processed book
         Returns number of successfully inserted books
         """
-        print("\nStarting database insertion phase...")
+        self.writer.close()
+        print(f"\nDatabase insertion complete. Inserted {self.stats['total_inserted']} new books")
+        return self.stats["total_inserted"]
+    
+    def _record_written_batch(self, batch: List[Dict], inserted: int):
+        """
+        Writer thread callback: count a stored batch and journal its books as fetched
+        """
+        self.stats["total_inserted"] += inserted
+        self.stats["total_duplicates"] += (len(batch) - inserted)
+        self.journal.record_fetched(book["book_id"].replace("ESLITE_", "") for book in batch)
         
-        if not books_data:
-            print("No books to insert")
-            return 0
+        print(f"  Inserted {inserted}/{len(batch)} books")
+        self._print_progress(self.stats["total_inserted"], self.target_count)
+    
+    def refresh_stale_books(self, older_than_days: int) -> int:
+        """
+        Refresh mode: fetch stored books again and write only those whose content changed
+        Cached pages are rendered again (the browser cannot send conditional
+        requests), but books whose content did not change cost no database write
+        Returns number of updated books
+        """
+        print(f"Refreshing books not updated for {older_than_days} days...")
+        self.client.cache_max_age = 0
+        after = None
         
-        # Insert in batches
-        total_inserted = 0
-        for i in range(0, len(books_data), self.batch_size):
-            batch = books_data[i:i + self.batch_size]
-            inserted = self.db_handler.insert_books_batch(batch)
-            total_inserted += inserted
-            self.stats["total_inserted"] += inserted
-            self.stats["total_duplicates"] += (len(batch) - inserted)
+        while True:
+            rows = self.db_handler.get_stale_books(older_than_days, after, self.batch_size, prefix="ESLITE_")
+            if not rows:
+                break
+            after = (rows[-1][4], rows[-1][0])
             
-            print(f"  Batch {i//self.batch_size + 1}: Inserted {inserted}/{len(batch)} books")
-            self._print_progress(total_inserted, len(books_data))
+            refreshed = []
+            for book_id, _, _, source_url, _ in rows:
+                html = self.client.get_book_detail_page(source_url) if source_url else None
+                raw_data = self.parser.parse_book_detail(html, source_url) if html else None
+                processed = self.processor.process_book_data(raw_data) if raw_data else None
+                if not processed or not self.processor.validate_book_data(processed):
+                    print(f"    Failed to refresh {book_id}")
+                    self.stats["total_failed"] += 1
+                    continue
+                # Update the stored row even if the page now reports another product ID
+                processed["book_id"] = book_id
+                refreshed.append(processed)
+            
+            updated = self.db_handler.update_changed_books(refreshed)
+            self.stats["total_refreshed"] += len(refreshed)
+            self.stats["total_updated"] += updated
+            print(f"  Checked {len(rows)} books, updated {updated}")
+        
+        print(f"\nRefresh complete. Updated {self.stats['total_updated']} of {self.stats['total_refreshed']} refreshed books")
+        return self.stats["total_updated"]
+    
+    def run_refresh(self, older_than_days: int):
+        """
+        Refresh stored books instead of collecting new ones
+        """
+        print("=" * 60)
+        print("Eslite.com Book Refresh")
+        print("=" * 60)
         
-        print(f"\nDatabase insertion complete. Inserted {total_inserted} new books")
-        return total_inserted
+        try:
+            self.db_handler.connect()
+            self.db_handler.create_table_if_not_exists()
+            self.refresh_stale_books(older_than_days)
+            print(f"Total failed: {self.stats['total_failed']}")
+        finally:
+            if self.client:
+                self.client.close()
+            if self.db_handler.pool:
+                self.db_handler.disconnect()
+            self.journal.close()
+            self.processed_product_ids.close()
     
     def run(self):
         """
@@ -230,23 +287,22 @@ class EsliteScraper:
             # Initialize database
             self.initialize_database()
             
-            # Collect book links from categories
-            book_links = self.collect_book_links_from_categories()
+            # Category pages stream links into the detail stage as they arrive;
+            # the writer thread stores books meanwhile
+            self.writer.start()
+            processed_count = self.fetch_and_process_book_details(self.iter_book_links_from_categories())
             
-            if not book_links:
+            if not self.stats["total_links"]:
                 print("No book links found. Exiting.")
                 return
             
-            # Fetch detailed information
-            books_data = self.fetch_and_process_book_details(book_links)
+            # Wait for the remaining writes
+            self.save_books_to_database()
             
-            if not books_data:
+            if not processed_count:
                 print("No book data processed. Exiting.")
                 return
             
-            # Save to database
-            self.save_books_to_database(books_data)
-            
             # Print final statistics
             self._print_final_stats()
             
@@ -256,11 +312,14 @@ class EsliteScraper:
             traceback.print_exc()
             raise
         finally:
-            # Close connections
+            # Flush queued books before closing connections
+            self.writer.close()
             if self.client:
                 self.client.close()
-            if self.db_handler.connection:
+            if self.db_handler.pool:
                 self.db_handler.disconnect()
+            self.journal.close()
+            self.processed_product_ids.close()
     
     def _print_progress(self, current: int, total: int):
         """
@@ -282,5 +341,7 @@ class EsliteScraper:
         print(f"Total duplicates skipped: {self.stats['total_duplicates']}")
         print(f"Total failed: {self.stats['total_failed']}")
         print(f"Total skipped: {self.stats['total_skipped']}")
+        print(f"Already fetched in an earlier run: {self.stats['total_resumed']}")
+        self.client.rate_controller.print_stats()
         print("=" * 60)
 
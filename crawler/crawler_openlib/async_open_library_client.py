@@ -0,0 +1,346 @@
+"""
+Async Open Library API client module
+Issues API requests concurrently over a pooled connection under a shared rate limit
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import aiohttp
+from urllib.parse import quote
+from typing import Awaitable, Callable, Dict, List, Optional
+import config
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crawler_common"))
+from rate_controller import AdaptiveRateController
+from response_cache import ResponseCache
+
+
+class AsyncOpenLibraryClient:
+    """
+    Asyncio-based client for interacting with Open Library API
+    Handles search, book details retrieval, and error handling
+
+    Requests share one pooled aiohttp session, at most MAX_CONCURRENT_REQUESTS
+    are in flight at once, and the adaptive rate controller paces the host
+
+    Concurrent author/work/edition lookups for the same key are coalesced:
+    callers await one shared in-flight request and share its parsed result
+    """
+
+    def __init__(self, rate_controller: Optional[AdaptiveRateController] = None, response_cache: Optional[ResponseCache] = None):
+        self.base_search_url = config.OPEN_LIBRARY_SEARCH_URL
+        self.base_books_url = config.OPEN_LIBRARY_BOOKS_URL
+        self.base_works_url = config.OPEN_LIBRARY_WORKS_URL
+        self.base_book_detail_url = config.OPEN_LIBRARY_BOOKS_DETAIL_URL
+        self.max_retries = config.MAX_RETRIES
+        self.retry_delay = config.RETRY_DELAY
+        self.timeout = aiohttp.ClientTimeout(total=config.TIMEOUT)
+        self.max_concurrency = config.MAX_CONCURRENT_REQUESTS
+        self.headers = {
+            "User-Agent": config.USER_AGENT,
+            "Accept": "application/json"
+        }
+        self.rate_controller = rate_controller or AdaptiveRateController.from_config(config)
+        self.cache = response_cache or ResponseCache.from_config(config)
+        self.cache_max_age: Optional[float] = None  # Overrides CACHE_TTL; 0 revalidates every cached response
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0  # Lookups served by another caller's in-flight request
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """
+        Create the pooled HTTP session
+        Must be called from inside the running event loop
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=self.timeout
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        """
+        Close the pooled HTTP session
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _make_request(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Make HTTP request with retry logic and error handling
+        Returns JSON response or None if request fails
+        Fresh cached responses are returned without touching the network;
+        stale ones are revalidated with ETag / If-Modified-Since
+        """
+        await self.open()
+
+        # aiohttp only accepts string query values
+        if params:
+            params = {k: str(v) for k, v in params.items()}
+
+        # Cache lookups read SQLite and gzip files, so they run on the default executor
+        loop = asyncio.get_running_loop()
+        cache_key = None
+        cached = None
+        if self.cache:
+            cache_key = self.cache.make_key("GET", url, params)
+            cached = await loop.run_in_executor(None, self.cache.get, cache_key, self.cache_max_age)
+            if cached and cached["fresh"]:
+                return json.loads(cached["body"])
+
+        headers = ResponseCache.validation_headers(cached)
+
+        for attempt in range(self.max_retries):
+            response = None
+            start = time.monotonic()
+            try:
+                async with self._semaphore:
+                    await self.rate_controller.acquire_async(url)
+                    start = time.monotonic()
+                    async with self.session.get(url, params=params, headers=headers) as response:
+                        self.rate_controller.record_response(
+                            url,
+                            response.status,
+                            time.monotonic() - start,
+                            response.headers.get("Retry-After")
+                        )
+                        if response.status == 304 and cached:
+                            await loop.run_in_executor(None, self.cache.mark_revalidated, cache_key)
+                            return json.loads(cached["body"])
+                        response.raise_for_status()
+                        body = await response.read()
+                        result = json.loads(body)
+                        if self.cache:
+                            await loop.run_in_executor(
+                                None,
+                                self.cache.put,
+                                cache_key,
+                                body,
+                                response.headers.get("ETag"),
+                                response.headers.get("Last-Modified")
+                            )
+                        return result
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                if response is None:
+                    self.rate_controller.record_response(url, None, time.monotonic() - start)
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self.retry_delay * (attempt + 1))
+                    continue
+                else:
+                    print(f"Request failed after {self.max_retries} attempts: {e}")
+                    return None
+
+    async def _single_flight(self, key: str, fetch: Callable[[], Awaitable[Optional[Dict]]]) -> Optional[Dict]:
+        """
+        Run fetch once per key among concurrent callers
+        Callers arriving while a request for key is in flight await that request;
+        the key is released as soon as it completes, so later calls fetch again
+        (repeat lookups are served by the response cache instead)
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fetch())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one cancelled caller does not cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def search_books(self, query: str, limit: int = 100, offset: int = 0, fields: Optional[str] = None) -> Optional[Dict]:
+        """
+        Search for books using a query string
+        Returns search results JSON or None if request fails
+        """
+        params = {
+            "q": query,
+            "limit": limit,
+            "offset": offset,
+            "fields": fields or config.SEARCH_FIELDS
+        }
+
+        return await self._make_request(self.base_search_url, params)
+
+    async def get_book_by_isbn(self, isbn: str) -> Optional[Dict]:
+        """
+        Get book details by ISBN
+        Returns book data JSON or None if request fails
+        """
+        result = await self.get_books_by_isbns([isbn])
+        return result.get(isbn)
+
+    async def get_books_by_isbns(self, isbns: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get multiple books by ISBNs in as few requests as possible
+        Returns dictionary mapping ISBN to book data
+        """
+        result = await self.get_books_by_bibkeys([f"ISBN:{isbn}" for isbn in isbns])
+        return {bibkey[len("ISBN:"):]: data for bibkey, data in result.items()}
+
+    async def get_books_by_olids(self, edition_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get multiple editions by Open Library edition key in as few requests as possible
+        Accepts "/books/OL1234567M" or "OL1234567M"
+        Returns dictionary mapping each given key to book data
+        """
+        bibkeys = {f"OLID:{_extract_id(edition_id)}": edition_id for edition_id in edition_ids}
+        result = await self.get_books_by_bibkeys(list(bibkeys))
+        return {bibkeys[bibkey]: data for bibkey, data in result.items()}
+
+    async def get_books_by_bibkeys(self, bibkeys: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get books for a list of bibkeys (e.g. "ISBN:...", "OLID:...")
+        URL-length-aware chunks are requested concurrently
+        Returns dictionary mapping bibkey to book data (None if not found);
+        keys from failed requests are omitted
+        """
+        chunks = chunk_bibkeys(bibkeys, self.base_books_url)
+        results = await asyncio.gather(*[
+            self._make_request(self.base_books_url, {
+                "bibkeys": ",".join(chunk),
+                "format": "json",
+                "jscmd": "data"
+            })
+            for chunk in chunks
+        ])
+
+        books_data = {}
+        for chunk, result in zip(chunks, results):
+            if result is None:
+                continue
+            for bibkey in chunk:
+                books_data[bibkey] = result.get(bibkey)
+
+        return books_data
+
+    async def get_work_details(self, work_id: str) -> Optional[Dict]:
+        """
+        Get work details by work ID (Open Library work identifier)
+        Accepts "/works/OL74502W", "works/OL74502W" or "OL74502W"
+        """
+        work_id = _extract_id(work_id)
+        return await self._single_flight(
+            f"work:{work_id}",
+            lambda: self._make_request(f"{self.base_works_url}/{work_id}.json")
+        )
+
+    async def get_book_details(self, book_id: str) -> Optional[Dict]:
+        """
+        Get book details by book ID (Open Library book identifier)
+        Accepts "/books/OL1234567M", "books/OL1234567M" or "OL1234567M"
+        """
+        book_id = _extract_id(book_id)
+        return await self._single_flight(
+            f"book:{book_id}",
+            lambda: self._make_request(f"{self.base_book_detail_url}/{book_id}.json")
+        )
+
+    async def get_author_details(self, author_key: str) -> Optional[Dict]:
+        """
+        Get author details by author key (Open Library author identifier)
+        Accepts "/authors/OL1234567A", "authors/OL1234567A" or "OL1234567A"
+        """
+        author_key = _extract_id(author_key)
+        return await self._single_flight(
+            f"author:{author_key}",
+            lambda: self._make_request(f"https://openlibrary.org/authors/{author_key}.json")
+        )
+
+    async def get_first_edition_key(self, work_key: str) -> Optional[str]:
+        """
+        Get the key of a work's first edition with a single editions.json request
+        Returns edition key (e.g. "/books/OL1234567M") or None if the work has none
+        """
+        work_key = _extract_id(work_key)
+        editions_url = f"https://openlibrary.org/works/{work_key}/editions.json"
+        return _first_edition_key(await self._make_request(editions_url, {"limit": 1}))
+
+    async def get_edition_from_work(self, work_data: Dict) -> Optional[Dict]:
+        """
+        Get the first available edition of a work
+        Queries the work's editions.json, falling back to editions embedded in work_data
+        Returns edition data JSON or None if not found
+        """
+        work_key = work_data.get("key")
+        if not work_key:
+            return None
+
+        work_key = _extract_id(work_key)
+        editions_url = f"https://openlibrary.org/works/{work_key}/editions.json"
+        editions_result = await self._make_request(editions_url)
+
+        edition_key = _first_edition_key(editions_result)
+        if not edition_key and isinstance(work_data.get("editions"), dict):
+            edition_key = _first_edition_key(work_data["editions"])
+
+        if edition_key:
+            return await self.get_book_details(edition_key)
+
+        return None
+
+
+def _extract_id(key: str) -> str:
+    """
+    Strip path prefixes from an Open Library key ("/works/OL1W" -> "OL1W")
+    """
+    return key.strip("/").split("/")[-1]
+
+
+def _first_edition_key(editions: Optional[Dict]) -> Optional[str]:
+    """
+    Return the key of the first entry in an editions listing, if any
+    """
+    if not editions or "entries" not in editions:
+        return None
+
+    entries = editions["entries"]
+    if isinstance(entries, list) and len(entries) > 0:
+        first_edition = entries[0]
+        if isinstance(first_edition, dict) and "key" in first_edition:
+            return first_edition["key"]
+
+    return None
+
+
+def chunk_bibkeys(bibkeys: List[str], base_url: str) -> List[List[str]]:
+    """
+    Split bibkeys into request-sized groups
+    Each group holds at most BIBKEYS_BATCH_SIZE keys and its encoded request
+    URL stays under MAX_URL_LENGTH
+    """
+    # "?bibkeys=" plus "&format=json&jscmd=data"
+    fixed_length = len(base_url) + len("?bibkeys=") + len("&format=json&jscmd=data")
+
+    chunks = []
+    current = []
+    current_length = fixed_length
+    for bibkey in dict.fromkeys(bibkeys):
+        # Commas between keys are encoded as %2C
+        key_length = len(quote(bibkey, safe="")) + (3 if current else 0)
+        if current and (len(current) >= config.BIBKEYS_BATCH_SIZE
+                        or current_length + key_length > config.MAX_URL_LENGTH):
+            chunks.append(current)
+            current = []
+            current_length = fixed_length
+            key_length -= 3
+        current.append(bibkey)
+        current_length += key_length
+
+    if current:
+        chunks.append(current)
+    return chunks
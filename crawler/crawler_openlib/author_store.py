@@ -0,0 +1,72 @@
+"""
+Author store module
+Persistent author key to author name mapping shared across books and runs
+"""
+
+import sqlite3
+from typing import Dict, Iterable
+
+
+class AuthorStore:
+    """
+    SQLite-backed store of resolved Open Library author names
+    Lets the scraper request each author once ever instead of once per book
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # Shared by every worker process on a host: WAL lets readers run during a
+        # write, and writers wait up to timeout seconds for each other
+        self.connection = sqlite3.connect(db_path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS authors (
+                author_key TEXT PRIMARY KEY,
+                name TEXT NOT NULL
+            )
+        """)
+        self.connection.commit()
+
+    def get_names(self, author_keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up names for the given author keys
+        Returns dictionary mapping known author keys to names
+        """
+        author_keys = list(set(author_keys))
+        names = {}
+
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(author_keys), 500):
+            chunk = author_keys[i:i + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            rows = self.connection.execute(
+                f"SELECT author_key, name FROM authors WHERE author_key IN ({placeholders})",
+                chunk
+            ).fetchall()
+            names.update(rows)
+
+        return names
+
+    def save_names(self, names: Dict[str, str]):
+        """
+        Store resolved author names
+        """
+        if not names:
+            return
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO authors (author_key, name) VALUES (?, ?)",
+            names.items()
+        )
+        self.connection.commit()
+
+    def count(self) -> int:
+        """
+        Get number of authors in the store
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM authors").fetchone()[0]
+
+    def close(self):
+        """
+        Close the store
+        """
+        self.connection.close()
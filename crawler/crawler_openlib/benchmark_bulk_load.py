@@ -0,0 +1,120 @@
+"""
+Bulk load benchmark
+Compares execute_values and COPY inserts of synthetic books into a scratch table,
+into an empty table and into one that already holds a share of the rows
+
+Usage:
+    python benchmark_bulk_load.py [--sizes 10000 100000 1000000] [--batch-size 10000] [--existing-share 0.3]
+"""
+
+import os
+import sys
+import time
+import argparse
+from typing import Callable, Dict, Iterator, List
+from database_handler import DatabaseHandler
+import config
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crawler_common"))
+from bulk_loader import copy_books, insert_books_values
+
+SCRATCH_TABLE = "books_load_benchmark"
+
+
+def synthetic_book(i: int, book_id: str) -> Dict:
+    """
+    Build synthetic book number i; its ISBN depends only on i
+    """
+    return {
+        "book_id": book_id,
+        "name": f"Benchmark Book {i}",
+        "publisher": f"Publisher {i % 500}",
+        "author": f"Author {i % 5000}",
+        "price": i % 1000,
+        "isbn": f"{9780000000000 + i}",
+        "open_library_id": None,
+        "source_url": f"https://example.com/books/{i}"
+    }
+
+
+def synthetic_batches(count: int, batch_size: int) -> Iterator[List[Dict]]:
+    """
+    Generate count unique book rows in batches
+    """
+    for start in range(0, count, batch_size):
+        yield [synthetic_book(i, f"BENCH_{i}") for i in range(start, min(start + batch_size, count))]
+
+
+def existing_books(count: int, share: float) -> List[Dict]:
+    """
+    Rows stored before a timed load so that share of its count rows are already
+    known: every other one under the same book_id, the rest only under the same ISBN
+    """
+    rows = []
+    for i in range(count):
+        if int((i + 1) * share) > int(i * share):
+            rows.append(synthetic_book(i, f"BENCH_{i}" if len(rows) % 2 == 0 else f"STORED_{i}"))
+    return rows
+
+
+def time_loader(connection, loader: Callable, count: int, batch_size: int, existing_share: float = 0.0) -> float:
+    """
+    Load count rows into the scratch table, one transaction per batch, after
+    storing existing_share of them untimed
+    Returns elapsed seconds
+    """
+    cursor = connection.cursor()
+    cursor.execute(f"TRUNCATE {SCRATCH_TABLE}")
+    existing = existing_books(count, existing_share)
+    for start in range(0, len(existing), batch_size):
+        copy_books(cursor, existing[start:start + batch_size], SCRATCH_TABLE)
+    connection.commit()
+
+    start = time.perf_counter()
+    inserted = 0
+    for batch in synthetic_batches(count, batch_size):
+        inserted += loader(cursor, batch, SCRATCH_TABLE)
+        connection.commit()
+    elapsed = time.perf_counter() - start
+    cursor.close()
+
+    if inserted != count - len(existing):
+        print(f"  Warning: inserted {inserted} of {count - len(existing)} new rows")
+    return elapsed
+
+
+def main():
+    """
+    Run both loaders at every size and print rows/sec
+    """
+    parser = argparse.ArgumentParser(description="Benchmark execute_values against COPY for bulk book inserts")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="Row counts to load")
+    parser.add_argument("--batch-size", type=int, default=config.DUMP_BATCH_SIZE, help="Rows per insert call and transaction")
+    parser.add_argument("--existing-share", type=float, default=0.3, help="Share of rows already stored in the second run (0 skips it)")
+    args = parser.parse_args()
+
+    db_handler = DatabaseHandler()
+    db_handler.connect()
+    try:
+        db_handler.create_table_if_not_exists()
+        with db_handler.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+            cursor.execute(f"CREATE TABLE {SCRATCH_TABLE} (LIKE books INCLUDING ALL)")
+
+        shares = [0.0] + ([args.existing_share] if args.existing_share > 0 else [])
+        print(f"{'rows':>10} {'existing':>9} {'execute_values':>18} {'COPY':>18} {'speedup':>8}")
+        with db_handler.connection() as connection:
+            for count in args.sizes:
+                for share in shares:
+                    values_time = time_loader(connection, insert_books_values, count, args.batch_size, share)
+                    copy_time = time_loader(connection, copy_books, count, args.batch_size, share)
+                    print(f"{count:>10} {share:>8.0%} {count / values_time:>12.0f} row/s {count / copy_time:>12.0f} row/s "
+                          f"{values_time / copy_time:>7.1f}x")
+    finally:
+        with db_handler.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+        db_handler.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@ Configuration file for Open Library scraper
 Contains API endpoints, database settings, and scraping parameters
 """
 
+import os
+
 # Open Library API endpoints
 OPEN_LIBRARY_SEARCH_URL = "https://openlibrary.org/search.json"
 OPEN_LIBRARY_BOOKS_URL = "https://openlibrary.org/api/books"
@@ -15,6 +17,62 @@ MAX_RETRIES = 3  # Maximum number of retry attempts
 RETRY_DELAY = 2  # Delay before retry in seconds
 TIMEOUT = 30  # Request timeout in seconds
 
+# Response cache settings (shared on-disk cache, see crawler_common/response_cache.py)
+CACHE_ENABLED = True  # Serve repeated requests from the local cache
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache")
+CACHE_MAX_SIZE_MB = 500  # Least recently used entries are evicted above this size
+CACHE_TTL = 7 * 24 * 3600  # Seconds before an entry is revalidated with the server
+
+# Concurrency settings (async client)
+RATE_LIMIT_BURST = 1  # Number of requests that may be sent back-to-back
+MAX_CONCURRENT_REQUESTS = 5  # Maximum number of in-flight requests
+
+# Streaming pipeline settings (search -> detail -> process -> insert)
+PIPELINE_QUEUE_SIZE = 200  # Maximum items waiting between two stages; a full queue pauses the stage feeding it
+DETAIL_WORKERS = 3  # Concurrent detail and process workers
+FLUSH_INTERVAL = 5  # Seconds before a partial batch is written to the database
+
+# Adaptive rate control (AIMD per host, see crawler_common/rate_controller.py)
+INITIAL_REQUESTS_PER_SECOND = 1 / REQUEST_DELAY  # Starting politeness budget shared by all requests
+MIN_REQUESTS_PER_SECOND = 1 / (RETRY_DELAY * 2)  # Never back off below this rate
+MAX_REQUESTS_PER_SECOND = 3.0  # Never ramp up beyond this rate
+RATE_INCREASE_STEP = 0.05  # Added to the rate after each healthy response
+RATE_DECREASE_FACTOR = 0.5  # Rate multiplier on 429/5xx, failures or rising latency
+LATENCY_BACKOFF_FACTOR = 3.0  # Back off when latency exceeds this multiple of the baseline
+
+# Dedupe store settings (see crawler_common/dedupe_store.py)
+# "memory" keeps known books in a Python set reloaded from the database on every run;
+# "disk" uses a memory-mapped Bloom filter plus an exact SQLite table that persists
+# across runs and only loads books stored since the last run
+DEDUPE_BACKEND = "memory"
+DEDUPE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dedupe.db")
+DEDUPE_EXPECTED_ITEMS = 10000000  # Identity keys of known books the Bloom filter is sized for
+DEDUPE_FALSE_POSITIVE_RATE = 0.001  # Bloom false positives cost one extra SQLite lookup
+DEDUPE_SYNC_OVERLAP = 300  # Seconds of stored books re-read on each sync; must exceed the longest insert transaction
+
+# Crawl journal (completed search pages and stored books, used by --resume)
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crawl_journal.jsonl")
+
+# Query scheduling (see query_scheduler.py)
+QUERY_YIELD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_yield.db")
+YIELD_SMOOTHING = 0.5  # Weight of the latest request in a query's expected new books per request
+DUPLICATE_ABANDON_RATIO = 0.9  # Stop paginating a query once this share of a page is already known
+
+# Refresh mode (main.py --refresh)
+REFRESH_AFTER_DAYS = 30  # Books not updated for this many days are fetched again
+
+# Distributed crawl settings (see distributed_crawl.py and work_queue.py)
+WORKER_PROCESSES = 4  # Worker processes started per host; all workers split the global request budget
+WORK_ITEM_TIMEOUT = 600  # Seconds before a claimed page of a crashed worker is handed out again
+WORK_QUEUE_POLL_INTERVAL = 5  # Seconds an idle worker waits for other workers to queue follow-up pages
+
+# Author name store (persists author key -> name across runs)
+AUTHOR_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "authors.db")
+
+# Dump ingestion settings (see dump_importer.py)
+DUMP_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dump_index.db")
+DUMP_BATCH_SIZE = 10000  # Dump records processed and inserted per batch (large enough for the COPY path)
+
 # User agent for API requests
 USER_AGENT = "RentalBookstoreSystem/1.0 (Contact: your-email@example.com)"
 
@@ -26,10 +84,14 @@ DB_CONFIG = {
     "user": "amy",
     "password": "postgres"
 }
+DB_POOL_SIZE = 4  # Maximum pooled database connections; each worker borrows its own per operation
 
 # Scraping settings
 TARGET_BOOK_COUNT = 1000  # Target number of books to scrape
 BATCH_SIZE = 50  # Number of books to process in each batch
+COPY_THRESHOLD = 5000  # Batches of at least this many rows are loaded with COPY through a staging table
+BIBKEYS_BATCH_SIZE = 50  # Maximum bibkeys (ISBN/OLID) per api/books request
+MAX_URL_LENGTH = 2000  # Keep api/books request URLs under this length
 SEARCH_LIMIT = 100  # Maximum results per search query
 
 # Search strategy settings
@@ -37,3 +99,16 @@ SUBJECTS_PER_CATEGORY = 50  # Number of books to fetch per subject
 AUTHORS_PER_AUTHOR = 30  # Number of books to fetch per author
 KEYWORDS_PER_QUERY = 40  # Number of books to fetch per keyword query
 
+# Frontier expansion: authors and subjects of newly found books become new queries
+FRONTIER_MAX_QUERIES = 500  # Harvested queries added per run (0 disables expansion)
+FRONTIER_FANOUT = 5  # Harvested queries added after each finished query
+FRONTIER_MIN_HITS = 2  # Times an author or subject must be seen before it becomes a query
+FRONTIER_TERMS_PER_DOC = 3  # Authors and subjects taken from each search result
+
+# Search field projections (author_name and subject also feed the search frontier)
+SEARCH_FIELDS = "key,title,author_name,subject,edition_key,isbn,isbn_10,isbn_13"
+# Search-only mode also requests publisher so each search page yields complete records;
+# detail requests are only issued for docs missing publisher or author
+SEARCH_ONLY_MODE = False
+SEARCH_ONLY_FIELDS = "key,title,author_name,subject,publisher,edition_key,isbn,isbn_10,isbn_13"
+
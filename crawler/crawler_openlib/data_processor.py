@@ -168,6 +168,14 @@ class DataProcessor:
             if len(data["isbn_10"]) > 0:
                 return str(data["isbn_10"][0])
         
+        # Try identifiers object (api/books jscmd=data format)
+        identifiers = data.get("identifiers")
+        if isinstance(identifiers, dict):
+            for field in ["isbn_13", "isbn_10"]:
+                values = identifiers.get(field)
+                if isinstance(values, list) and len(values) > 0:
+                    return str(values[0])
+        
         # Try single ISBN field
         if "isbn" in data:
             isbn = data["isbn"]
@@ -227,10 +235,17 @@ class DataProcessor:
         
         return processed_data
     
-    def process_search_result(self, search_result: Dict) -> List[Dict]:
+    def process_search_result(self, search_result: Dict, build_records: bool = False, related_terms: int = 0) -> List[Dict]:
         """
         Process search results to extract book identifiers
         Returns list of book identifiers (ISBNs or Open Library IDs)
+        
+        Args:
+            search_result: Search response JSON
+            build_records: If True, identifiers whose search doc already holds every
+                           required field carry a ready-to-insert "record"
+            related_terms: If set, identifiers carry up to this many of the doc's
+                           author names and subjects as "related" (frontier expansion)
         """
         book_identifiers = []
         
@@ -245,55 +260,108 @@ class DataProcessor:
             if not isinstance(doc, dict):
                 continue
             
-            # Try to get ISBN first (preferred for detail lookup)
-            # Note: Search API returns works, not editions, so ISBN may not be directly available
-            # But some works may have ISBN in the response if requested via fields parameter
-            isbn = None
-            if "isbn" in doc:
-                isbn_list = doc["isbn"]
-                if isinstance(isbn_list, list) and len(isbn_list) > 0:
-                    isbn = str(isbn_list[0])
-            
-            # Also check for isbn_10 and isbn_13 fields
-            if not isbn:
-                if "isbn_10" in doc:
-                    isbn_list = doc["isbn_10"]
-                    if isinstance(isbn_list, list) and len(isbn_list) > 0:
-                        isbn = str(isbn_list[0])
-                elif "isbn_13" in doc:
-                    isbn_list = doc["isbn_13"]
-                    if isinstance(isbn_list, list) and len(isbn_list) > 0:
-                        isbn = str(isbn_list[0])
+            identifier = self._extract_search_identifier(doc)
+            if not identifier:
+                continue
             
-            # Prioritize edition_key over work key (editions have more complete info)
-            key = None
-            if "edition_key" in doc:
-                # Edition keys provide more complete information (publisher, ISBN, etc.)
-                edition_keys = doc["edition_key"]
-                if isinstance(edition_keys, list) and len(edition_keys) > 0:
-                    key = f"/books/{edition_keys[0]}"
+            if build_records:
+                record = self.process_search_doc(doc)
+                if record:
+                    identifier["record"] = record
             
-            # Fallback to work key if no edition key
-            if not key:
-                key = doc.get("key")
+            if related_terms:
+                identifier["related"] = self.extract_related_terms(doc, related_terms)
             
-            # Use key if available (will be used to fetch details)
-            if key and isinstance(key, str):
-                book_identifiers.append({
-                    "type": "key",
-                    "value": key,
-                    "isbn": isbn  # Include ISBN if found, but use key for lookup
-                })
-            elif isbn:
-                # If we have ISBN but no key, use ISBN for lookup
-                book_identifiers.append({
-                    "type": "isbn",
-                    "value": isbn,
-                    "isbn": isbn
-                })
+            book_identifiers.append(identifier)
         
         return book_identifiers
     
+    def process_search_doc(self, doc: Dict) -> Optional[Dict]:
+        """
+        Build a complete book record directly from a search doc
+        Requires the search to request the publisher and author_name fields
+        Returns None if any required field is missing, so the caller falls back
+        to a detail fetch for that book
+        """
+        edition_keys = doc.get("edition_key")
+        if not isinstance(edition_keys, list) or len(edition_keys) == 0:
+            return None
+        
+        edition_id = str(edition_keys[0])
+        data = {
+            "key": f"/books/{edition_id}",
+            "title": doc.get("title"),
+            "publisher": doc.get("publisher"),
+            "author_name": doc.get("author_name")
+        }
+        
+        processed = self.process_book_data(data, self._first_search_isbn(doc))
+        if not processed or not processed["publisher"] or not processed["author"]:
+            return None
+        
+        return processed
+    
+    def extract_related_terms(self, doc: Dict, limit: int) -> Dict[str, List[str]]:
+        """
+        Get the first author names and subjects of a search doc
+        Returns dictionary with "author" and "subject" lists
+        """
+        terms = {}
+        for query_type, field in [("author", "author_name"), ("subject", "subject")]:
+            values = doc.get(field)
+            if not isinstance(values, list):
+                values = []
+            cleaned = [self._clean_text(value) for value in values[:limit]]
+            terms[query_type] = [value for value in cleaned if value]
+        return terms
+    
+    def _extract_search_identifier(self, doc: Dict) -> Optional[Dict]:
+        """
+        Extract the identifier used to look up details for one search doc
+        """
+        isbn = self._first_search_isbn(doc)
+        
+        # Prioritize edition_key over work key (editions have more complete info)
+        key = None
+        if "edition_key" in doc:
+            # Edition keys provide more complete information (publisher, ISBN, etc.)
+            edition_keys = doc["edition_key"]
+            if isinstance(edition_keys, list) and len(edition_keys) > 0:
+                key = f"/books/{edition_keys[0]}"
+        
+        # Fallback to work key if no edition key
+        if not key:
+            key = doc.get("key")
+        
+        # Use key if available (will be used to fetch details)
+        if key and isinstance(key, str):
+            return {
+                "type": "key",
+                "value": key,
+                "work_key": doc.get("key"),  # Lets the identity index match the same work via any edition
+                "isbn": isbn  # Include ISBN if found, but use key for lookup
+            }
+        elif isbn:
+            # If we have ISBN but no key, use ISBN for lookup
+            return {
+                "type": "isbn",
+                "value": isbn,
+                "isbn": isbn
+            }
+        
+        return None
+    
+    def _first_search_isbn(self, doc: Dict) -> Optional[str]:
+        """
+        Get the first ISBN listed in a search doc
+        Note: Search API returns works, so ISBNs are only present if requested via fields
+        """
+        for field in ["isbn", "isbn_10", "isbn_13"]:
+            isbn_list = doc.get(field)
+            if isinstance(isbn_list, list) and len(isbn_list) > 0:
+                return str(isbn_list[0])
+        return None
+    
     def _clean_text(self, text: str) -> str:
         """
         Clean and normalize text data
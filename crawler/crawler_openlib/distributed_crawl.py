@@ -0,0 +1,261 @@
+"""
+Distributed crawl module
+Shards the Open Library crawl across worker processes through a PostgreSQL work queue
+
+Usage:
+    python distributed_crawl.py seed [--reset]       # coordinator: queue the first page of every query
+    python distributed_crawl.py work --processes 4   # start workers on this host
+    python distributed_crawl.py status               # show queue progress
+"""
+
+import os
+import sys
+import socket
+import asyncio
+import argparse
+import multiprocessing
+from typing import Dict
+from scraper import BookScraper
+from async_open_library_client import AsyncOpenLibraryClient
+from rate_controller import AdaptiveRateController
+from database_handler import DatabaseHandler
+from search_strategy import SearchStrategy
+from query_scheduler import QueryScheduler
+from work_queue import WorkQueue
+import config
+
+
+def _worker_path(path: str, worker_id: str) -> str:
+    """
+    Give a worker its own copy of a local file ("dedupe.db" -> "dedupe.host-0.db")
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker_id}{ext}"
+
+
+class QueueWorker(BookScraper):
+    """
+    BookScraper whose search stage claims (query, offset) pages from the work queue
+    instead of walking SearchStrategy itself; detail, process and insert stages are unchanged
+
+    Every worker paces itself with its share of the global request budget and
+    refreshes its identity index from the books table before filtering each page,
+    so books stored by other workers are not fetched again
+    """
+
+    def __init__(self, worker_id: str, share: float = 1.0):
+        super().__init__(
+            journal_path=_worker_path(config.JOURNAL_PATH, worker_id),
+            dedupe_path=_worker_path(config.DEDUPE_PATH, worker_id)
+        )
+        self.worker_id = worker_id
+        self.rate_controller = AdaptiveRateController.from_config(config, share)
+        self.work_queue = None
+        self.stats["work_items"] = 0
+
+    async def search_and_collect_books(self, client: AsyncOpenLibraryClient, identifier_queue: asyncio.Queue) -> int:
+        """
+        Search stage: claim and crawl work items until the queue is drained or the
+        global target is reached
+        The work queue keeps one pooled connection for the whole stage, so claims
+        are not held up by inserts running on the other connections
+        Returns number of identifiers queued
+        """
+        connection = await self._run_blocking(self.db_handler.acquire)
+        self.work_queue = WorkQueue(connection)
+        try:
+            queued = await self._claim_work_items(client, identifier_queue)
+        finally:
+            await self._run_blocking(self.db_handler.release, connection)
+
+        print(f"[{self.worker_id}] Search stage complete. Queued {queued} book identifiers")
+        return queued
+
+    async def _claim_work_items(self, client: AsyncOpenLibraryClient, identifier_queue: asyncio.Queue) -> int:
+        """
+        Claim and crawl work items until none are left or the global target is reached
+        Returns number of identifiers queued
+        """
+        queued = 0
+        while True:
+            if await self._run_blocking(self.work_queue.total_new_books) >= self.target_count:
+                print(f"[{self.worker_id}] Reached global target of {self.target_count} books")
+                break
+
+            item = await self._run_blocking(self.work_queue.claim, self.worker_id)
+            if not item:
+                # Other workers may still queue follow-up pages of their items
+                await self._run_blocking(self.work_queue.release_stale, config.WORK_ITEM_TIMEOUT)
+                status_counts = await self._run_blocking(self.work_queue.status_counts)
+                if status_counts.get("claimed", 0) == 0:
+                    print(f"[{self.worker_id}] Work queue drained")
+                    break
+                await asyncio.sleep(config.WORK_QUEUE_POLL_INTERVAL)
+                continue
+
+            queued += await self._crawl_work_item(client, item, identifier_queue)
+
+        return queued
+
+    async def _crawl_work_item(self, client: AsyncOpenLibraryClient, item: Dict, identifier_queue: asyncio.Queue) -> int:
+        """
+        Search one claimed page, queue its new books and mark it done
+        Queues the query's next page while the query still needs books
+        Returns number of identifiers queued
+        """
+        print(f"[{self.worker_id}] Searching: {item['type']} - {item['query']} (offset {item['offset']})")
+        page = await self._search_page(client, item["query"], item["offset"])
+        if not page:
+            await self._run_blocking(self.work_queue.fail, item["id"], config.MAX_RETRIES)
+            return 0
+        identifiers, num_found = page
+
+        # Pick up books other workers stored since the last page
+        await self._run_blocking(self.db_handler.load_identity_index, self.identity_index)
+        new_identifiers = self._filter_new_identifiers(identifiers)
+        self._harvest_related(new_identifiers)
+        abandoned = self.scheduler.should_abandon(len(identifiers), len(new_identifiers))
+        for identifier in new_identifiers:
+            self.identity_index.add_identifier(identifier)
+            await identifier_queue.put(identifier)
+
+        await self._run_blocking(self.work_queue.complete, item["id"], len(new_identifiers))
+        self.stats["work_items"] += 1
+
+        next_offset = item["offset"] + self.search_limit
+        query_limit = self._get_limit_for_query_type(item["type"])
+        if abandoned:
+            print(f"[{self.worker_id}] Abandoning query: {item['query']}")
+            self.stats["queries_abandoned"] += 1
+        elif next_offset < num_found and await self._run_blocking(self.work_queue.new_books_for_query, item["query"]) < query_limit:
+            await self._run_blocking(
+                self.work_queue.enqueue,
+                [{"query": item["query"], "type": item["type"], "offset": next_offset}]
+            )
+
+        # Frontier queries go to the shared queue; pages already queued by another worker are ignored
+        frontier_queries = self.strategy.take_frontier_queries(self.frontier_fanout)
+        if frontier_queries:
+            self.stats["frontier_queries"] += await self._run_blocking(self.work_queue.enqueue, [
+                {"query": query_info["query"], "type": query_info["type"], "offset": 0}
+                for query_info in frontier_queries
+            ])
+
+        return len(new_identifiers)
+
+    async def _run_blocking(self, function, *args):
+        """
+        Run a blocking work queue or database call on the default executor
+        The detail and process stages keep running on the event loop while the
+        search stage waits for PostgreSQL or the dedupe store
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    def _print_final_stats(self):
+        """
+        Print final statistics with the worker's share of the queue
+        """
+        print(f"\n[{self.worker_id}] Work items completed: {self.stats['work_items']}")
+        super()._print_final_stats()
+
+
+def seed_work_queue(reset: bool = False) -> int:
+    """
+    Coordinator: create the work queue and queue the first page of every SearchStrategy query,
+    highest expected yield first; follow-up pages are queued by the workers as results come in
+    Returns number of new work items
+    """
+    db_handler = DatabaseHandler()
+    db_handler.connect()
+    try:
+        db_handler.create_table_if_not_exists()
+        with db_handler.connection() as connection:
+            work_queue = WorkQueue(connection)
+            work_queue.create_table_if_not_exists()
+            if reset:
+                work_queue.clear()
+
+            scheduler = QueryScheduler.from_config(config)
+            queries = scheduler.order(SearchStrategy().get_all_queries())
+            scheduler.close()
+            items = [
+                {"query": query_info["query"], "type": query_info["type"], "offset": 0}
+                for query_info in queries
+            ]
+            added = work_queue.enqueue(items)
+        print(f"Queued {added} new work items ({len(items) - added} already queued)")
+        return added
+    finally:
+        db_handler.disconnect()
+
+
+def print_queue_status():
+    """
+    Print work item counts per status and books yielded so far
+    """
+    db_handler = DatabaseHandler()
+    db_handler.connect()
+    try:
+        with db_handler.connection() as connection:
+            work_queue = WorkQueue(connection)
+            for status, count in sorted(work_queue.status_counts().items()):
+                print(f"{status}: {count}")
+            print(f"New books: {work_queue.total_new_books()}/{config.TARGET_BOOK_COUNT}")
+    finally:
+        db_handler.disconnect()
+
+
+def run_worker(worker_id: str, share: float):
+    """
+    Worker process entry point
+    """
+    try:
+        QueueWorker(worker_id, share).run()
+    except KeyboardInterrupt:
+        print(f"\n[{worker_id}] Interrupted")
+
+
+def start_workers(processes: int, total_workers: int):
+    """
+    Start worker processes on this host and wait for them to finish
+    total_workers counts workers on all hosts, which split the global request budget
+    """
+    share = 1.0 / total_workers
+    host = socket.gethostname()
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(f"{host}-{i}", share))
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def main():
+    """
+    Command line entry point for the coordinator and workers
+    """
+    parser = argparse.ArgumentParser(description="Distributed Open Library crawl over a PostgreSQL work queue")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = subparsers.add_parser("seed", help="Create the work queue and queue every search query")
+    seed_parser.add_argument("--reset", action="store_true", help="Delete existing work items first")
+
+    work_parser = subparsers.add_parser("work", help="Start worker processes on this host")
+    work_parser.add_argument("--processes", type=int, default=config.WORKER_PROCESSES, help="Worker processes to start")
+    work_parser.add_argument("--total-workers", type=int, help="Workers on all hosts sharing the request budget (default: --processes)")
+
+    subparsers.add_parser("status", help="Show work queue progress")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        seed_work_queue(args.reset)
+    elif args.command == "work":
+        start_workers(args.processes, args.total_workers or args.processes)
+    else:
+        print_queue_status()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
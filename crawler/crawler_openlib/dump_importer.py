@@ -0,0 +1,294 @@
+"""
+Open Library data dump importer
+Bulk-loads books from the Open Library editions/works/authors dumps without any API requests
+
+Dump files (https://openlibrary.org/developers/dumps) are gzip'd, tab-separated
+lines of: type, key, revision, last_modified, JSON record
+"""
+
+import gzip
+import json
+import time
+import sqlite3
+import argparse
+from typing import Dict, Iterator, List, Optional, Tuple
+from author_store import AuthorStore
+from data_processor import DataProcessor
+from database_handler import DatabaseHandler
+import config
+
+
+def iter_dump_records(path: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    Stream (key, record) pairs from a dump file line by line
+    Malformed lines are skipped
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t", 4)
+            if len(parts) != 5:
+                continue
+            try:
+                record = json.loads(parts[4])
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                yield parts[1], record
+
+
+def _first_work_key(edition: Dict) -> Optional[str]:
+    """
+    Get the key of the first work an edition belongs to
+    """
+    works = edition.get("works")
+    if isinstance(works, list) and len(works) > 0 and isinstance(works[0], dict):
+        return works[0].get("key")
+    return None
+
+
+class WorkIndex:
+    """
+    On-disk index of work key -> (first author key, title)
+    Lets editions without their own authors or title inherit them from the work
+    """
+
+    def __init__(self, db_path: str):
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS works (
+                work_key TEXT PRIMARY KEY,
+                author_key TEXT,
+                title TEXT
+            )
+        """)
+        self.connection.commit()
+
+    def save_works(self, rows: List[Tuple[str, Optional[str], Optional[str]]]):
+        """
+        Store (work_key, author_key, title) rows
+        """
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO works (work_key, author_key, title) VALUES (?, ?, ?)",
+            rows
+        )
+        self.connection.commit()
+
+    def get_works(self, work_keys: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        Look up (author_key, title) for the given work keys
+        """
+        work_keys = list(set(work_keys))
+        works = {}
+        for i in range(0, len(work_keys), 500):
+            chunk = work_keys[i:i + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            rows = self.connection.execute(
+                f"SELECT work_key, author_key, title FROM works WHERE work_key IN ({placeholders})",
+                chunk
+            ).fetchall()
+            for work_key, author_key, title in rows:
+                works[work_key] = (author_key, title)
+        return works
+
+    def close(self):
+        """
+        Close the index
+        """
+        self.connection.close()
+
+
+class DumpImporter:
+    """
+    Imports editions from Open Library dumps into the books table
+    Authors and works are indexed on disk first, so memory stays constant
+    regardless of dump size
+    """
+
+    def __init__(self, db_handler: Optional[DatabaseHandler] = None):
+        self.processor = DataProcessor()
+        self.db_handler = db_handler
+        self.author_store = AuthorStore(config.AUTHOR_STORE_PATH)
+        self.work_index = WorkIndex(config.DUMP_INDEX_PATH)
+        self.batch_size = config.DUMP_BATCH_SIZE
+
+        self.stats = {
+            "editions_read": 0,
+            "total_processed": 0,
+            "total_inserted": 0,
+            "total_failed": 0
+        }
+
+    def index_authors(self, authors_path: str) -> int:
+        """
+        Load author key -> name pairs from an authors dump into the author store
+        Returns number of authors indexed
+        """
+        print(f"Indexing authors from {authors_path}...")
+        count = 0
+        names = {}
+        for key, record in iter_dump_records(authors_path):
+            name = record.get("name")
+            if isinstance(name, str) and name.strip():
+                names[key] = name
+            if len(names) >= self.batch_size:
+                self.author_store.save_names(names)
+                count += len(names)
+                names = {}
+        self.author_store.save_names(names)
+        count += len(names)
+        print(f"  Indexed {count} authors")
+        return count
+
+    def index_works(self, works_path: str) -> int:
+        """
+        Load work key -> (first author key, title) from a works dump
+        Returns number of works indexed
+        """
+        print(f"Indexing works from {works_path}...")
+        count = 0
+        rows = []
+        for key, record in iter_dump_records(works_path):
+            author_key = None
+            authors = record.get("authors")
+            if isinstance(authors, list) and len(authors) > 0 and isinstance(authors[0], dict):
+                author = authors[0].get("author", authors[0])
+                if isinstance(author, dict):
+                    author_key = author.get("key")
+            rows.append((key, author_key, record.get("title")))
+            if len(rows) >= self.batch_size:
+                self.work_index.save_works(rows)
+                count += len(rows)
+                rows = []
+        self.work_index.save_works(rows)
+        count += len(rows)
+        print(f"  Indexed {count} works")
+        return count
+
+    def import_editions(self, editions_path: str, limit: Optional[int] = None) -> int:
+        """
+        Stream editions, join them to works and authors, and bulk-load them
+        Returns number of inserted books (processed books when running without a database)
+        """
+        print(f"Importing editions from {editions_path}...")
+        start_time = time.monotonic()
+        batch = []
+
+        for key, record in iter_dump_records(editions_path):
+            self.stats["editions_read"] += 1
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                self._load_batch(batch)
+                batch = []
+                self._print_rate(start_time)
+            if limit and self.stats["editions_read"] >= limit:
+                break
+
+        if batch:
+            self._load_batch(batch)
+        self._print_rate(start_time)
+
+        return self.stats["total_inserted"] if self.db_handler else self.stats["total_processed"]
+
+    def _load_batch(self, editions: List[Dict]):
+        """
+        Process one batch of edition records and insert them
+        """
+        # Inherit authors and title from the work where the edition has none
+        works = self.work_index.get_works([
+            work_key for work_key in map(_first_work_key, editions) if work_key
+        ])
+
+        author_keys = []
+        for edition in editions:
+            work_author_key, work_title = works.get(_first_work_key(edition), (None, None))
+            if not edition.get("authors") and work_author_key:
+                edition["authors"] = [{"key": work_author_key}]
+            if not edition.get("title") and work_title:
+                edition["title"] = work_title
+
+            authors = edition.get("authors")
+            if isinstance(authors, list):
+                author_keys.extend(
+                    author["key"] for author in authors
+                    if isinstance(author, dict) and isinstance(author.get("key"), str)
+                )
+
+        author_names = self.author_store.get_names(author_keys)
+
+        books = []
+        for edition in editions:
+            processed = self.processor.process_book_data(edition, None, author_names)
+            if processed:
+                # Authors missing from the authors dump come back as their raw key
+                if processed["author"] and processed["author"].startswith("/authors/"):
+                    processed["author"] = None
+                processed["source_url"] = f"{config.OPEN_LIBRARY_BOOKS_DETAIL_URL}/{processed['book_id']}"
+                books.append(processed)
+            else:
+                self.stats["total_failed"] += 1
+        self.stats["total_processed"] += len(books)
+
+        if self.db_handler and books:
+            self.stats["total_inserted"] += self.db_handler.insert_books_batch(books)
+
+    def _print_rate(self, start_time: float):
+        """
+        Print progress with rows/sec throughput
+        """
+        elapsed = max(time.monotonic() - start_time, 1e-9)
+        rows = self.stats["total_processed"]
+        print(f"  Read {self.stats['editions_read']} editions, "
+              f"processed {rows}, inserted {self.stats['total_inserted']} "
+              f"({rows / elapsed:.0f} rows/sec)")
+
+    def close(self):
+        """
+        Close on-disk indexes
+        """
+        self.author_store.close()
+        self.work_index.close()
+
+
+def main():
+    """
+    Command line entry point for dump ingestion
+    """
+    parser = argparse.ArgumentParser(description="Import books from Open Library data dumps")
+    parser.add_argument("--editions", required=True, help="Path to the editions dump (.txt or .txt.gz)")
+    parser.add_argument("--works", help="Path to the works dump, used to fill missing authors and titles")
+    parser.add_argument("--authors", help="Path to the authors dump, used to resolve author names")
+    parser.add_argument("--limit", type=int, help="Stop after this many editions")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and process without writing to the database")
+    args = parser.parse_args()
+
+    db_handler = None
+    if not args.dry_run:
+        db_handler = DatabaseHandler()
+        db_handler.connect()
+        db_handler.create_table_if_not_exists()
+
+    importer = DumpImporter(db_handler)
+    try:
+        if args.authors:
+            importer.index_authors(args.authors)
+        if args.works:
+            importer.index_works(args.works)
+        importer.import_editions(args.editions, args.limit)
+
+        print("\n" + "=" * 60)
+        print("Dump Import Statistics")
+        print("=" * 60)
+        print(f"Editions read: {importer.stats['editions_read']}")
+        print(f"Books processed: {importer.stats['total_processed']}")
+        print(f"Books inserted: {importer.stats['total_inserted']}")
+        print(f"Failed: {importer.stats['total_failed']}")
+        print("=" * 60)
+    finally:
+        importer.close()
+        if db_handler:
+            db_handler.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Identity index module
+Canonical book identity keys shared by search filtering and the database handler
+"""
+
+import os
+import re
+import sys
+from typing import Dict, Iterable, Optional, Set
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "crawler_common"))
+from dedupe_store import DedupeStore, MemoryDedupeStore
+
+
+OLID_PATTERN = re.compile(r"OL\d+[AMW]", re.IGNORECASE)
+
+
+def normalize_olid(key: Optional[str]) -> Optional[str]:
+    """
+    Reduce any form of Open Library key to its bare OLID
+    "/books/OL1M", "books/OL1M", "OL1M" and ".../works/OL1W.json" -> "OL1M" / "OL1W"
+    """
+    if not isinstance(key, str):
+        return None
+    match = OLID_PATTERN.search(key)
+    return match.group(0).upper() if match else None
+
+
+def normalize_isbn(isbn: Optional[str]) -> Optional[str]:
+    """
+    Normalize an ISBN-10 or ISBN-13 to its ISBN-13 digits
+    Hyphens and spaces are ignored; invalid lengths return None
+    """
+    if not isinstance(isbn, str):
+        return None
+    isbn = re.sub(r"[\s-]", "", isbn).upper()
+
+    if len(isbn) == 13 and isbn.isdigit():
+        return isbn
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == "X"):
+        # Same book as the 978-prefixed ISBN-13 with a recomputed check digit
+        core = "978" + isbn[:9]
+        total = sum(int(digit) * (1 if i % 2 == 0 else 3) for i, digit in enumerate(core))
+        return core + str((10 - total % 10) % 10)
+    return None
+
+
+def identity_keys(
+    book_id: Optional[str] = None,
+    open_library_id: Optional[str] = None,
+    isbn: Optional[str] = None,
+    keys: Iterable[Optional[str]] = ()
+) -> Set[str]:
+    """
+    Build the canonical identity keys of one book
+    book_id, open_library_id and isbn follow the books table columns;
+    keys holds extra Open Library edition/work keys in any form
+    """
+    identities = set()
+
+    if book_id:
+        if book_id.startswith("ISBN_"):
+            isbn = isbn or book_id[len("ISBN_"):]
+        elif normalize_olid(book_id) == book_id.upper():
+            identities.add(f"olid:{book_id.upper()}")
+        else:
+            # IDs from the other crawlers never collide with Open Library keys
+            identities.add(f"id:{book_id}")
+
+    for key in [open_library_id, *keys]:
+        olid = normalize_olid(key)
+        if olid:
+            identities.add(f"olid:{olid}")
+
+    normalized_isbn = normalize_isbn(isbn)
+    if normalized_isbn:
+        identities.add(f"isbn:{normalized_isbn}")
+
+    return identities
+
+
+class IdentityIndex:
+    """
+    Set of canonical identity keys (book_id, edition OLID, work OLID, ISBN-13)
+    A book is known if any of its identity keys is in the index, so a search hit
+    is recognized no matter which key or ISBN form it arrives with
+
+    Keys live in a dedupe store (crawler_common/dedupe_store.py), in memory by
+    default or on disk for catalog-scale crawls
+    """
+
+    def __init__(self, store: Optional[DedupeStore] = None):
+        self.identities = store if store is not None else MemoryDedupeStore()
+
+    def add(self, identities: Set[str]):
+        """
+        Mark a book's identity keys as known
+        """
+        self.identities.update(identities)
+
+    def contains(self, identities: Set[str]) -> bool:
+        """
+        Check whether any of a book's identity keys is known
+        """
+        return any(identity in self.identities for identity in identities)
+
+    def add_row(self, book_id: str, open_library_id: Optional[str] = None, isbn: Optional[str] = None):
+        """
+        Mark a stored books row as known
+        """
+        self.identities.load_stored(identity_keys(book_id, open_library_id, isbn))
+
+    def add_identifier(self, identifier: Dict):
+        """
+        Mark a search identifier as known
+        """
+        self.add(self.identifier_keys(identifier))
+
+    def contains_identifier(self, identifier: Dict) -> bool:
+        """
+        Check whether a search identifier refers to a known book
+        """
+        return self.contains(self.identifier_keys(identifier))
+
+    @staticmethod
+    def identifier_keys(identifier: Dict) -> Set[str]:
+        """
+        Build the identity keys of a search identifier (edition/work key and ISBN)
+        """
+        return identity_keys(
+            isbn=identifier.get("isbn"),
+            keys=[identifier.get("value"), identifier.get("work_key")]
+        )
+
+    def __len__(self) -> int:
+        return len(self.identities)
+
+    def close(self):
+        """
+        Close the underlying store
+        """
+        self.identities.close()
@@ -3,15 +3,28 @@ Main entry point for the Open Library book scraper
 """
 
 from scraper import BookScraper
+import config
 import sys
+import argparse
 
 
 def main():
     """
     Main function to run the book scraper
     """
+    parser = argparse.ArgumentParser(description="Scrape books from Open Library")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from the crawl journal")
+    parser.add_argument("--refresh", action="store_true", help="Re-fetch stored books and update the ones that changed")
+    parser.add_argument("--refresh-days", type=int, default=config.REFRESH_AFTER_DAYS,
+                        help="Refresh books not updated for this many days (default: %(default)s)")
+    args = parser.parse_args()
+    
     try:
-        scraper = BookScraper()
+        if args.refresh:
+            # Refreshing keeps the crawl journal of the last crawl intact
+            BookScraper(resume=True).run_refresh(args.refresh_days)
+            return
+        scraper = BookScraper(resume=args.resume)
         scraper.run()
     except KeyboardInterrupt:
         print("\n\nScraping interrupted by user")
@@ -0,0 +1,97 @@
+"""
+Query scheduler module
+Orders search queries by how many new books they are expected to yield per request
+"""
+
+import sqlite3
+from typing import Dict, List
+
+
+class QueryScheduler:
+    """
+    SQLite-backed record of new books found per search request, by query
+
+    Each query's expected yield is an exponential moving average of the new
+    books its recent search requests returned, so queries that keep finding
+    new books are searched first and queries whose results are already stored
+    sink to the end. Queries never searched before are assumed to yield a full
+    page, so every query gets tried once.
+    """
+
+    def __init__(self, db_path: str, smoothing: float, abandon_ratio: float, default_yield: float):
+        self.db_path = db_path
+        self.smoothing = smoothing
+        self.abandon_ratio = abandon_ratio
+        self.default_yield = default_yield
+        # Shared by every worker process on a host: WAL lets readers run during a
+        # write, and writers wait up to timeout seconds for each other
+        self.connection = sqlite3.connect(db_path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS query_yield (
+                query TEXT PRIMARY KEY,
+                requests INTEGER NOT NULL,
+                new_books INTEGER NOT NULL,
+                expected_yield REAL NOT NULL
+            )
+        """)
+        self.connection.commit()
+
+    @classmethod
+    def from_config(cls, settings) -> "QueryScheduler":
+        """
+        Build the scheduler from a crawler config module
+        """
+        return cls(
+            settings.QUERY_YIELD_PATH,
+            settings.YIELD_SMOOTHING,
+            settings.DUPLICATE_ABANDON_RATIO,
+            settings.SEARCH_LIMIT
+        )
+
+    def expected_yields(self) -> Dict[str, float]:
+        """
+        Get the expected new books per request of every recorded query
+        """
+        return dict(self.connection.execute("SELECT query, expected_yield FROM query_yield").fetchall())
+
+    def order(self, queries: List[Dict]) -> List[Dict]:
+        """
+        Sort query dictionaries by expected yield, highest first
+        Ties keep SearchStrategy's order
+        """
+        yields = self.expected_yields()
+        return sorted(queries, key=lambda query_info: -yields.get(query_info["query"], self.default_yield))
+
+    def record(self, query: str, new_books: int):
+        """
+        Record the new books found by one search request of a query
+        """
+        row = self.connection.execute(
+            "SELECT expected_yield FROM query_yield WHERE query = ?", (query,)
+        ).fetchone()
+        previous = row[0] if row else self.default_yield
+        expected = previous + self.smoothing * (new_books - previous)
+        self.connection.execute("""
+            INSERT INTO query_yield (query, requests, new_books, expected_yield) VALUES (?, 1, ?, ?)
+            ON CONFLICT (query) DO UPDATE SET
+                requests = requests + 1,
+                new_books = new_books + excluded.new_books,
+                expected_yield = excluded.expected_yield
+        """, (query, new_books, expected))
+        self.connection.commit()
+
+    def should_abandon(self, results: int, new_books: int) -> bool:
+        """
+        Check whether a page was mostly books already known, so later pages
+        of the same query are not worth a request
+        """
+        if results == 0:
+            return False
+        return (results - new_books) / results >= self.abandon_ratio
+
+    def close(self):
+        """
+        Close the store
+        """
+        self.connection.close()
@@ -4,11 +4,19 @@ Orchestrates the scraping process using all other modules
 """
 
 import time
-from typing import Dict, List, Set, Optional
-from open_library_client import OpenLibraryClient
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from async_open_library_client import AsyncOpenLibraryClient
+from rate_controller import AdaptiveRateController
+from response_cache import ResponseCache
+from crawl_journal import CrawlJournal
+from dedupe_store import create_dedupe_store
+from author_store import AuthorStore
+from identity_index import IdentityIndex, normalize_olid
 from data_processor import DataProcessor
 from database_handler import DatabaseHandler
 from search_strategy import SearchStrategy
+from query_scheduler import QueryScheduler
 import config
 
 
@@ -16,16 +24,38 @@ class BookScraper:
     """
     Main scraper class that coordinates the entire scraping process
     Handles search, data retrieval, processing, and storage
+    
+    Runs as a streaming pipeline: search -> detail -> process -> insert
+    Stages are connected by bounded queues, so a slow stage pauses the ones
+    feeding it, rows are written while the crawl is still running, and memory
+    does not grow with the target count
+    
+    Progress is written to a crawl journal; with resume=True a run continues
+    each query from its last completed page instead of starting over
     """
     
-    def __init__(self):
-        self.client = OpenLibraryClient()
+    def __init__(self, resume: bool = False, journal_path: Optional[str] = None, dedupe_path: Optional[str] = None):
+        # One controller paces every Open Library request
+        self.rate_controller = AdaptiveRateController.from_config(config)
+        self.response_cache = ResponseCache.from_config(config)
+        self.client_factory = AsyncOpenLibraryClient
+        self.author_store = AuthorStore(config.AUTHOR_STORE_PATH)
         self.processor = DataProcessor()
         self.db_handler = DatabaseHandler()
-        self.strategy = SearchStrategy()
+        self.strategy = SearchStrategy(config.FRONTIER_MAX_QUERIES, config.FRONTIER_MIN_HITS)
+        self.frontier_fanout = config.FRONTIER_FANOUT
+        self.related_terms = config.FRONTIER_TERMS_PER_DOC if config.FRONTIER_MAX_QUERIES else 0
+        self.scheduler = QueryScheduler.from_config(config)
         self.target_count = config.TARGET_BOOK_COUNT
         self.batch_size = config.BATCH_SIZE
         self.search_limit = config.SEARCH_LIMIT
+        self.search_only_mode = config.SEARCH_ONLY_MODE
+        self.search_fields = config.SEARCH_ONLY_FIELDS if self.search_only_mode else config.SEARCH_FIELDS
+        self.queue_size = config.PIPELINE_QUEUE_SIZE
+        self.detail_workers = config.DETAIL_WORKERS
+        self.flush_interval = config.FLUSH_INTERVAL
+        self.resume = resume
+        self.journal = CrawlJournal(journal_path or config.JOURNAL_PATH, resume)
         
         # Statistics tracking
         self.stats = {
@@ -33,12 +63,19 @@ class BookScraper:
             "total_processed": 0,
             "total_inserted": 0,
             "total_failed": 0,
-            "total_duplicates": 0
+            "total_duplicates": 0,
+            "author_requests": 0,
+            "coalesced_requests": 0,
+            "requests_avoided": 0,
+            "search_requests": 0,
+            "queries_abandoned": 0,
+            "frontier_queries": 0,
+            "total_refreshed": 0,
+            "total_updated": 0
         }
         
-        # Track processed book IDs to avoid duplicates
-        self.processed_book_ids: Set[str] = set()
-        self.processed_isbns: Set[str] = set()
+        # Canonical identities of stored and queued books, to avoid duplicate requests
+        self.identity_index = IdentityIndex(create_dedupe_store(config, dedupe_path))
     
     def initialize_database(self):
         """
@@ -48,244 +85,650 @@ class BookScraper:
         self.db_handler.connect()
         self.db_handler.create_table_if_not_exists()
         
-        # Load existing book IDs to avoid duplicates
-        self.processed_book_ids = self.db_handler.get_existing_book_ids()
-        print(f"Loaded {len(self.processed_book_ids)} existing books from database")
+        # Stream identities of existing books into the index to avoid duplicates
+        loaded = self.db_handler.load_identity_index(self.identity_index)
+        print(f"Loaded {loaded} existing books from database ({len(self.identity_index)} identity keys known)")
+        
+        if self.resume:
+            print(f"Resuming from journal: {self.journal.summary()}")
     
-    def search_and_collect_books(self) -> List[Dict]:
+    async def run_pipeline(self):
         """
-        Search for books using all strategies and collect identifiers
-        Returns list of book identifiers (ISBNs or keys)
+        Run the search, detail, process and insert stages concurrently
+        Each stage is shut down with one end-of-stream marker (None) per worker
+        once the stage feeding it has finished
         """
-        print("Starting search phase...")
-        all_queries = self.strategy.get_all_queries()
-        book_identifiers = []
+        identifier_queue = asyncio.Queue(maxsize=self.queue_size)
+        raw_queue = asyncio.Queue(maxsize=self.queue_size)
+        record_queue = asyncio.Queue(maxsize=self.queue_size)
         
-        for i, query_info in enumerate(all_queries, 1):
+        async with self.client_factory(self.rate_controller, self.response_cache) as client:
+            detail_tasks = [
+                asyncio.create_task(self.fetch_book_details(client, identifier_queue, raw_queue, record_queue))
+                for _ in range(self.detail_workers)
+            ]
+            process_tasks = [
+                asyncio.create_task(self.process_book_details(client, raw_queue, record_queue))
+                for _ in range(self.detail_workers)
+            ]
+            writer_task = asyncio.create_task(self.save_books_to_database(record_queue))
+            
+            async def feed_stages():
+                await self.search_and_collect_books(client, identifier_queue)
+                for _ in detail_tasks:
+                    await identifier_queue.put(None)
+                await asyncio.gather(*detail_tasks)
+                for _ in process_tasks:
+                    await raw_queue.put(None)
+                await asyncio.gather(*process_tasks)
+                await record_queue.put(None)
+            
+            feed_task = asyncio.create_task(feed_stages())
+            stage_tasks = [feed_task] + detail_tasks + process_tasks + [writer_task]
+            try:
+                # Every stage is watched, so the first one to fail ends the run instead of
+                # leaving the stages feeding it blocked on a full queue
+                done, _ = await asyncio.wait(stage_tasks, return_when=asyncio.FIRST_EXCEPTION)
+                for task in done:
+                    task.result()
+            finally:
+                # On error or interrupt the writer inserts what reached it before stopping
+                for task in stage_tasks:
+                    task.cancel()
+                await asyncio.gather(*stage_tasks, return_exceptions=True)
+                self._report_dropped(identifier_queue, raw_queue, record_queue)
+                self.stats["coalesced_requests"] += client.coalesced
+    
+    def _report_dropped(self, identifier_queue: asyncio.Queue, raw_queue: asyncio.Queue, record_queue: asyncio.Queue):
+        """
+        Report items still queued when the pipeline stopped; they were not written
+        """
+        for name, queue in (("identifiers", identifier_queue), ("raw records", raw_queue), ("processed books", record_queue)):
+            dropped = 0
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is not None:
+                    dropped += 1
+            if dropped:
+                print(f"Pipeline stopped with {dropped} {name} still queued; they were not saved")
+    
+    async def search_and_collect_books(self, client: AsyncOpenLibraryClient, identifier_queue: asyncio.Queue) -> int:
+        """
+        Search stage: page through all strategy queries and queue each new book identifier
+        Queries expected to yield the most new books per request go first, and a
+        query is dropped once a page is mostly books already known
+        Authors and subjects of newly found books are added as queries along the way
+        Waits whenever the detail stage falls behind and the queue is full
+        Returns number of identifiers queued
+        """
+        print("Starting search stage...")
+        pending = self.scheduler.order(self.strategy.get_all_queries())
+        queued = 0
+        searched = 0
+        if self.resume:
+            queued = await self._requeue_journal_items(identifier_queue)
+        
+        while pending:
+            query_info = pending.pop(0)
             query_type = query_info["type"]
             query_value = query_info["value"]
             query_string = query_info["query"]
+            query_limit = self._get_limit_for_query_type(query_type)
             
-            print(f"\n[{i}/{len(all_queries)}] Searching: {query_type} - {query_value}")
+            if queued >= self.target_count:
+                break
+            if self.journal.is_finished(query_string):
+                continue
             
-            # Search with pagination
-            offset = 0
-            books_from_query = []
+            searched += 1
+            print(f"\n[{searched}/{searched + len(pending)}] Searching: {query_type} - {query_value}")
             
-            while len(books_from_query) < self._get_limit_for_query_type(query_type):
-                search_result = self.client.search_books(
-                    query_string,
-                    limit=self.search_limit,
-                    offset=offset
-                )
-                
-                if not search_result:
+            # Search with pagination, continuing after the last journaled page
+            last_offset = self.journal.last_cursor(query_string)
+            offset = 0 if last_offset is None else last_offset + self.search_limit
+            books_from_query = len(self.journal.source_items(query_string))
+            exhausted = False
+            
+            while books_from_query < query_limit and queued < self.target_count:
+                page = await self._search_page(client, query_string, offset)
+                if not page:
                     print(f"  No results or error for query: {query_value}")
                     break
+                identifiers, num_found = page
                 
-                # Process search results
-                identifiers = self.processor.process_search_result(search_result)
-                
-                # Filter out already processed books
-                new_identifiers = []
-                for identifier in identifiers:
-                    isbn = identifier.get("isbn")
-                    key = identifier.get("value")
-                    
-                    # Check if already processed
-                    if isbn and isbn in self.processed_isbns:
-                        continue
-                    if key and key in self.processed_book_ids:
-                        continue
-                    
-                    new_identifiers.append(identifier)
-                    if isbn:
-                        self.processed_isbns.add(isbn)
-                    if key:
-                        self.processed_book_ids.add(key)
-                
-                books_from_query.extend(new_identifiers)
-                self.stats["total_searched"] += len(identifiers)
-                
-                # Check if we have enough results
-                if len(books_from_query) >= self._get_limit_for_query_type(query_type):
-                    break
+                fresh_identifiers = self._filter_new_identifiers(identifiers)
+                self._harvest_related(fresh_identifiers)
+                # Identifiers past the target are left unknown, as they are neither queued nor journaled
+                new_identifiers = fresh_identifiers[:self.target_count - queued]
+                self.journal.record_page(query_string, offset, new_identifiers)
+                self.scheduler.record(query_string, len(fresh_identifiers))
+                for identifier in new_identifiers:
+                    self.identity_index.add_identifier(identifier)
+                    await identifier_queue.put(identifier)
+                    queued += 1
+                books_from_query += len(new_identifiers)
                 
                 # Check if there are more results
-                # API may return numFound or num_found (handle both formats)
-                num_found = search_result.get("numFound") or search_result.get("num_found", 0)
                 if offset + self.search_limit >= num_found:
+                    exhausted = True
+                    break
+                
+                # Later pages of a query mostly returning known books rarely do better
+                if self.scheduler.should_abandon(len(identifiers), len(fresh_identifiers)):
+                    print(f"  Abandoning query: {len(identifiers) - len(fresh_identifiers)}/{len(identifiers)} results already known")
+                    self.stats["queries_abandoned"] += 1
+                    exhausted = True
                     break
                 
                 offset += self.search_limit
-                print(f"  Found {len(new_identifiers)} new books (total: {len(books_from_query)})")
+                print(f"  Found {len(new_identifiers)} new books (total: {books_from_query})")
             
-            book_identifiers.extend(books_from_query)
-            print(f"  Collected {len(books_from_query)} books from {query_value}")
+            print(f"  Collected {books_from_query} books from {query_value}")
+            if exhausted or books_from_query >= query_limit:
+                self.journal.finish_source(query_string)
+            
+            # Expand the frontier with authors and subjects of the books just found
+            frontier_queries = self.strategy.take_frontier_queries(self.frontier_fanout)
+            if frontier_queries:
+                print(f"  Added {len(frontier_queries)} frontier queries")
+                self.stats["frontier_queries"] += len(frontier_queries)
+                pending = self.scheduler.order(pending + frontier_queries)
             
             # Check if we have enough books
-            if len(book_identifiers) >= self.target_count:
+            if queued >= self.target_count:
                 print(f"\nReached target count of {self.target_count} books")
                 break
         
-        print(f"\nSearch phase complete. Collected {len(book_identifiers)} book identifiers")
-        return book_identifiers[:self.target_count]  # Limit to target count
+        print(f"\nSearch stage complete. Queued {queued} book identifiers")
+        return queued
     
-    def fetch_book_details(self, book_identifiers: List[Dict]) -> List[Dict]:
+    async def _search_page(self, client: AsyncOpenLibraryClient, query_string: str, offset: int) -> Optional[Tuple[List[Dict], int]]:
         """
-        Fetch detailed information for collected book identifiers
-        Returns list of processed book data
+        Fetch and parse one page of search results
+        Returns (identifiers, total number of results) or None if the request failed
         """
-        print("\nStarting detail fetching phase...")
-        processed_books = []
+        search_result = await client.search_books(
+            query_string,
+            limit=self.search_limit,
+            offset=offset,
+            fields=self.search_fields
+        )
+        if not search_result:
+            return None
+        self.stats["search_requests"] += 1
         
-        # Separate ISBNs and keys for batch processing
-        isbns = [item["isbn"] for item in book_identifiers if item.get("isbn")]
-        keys = [item["value"] for item in book_identifiers if item.get("type") == "key"]
+        # Process search results
+        identifiers = self.processor.process_search_result(
+            search_result,
+            build_records=self.search_only_mode,
+            related_terms=self.related_terms
+        )
+        self.stats["total_searched"] += len(identifiers)
         
-        # Process ISBNs in batches
-        if isbns:
-            print(f"Processing {len(isbns)} books by ISBN...")
-            for i in range(0, len(isbns), self.batch_size):
-                batch_isbns = isbns[i:i + self.batch_size]
-                print(f"  Batch {i//self.batch_size + 1}: Processing {len(batch_isbns)} ISBNs...")
-                
-                books_data = self.client.get_books_by_isbns(batch_isbns)
-                
-                for isbn, book_data in books_data.items():
-                    if book_data:
-                        # Get author details if author only has key
-                        author_details_cache = {}
-                        if "authors" in book_data:
-                            authors = book_data["authors"] if isinstance(book_data["authors"], list) else []
-                            for author in authors:
-                                if isinstance(author, dict) and "key" in author:
-                                    author_key = author["key"]
-                                    if author_key and "/authors/" in author_key:
-                                        # Fetch author details
-                                        author_details = self.client.get_author_details(author_key)
-                                        if author_details and "name" in author_details:
-                                            author_details_cache[author_key] = author_details["name"]
-                        
-                        processed = self.processor.process_book_data(book_data, isbn, author_details_cache)
-                        if processed:
-                            processed["source_url"] = f"{config.OPEN_LIBRARY_BOOKS_URL}?bibkeys=ISBN:{isbn}"
-                            processed_books.append(processed)
-                            self.stats["total_processed"] += 1
-                        else:
-                            self.stats["total_failed"] += 1
-                    else:
-                        self.stats["total_failed"] += 1
+        # API may return numFound or num_found (handle both formats)
+        num_found = search_result.get("numFound") or search_result.get("num_found", 0)
+        return identifiers, num_found
+    
+    def _harvest_related(self, identifiers: List[Dict]):
+        """
+        Feed the author names and subjects of newly found books to the search frontier
+        """
+        for identifier in identifiers:
+            related = identifier.pop("related", None)
+            if not related:
+                continue
+            for query_type, values in related.items():
+                self.strategy.harvest(query_type, values)
+    
+    async def _requeue_journal_items(self, identifier_queue: asyncio.Queue) -> int:
+        """
+        Queue identifiers found by an earlier run whose books were never stored
+        Returns number of journaled identifiers, all of which count toward the target
+        """
+        journaled = 0
+        requeued = 0
+        for query_string, identifiers in self.journal.items.items():
+            for identifier in identifiers:
+                journaled += 1
+                self.identity_index.add_identifier(identifier)
                 
-                self._print_progress(len(processed_books), len(book_identifiers))
-        
-        # Process keys (Open Library IDs)
-        if keys:
-            print(f"\nProcessing {len(keys)} books by Open Library ID...")
-            for i, key in enumerate(keys, 1):
-                if i % 50 == 0:
-                    print(f"  Processed {i}/{len(keys)} books...")
+                # Stored books are journaled by the identifier they were found as,
+                # besides their own book_id and ISBN
+                if any(self.journal.was_fetched(origin_id) for origin_id in self._origin_ids(identifier)):
+                    continue
+                await identifier_queue.put(identifier)
+                requeued += 1
+        
+        print(f"Re-queued {requeued} of {journaled} journaled books that were not stored yet")
+        return journaled
+    
+    @staticmethod
+    def _origin_ids(identifier: Dict) -> List[str]:
+        """
+        Get the journal ids of a search identifier: its bare key and its ISBN
+        A work key or a search ISBN can differ from the stored edition's book_id
+        and ISBN, so stored books are journaled under these ids too
+        """
+        origin_ids = [normalize_olid(identifier.get("value")), identifier.get("isbn")]
+        return [origin_id for origin_id in origin_ids if origin_id]
+    
+    def _filter_new_identifiers(self, identifiers: List[Dict]) -> List[Dict]:
+        """
+        Drop identifiers of books already stored or queued, and repeats within the page
+        Matching is on canonical identities (edition OLID, work OLID, ISBN-13), so
+        no detail request is issued for a book the index already knows.
+        The rest are not marked as known here; the caller marks the ones it queues
+        """
+        new_identifiers = []
+        page_identities = set()
+        for identifier in identifiers:
+            identities = IdentityIndex.identifier_keys(identifier)
+            if self.identity_index.contains(identities) or identities & page_identities:
+                # Records built from search docs would not have cost a request
+                if not identifier.get("record"):
+                    self.stats["requests_avoided"] += 1
+                continue
+            
+            new_identifiers.append(identifier)
+            page_identities.update(identities)
+        return new_identifiers
+    
+    async def _take_batch(self, queue: asyncio.Queue) -> Tuple[List, bool]:
+        """
+        Wait for one item, then take whatever else is already queued, up to BATCH_SIZE
+        Returns (items, done) where done means the end-of-stream marker was taken
+        """
+        item = await queue.get()
+        if item is None:
+            return [], True
+        
+        items = [item]
+        while len(items) < self.batch_size:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is None:
+                return items, True
+            items.append(item)
+        return items, False
+    
+    async def fetch_book_details(
+        self,
+        client: AsyncOpenLibraryClient,
+        identifier_queue: asyncio.Queue,
+        raw_queue: asyncio.Queue,
+        record_queue: asyncio.Queue
+    ):
+        """
+        Detail stage worker: resolve batches of identifiers to raw book records
+        Records already built from search docs skip straight to the insert stage
+        """
+        done = False
+        while not done:
+            batch, done = await self._take_batch(identifier_queue)
+            if not batch:
+                continue
+            
+            for item in batch:
+                record = item.get("record")
+                if record:
+                    record["source_url"] = f"{config.OPEN_LIBRARY_BOOKS_DETAIL_URL}/{record['book_id']}"
+                    record["origin_ids"] = self._origin_ids(item)
+                    self.stats["total_processed"] += 1
+                    await record_queue.put(record)
+            
+            # Separate ISBNs and keys for batch processing; identifiers with a key are
+            # only looked up by key, even when they carry an ISBN as well
+            pending = [item for item in batch if not item.get("record")]
+            isbns = [item["isbn"] for item in pending if item.get("isbn") and item.get("type") != "key"]
+            keys = [item["value"] for item in pending if item.get("type") == "key"]
+            
+            # Each fetched record is a (book_data, isbn, source_url, lookup) tuple
+            try:
+                raw_records = []
+                if isbns:
+                    raw_records.extend(await self._fetch_isbn_batch(client, isbns))
+                if keys:
+                    raw_records.extend(await self._fetch_books_by_keys(client, keys))
+            except Exception as e:
+                print(f"Error fetching details for {len(pending)} books: {e}")
+                self.stats["total_failed"] += len(pending)
+                continue
+            
+            # Raw records carry the journal ids of the identifier they were looked up by
+            origins = {item["value"]: self._origin_ids(item) for item in pending}
+            for book_data, isbn, source_url, lookup in raw_records:
+                await raw_queue.put((book_data, isbn, source_url, origins.get(lookup, [])))
+    
+    async def process_book_details(self, client: AsyncOpenLibraryClient, raw_queue: asyncio.Queue, record_queue: asyncio.Queue):
+        """
+        Process stage worker: resolve author names for a batch of raw records,
+        turn them into book records and queue them for insertion
+        """
+        done = False
+        while not done:
+            batch, done = await self._take_batch(raw_queue)
+            if not batch:
+                continue
+            
+            try:
+                author_names = await self._resolve_author_names(
+                    client,
+                    [raw_record[0] for raw_record in batch]
+                )
+            except Exception as e:
+                print(f"Error resolving authors for {len(batch)} books: {e}")
+                author_names = {}
+            
+            for book_data, isbn, source_url, origin_ids in batch:
+                processed = self.processor.process_book_data(book_data, isbn, author_names)
+                if processed:
+                    processed["source_url"] = source_url
+                    processed["origin_ids"] = origin_ids
+                    self.stats["total_processed"] += 1
+                    await record_queue.put(processed)
+                else:
+                    self.stats["total_failed"] += 1
+    
+    async def _fetch_isbn_batch(self, client: AsyncOpenLibraryClient, batch_isbns: List[str]) -> List[Tuple]:
+        """
+        Fetch one batch of ISBNs with a single bibkeys request
+        Returns list of (book_data, isbn, source_url, lookup) records, lookup being the requested ISBN
+        """
+        records = []
+        books_data = await client.get_books_by_isbns(batch_isbns)
+        
+        for isbn, book_data in books_data.items():
+            if not book_data:
+                self.stats["total_failed"] += 1
+                continue
+            records.append((book_data, isbn, f"{config.OPEN_LIBRARY_BOOKS_URL}?bibkeys=ISBN:{isbn}", isbn))
+        
+        print(f"  Fetched batch of {len(batch_isbns)} ISBNs")
+        return records
+    
+    async def _fetch_books_by_keys(self, client: AsyncOpenLibraryClient, keys: List[str]) -> List[Tuple]:
+        """
+        Fetch books by Open Library work or edition keys through batched bibkeys requests
+        Works are first mapped to their first edition key; all edition keys are then
+        resolved together via api/books?bibkeys=OLID:...
+        Keys that cannot be resolved this way fall back to per-key detail requests
+        Returns list of (book_data, isbn, source_url, lookup) records, lookup being the requested key
+        """
+        # Map each edition OLID to the original identifier keys it resolves; a listed
+        # edition can also be the first edition of a listed work
+        edition_to_keys = {}
+        work_keys = []
+        for key in keys:
+            if "/works/" in key:
+                work_keys.append(key)
+            else:
+                edition_to_keys.setdefault(normalize_olid(key) or key, []).append(key)
+        
+        if work_keys:
+            edition_keys = await asyncio.gather(*[
+                client.get_first_edition_key(work_key) for work_key in work_keys
+            ])
+            for work_key, edition_key in zip(work_keys, edition_keys):
+                if edition_key:
+                    edition_to_keys.setdefault(normalize_olid(edition_key) or edition_key, []).append(work_key)
+        
+        records = []
+        resolved_keys = set()
+        editions_data = await client.get_books_by_olids(list(edition_to_keys))
+        for edition_key, book_data in editions_data.items():
+            if not book_data:
+                continue
+            for key in edition_to_keys[edition_key]:
+                clean_key = key.lstrip("/")
+                base_url = config.OPEN_LIBRARY_WORKS_URL if "/works/" in key else config.OPEN_LIBRARY_BOOKS_DETAIL_URL
+                records.append((book_data, None, f"{base_url}/{clean_key}", key))
+                resolved_keys.add(key)
+        
+        unresolved = [key for key in keys if key not in resolved_keys]
+        if unresolved:
+            print(f"  Falling back to detail requests for {len(unresolved)} keys")
+            results = await asyncio.gather(*[
+                self._fetch_book_by_key(client, key) for key in unresolved
+            ])
+            records.extend(record for record in results if record)
+        
+        return records
+    
+    async def _fetch_book_by_key(self, client: AsyncOpenLibraryClient, key: str) -> Optional[Tuple]:
+        """
+        Fetch a single book by Open Library work or edition key
+        Returns (book_data, isbn, source_url, key) record or None if it could not be resolved
+        """
+        # Build proper source URL by removing leading slash if present
+        clean_key = key.lstrip("/")
+        
+        # Try to get work details first
+        if "/works/" in key:
+            work_data = await client.get_work_details(key)
+            if work_data:
+                # Try to get a specific edition for complete information
+                edition_data = await client.get_edition_from_work(work_data)
                 
-                # Try to get work details first
-                if "/works/" in key:
-                    work_data = self.client.get_work_details(key)
-                    if work_data:
-                        # Try to get a specific edition for complete information
-                        edition_data = self.client.get_edition_from_work(work_data)
-                        
-                        # Use edition data if available, otherwise fall back to work data
-                        book_data = edition_data if edition_data else work_data
-                        
-                        # Merge work and edition data to get complete information
-                        # Edition has publisher and detailed author info, work has title
-                        if edition_data and work_data:
-                            # Prefer edition data but keep work title if edition doesn't have it
-                            if "title" not in edition_data and "title" in work_data:
-                                book_data = {**edition_data, "title": work_data["title"]}
-                            else:
-                                book_data = edition_data
-                        
-                        # Get author details if author only has key
-                        author_details_cache = {}
-                        if "authors" in book_data:
-                            authors = book_data["authors"] if isinstance(book_data["authors"], list) else []
-                            for author in authors:
-                                if isinstance(author, dict) and "key" in author:
-                                    author_key = author["key"]
-                                    if author_key and "/authors/" in author_key:
-                                        # Fetch author details
-                                        author_details = self.client.get_author_details(author_key)
-                                        if author_details and "name" in author_details:
-                                            author_details_cache[author_key] = author_details["name"]
-                        
-                        processed = self.processor.process_book_data(book_data, None, author_details_cache)
-                        if processed:
-                            # Build proper source URL by removing leading slash if present
-                            clean_key = key.lstrip("/")
-                            processed["source_url"] = f"{config.OPEN_LIBRARY_WORKS_URL}/{clean_key}"
-                            processed_books.append(processed)
-                            self.stats["total_processed"] += 1
-                            continue
+                # Edition has publisher and detailed author info, work has title
+                book_data = edition_data if edition_data else work_data
+                if edition_data and "title" not in edition_data and "title" in work_data:
+                    book_data = {**edition_data, "title": work_data["title"]}
                 
-                # Fallback to book details
-                book_data = self.client.get_book_details(key)
-                if book_data:
-                    # Get author details if author only has key
-                    author_details_cache = {}
-                    if "authors" in book_data:
-                        authors = book_data["authors"] if isinstance(book_data["authors"], list) else []
-                        for author in authors:
-                            if isinstance(author, dict) and "key" in author:
-                                author_key = author["key"]
-                                if author_key and "/authors/" in author_key:
-                                    # Fetch author details
-                                    author_details = self.client.get_author_details(author_key)
-                                    if author_details and "name" in author_details:
-                                        author_details_cache[author_key] = author_details["name"]
-                    
-                    processed = self.processor.process_book_data(book_data, None, author_details_cache)
-                    if processed:
-                        # Build proper source URL by removing leading slash if present
-                        clean_key = key.lstrip("/")
-                        processed["source_url"] = f"{config.OPEN_LIBRARY_BOOKS_DETAIL_URL}/{clean_key}"
-                        processed_books.append(processed)
-                        self.stats["total_processed"] += 1
+                if self.processor.extract_book_id(book_data) and self.processor.extract_name(book_data):
+                    return (book_data, None, f"{config.OPEN_LIBRARY_WORKS_URL}/{clean_key}", key)
+        
+        # Fallback to book details
+        book_data = await client.get_book_details(key)
+        if not book_data:
+            self.stats["total_failed"] += 1
+            return None
+        
+        return (book_data, None, f"{config.OPEN_LIBRARY_BOOKS_DETAIL_URL}/{clean_key}", key)
+    
+    async def _resolve_author_names(self, client: AsyncOpenLibraryClient, books_data: List[Dict]) -> Dict[str, str]:
+        """
+        Resolve every author key referenced by books_data to an author name
+        Keys already in the author store cost no request; each unknown key is
+        fetched exactly once and saved for later books and runs
+        Returns dictionary mapping author keys to names
+        """
+        author_keys = set()
+        for book_data in books_data:
+            author_keys.update(self._collect_author_keys(book_data))
+        if not author_keys:
+            return {}
+        
+        author_names = self.author_store.get_names(author_keys)
+        unknown_keys = [key for key in author_keys if key not in author_names]
+        
+        if unknown_keys:
+            print(f"Resolving {len(unknown_keys)} new authors ({len(author_names)} already known)...")
+            results = await asyncio.gather(*[client.get_author_details(key) for key in unknown_keys])
+            self.stats["author_requests"] += len(unknown_keys)
+            
+            new_names = {}
+            for author_key, author_details in zip(unknown_keys, results):
+                if author_details and "name" in author_details:
+                    new_names[author_key] = author_details["name"]
+            self.author_store.save_names(new_names)
+            author_names.update(new_names)
+        
+        return author_names
+    
+    def _collect_author_keys(self, book_data: Dict) -> List[str]:
+        """
+        Collect author keys referenced by book data
+        Handles edition format {"key": ...} and work format {"author": {"key": ...}}
+        """
+        authors = book_data.get("authors")
+        if not isinstance(authors, list):
+            return []
+        
+        author_keys = []
+        for author in authors:
+            if not isinstance(author, dict):
+                continue
+            if isinstance(author.get("author"), dict):
+                author = author["author"]
+            author_key = author.get("key")
+            if isinstance(author_key, str) and "/authors/" in author_key:
+                author_keys.append(author_key)
+        return author_keys
+    
+    async def save_books_to_database(self, record_queue: asyncio.Queue):
+        """
+        Insert stage: write processed books in batches of BATCH_SIZE
+        A partial batch is written after FLUSH_INTERVAL seconds so rows land early,
+        and on cancellation so an interrupted run keeps everything processed so far
+        """
+        print("\nStarting database insertion stage...")
+        loop = asyncio.get_running_loop()
+        batch = []
+        flush = None
+        last_flush = time.monotonic()
+        done = False
+        
+        try:
+            while not done:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+                try:
+                    record = await asyncio.wait_for(record_queue.get(), timeout)
+                    if record is None:
+                        done = True
                     else:
-                        self.stats["total_failed"] += 1
-                else:
-                    self.stats["total_failed"] += 1
+                        batch.append(record)
+                except asyncio.TimeoutError:
+                    pass
                 
-                if i % 10 == 0:
-                    self._print_progress(len(processed_books), len(book_identifiers))
+                if batch and (done or len(batch) >= self.batch_size
+                              or time.monotonic() - last_flush >= self.flush_interval):
+                    # Database calls block, so they run off the event loop
+                    flushing, batch = batch, []
+                    flush = loop.run_in_executor(None, self._insert_batch, flushing)
+                    await asyncio.shield(flush)
+                if done or not batch:
+                    last_flush = time.monotonic()
+        except asyncio.CancelledError:
+            # Books already processed are written too, still off the event loop and
+            # only once a flush that was under way has finished
+            if flush is not None and not flush.done():
+                await flush
+            while True:
+                try:
+                    record = record_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if record is not None:
+                    batch.append(record)
+            if batch:
+                await loop.run_in_executor(None, self._insert_batch, batch)
+            raise
         
-        print(f"\nDetail fetching complete. Processed {len(processed_books)} books")
-        return processed_books
+        print(f"\nDatabase insertion complete. Inserted {self.stats['total_inserted']} new books")
     
-    def save_books_to_database(self, books_data: List[Dict]) -> int:
+    def _insert_batch(self, batch: List[Dict]) -> int:
         """
-        Save processed books to database
+        Insert one batch of processed books
         Returns number of successfully inserted books
         """
-        print("\nStarting database insertion phase...")
+        inserted = self.db_handler.insert_books_batch(batch)
+        self.stats["total_inserted"] += inserted
+        self.stats["total_duplicates"] += (len(batch) - inserted)
         
-        if not books_data:
-            print("No books to insert")
-            return 0
+        fetched_ids = [book["book_id"] for book in batch]
+        fetched_ids.extend(book["isbn"] for book in batch if book.get("isbn"))
+        for book in batch:
+            fetched_ids.extend(book.get("origin_ids", []))
+        self.journal.record_fetched(fetched_ids)
+        
+        print(f"  Inserted {inserted}/{len(batch)} books")
+        self._print_progress(self.stats["total_inserted"], self.target_count)
+        return inserted
+    
+    async def refresh_stale_books(self, older_than_days: int) -> int:
+        """
+        Refresh mode: fetch stored books again and write only those whose content changed
+        Every request revalidates its cached response, so books whose source is
+        unchanged mostly cost a 304 and no database write
+        Returns number of updated books
+        """
+        print(f"Refreshing books not updated for {older_than_days} days...")
+        after = None
         
-        # Insert in batches
-        total_inserted = 0
-        for i in range(0, len(books_data), self.batch_size):
-            batch = books_data[i:i + self.batch_size]
-            inserted = self.db_handler.insert_books_batch(batch)
-            total_inserted += inserted
-            self.stats["total_inserted"] += inserted
-            self.stats["total_duplicates"] += (len(batch) - inserted)
+        async with self.client_factory(self.rate_controller, self.response_cache) as client:
+            client.cache_max_age = 0
+            while True:
+                rows = self.db_handler.get_stale_books(older_than_days, after, self.batch_size, open_library_only=True)
+                if not rows:
+                    break
+                after = (rows[-1][4], rows[-1][0])
+                
+                books_data = await asyncio.gather(*[
+                    self._refetch_book(client, open_library_id) for _, _, open_library_id, _, _ in rows
+                ])
+                author_names = await self._resolve_author_names(client, [data for data in books_data if data])
+                
+                refreshed = []
+                for (book_id, isbn, _, source_url, _), book_data in zip(rows, books_data):
+                    processed = self.processor.process_book_data(book_data, isbn, author_names) if book_data else None
+                    if not processed:
+                        self.stats["total_failed"] += 1
+                        continue
+                    # Keep the stored identity even if the book is now reached by another key
+                    processed["book_id"] = book_id
+                    processed["source_url"] = source_url
+                    refreshed.append(processed)
+                
+                updated = self.db_handler.update_changed_books(refreshed)
+                self.stats["total_refreshed"] += len(refreshed)
+                self.stats["total_updated"] += updated
+                print(f"  Checked {len(rows)} books, updated {updated}")
             
-            print(f"  Batch {i//self.batch_size + 1}: Inserted {inserted}/{len(batch)} books")
-            self._print_progress(total_inserted, len(books_data))
+            self.stats["coalesced_requests"] += client.coalesced
+        
+        print(f"\nRefresh complete. Updated {self.stats['total_updated']} of {self.stats['total_refreshed']} refreshed books")
+        return self.stats["total_updated"]
+    
+    async def _refetch_book(self, client: AsyncOpenLibraryClient, open_library_id: str) -> Optional[Dict]:
+        """
+        Fetch the current data of a stored book by its open_library_id ("books/OL1M" or "works/OL1W")
+        Editions are requested alone through api/books, so each book keeps a stable,
+        revalidatable URL and comes back in the same format it was stored from
+        """
+        key = f"/{open_library_id}"
+        if "/books/" in key:
+            book_data = (await client.get_books_by_olids([key])).get(key)
+            if book_data:
+                return book_data
+        
+        record = await self._fetch_book_by_key(client, key)
+        return record[0] if record else None
+    
+    def run_refresh(self, older_than_days: int):
+        """
+        Refresh stored books instead of searching for new ones
+        """
+        print("=" * 60)
+        print("Open Library Book Refresh")
+        print("=" * 60)
         
-        print(f"\nDatabase insertion complete. Inserted {total_inserted} new books")
-        return total_inserted
+        try:
+            self.db_handler.connect()
+            self.db_handler.create_table_if_not_exists()
+            asyncio.run(self.refresh_stale_books(older_than_days))
+            self._print_final_stats()
+        finally:
+            if self.db_handler.pool:
+                self.db_handler.disconnect()
+            self.author_store.close()
+            self.scheduler.close()
+            self.journal.close()
+            self.identity_index.close()
     
     def run(self):
         """
@@ -300,23 +743,13 @@ class BookScraper:
             # Initialize database
             self.initialize_database()
             
-            # Search and collect book identifiers
-            book_identifiers = self.search_and_collect_books()
+            # Search, fetch, process and save concurrently
+            asyncio.run(self.run_pipeline())
             
-            if not book_identifiers:
+            if self.stats["total_processed"] == 0:
                 print("No books found. Exiting.")
                 return
             
-            # Fetch detailed information
-            books_data = self.fetch_book_details(book_identifiers)
-            
-            if not books_data:
-                print("No book data processed. Exiting.")
-                return
-            
-            # Save to database
-            self.save_books_to_database(books_data)
-            
             # Print final statistics
             self._print_final_stats()
             
@@ -325,8 +758,12 @@ class BookScraper:
             raise
         finally:
             # Close database connection
-            if self.db_handler.connection:
+            if self.db_handler.pool:
                 self.db_handler.disconnect()
+            self.author_store.close()
+            self.scheduler.close()
+            self.journal.close()
+            self.identity_index.close()
     
     def _get_limit_for_query_type(self, query_type: str) -> int:
         """
@@ -359,5 +796,16 @@ class BookScraper:
         print(f"Total books inserted: {self.stats['total_inserted']}")
         print(f"Total duplicates skipped: {self.stats['total_duplicates']}")
         print(f"Total failed: {self.stats['total_failed']}")
+        print(f"Author requests: {self.stats['author_requests']} ({self.author_store.count()} authors known)")
+        print(f"Coalesced requests: {self.stats['coalesced_requests']}")
+        print(f"Detail requests avoided for known books: {self.stats['requests_avoided']}")
+        print(f"Search requests: {self.stats['search_requests']} ({self.stats['queries_abandoned']} queries abandoned early)")
+        print(f"Frontier queries added: {self.stats['frontier_queries']}")
+        if self.stats["total_refreshed"]:
+            print(f"Books refreshed: {self.stats['total_refreshed']} ({self.stats['total_updated']} changed)")
+        self.rate_controller.print_stats()
+        if self.response_cache:
+            cache_stats = self.response_cache.stats
+            print(f"Cache hits: {cache_stats['hits']}, revalidated: {cache_stats['revalidated']}, misses: {cache_stats['misses']}")
         print("=" * 60)
 
@@ -3,6 +3,8 @@ Search strategy module for generating search queries
 Defines subjects, authors, and keywords for mixed search strategy
 """
 
+from typing import Dict, Iterable, List
+
 # Popular subjects/categories for book search
 SUBJECTS = [
     "Fiction",
@@ -75,54 +77,56 @@ class SearchStrategy:
     """
     Class to manage search queries for bulk book scraping
     Generates search queries based on subjects, authors, and keywords
+    
+    Also keeps a frontier of author and subject queries harvested from search
+    results: a term seen often enough becomes a new query once, until the
+    fan-out budget of frontier queries is spent
     """
     
-    def __init__(self):
+    def __init__(self, frontier_budget: int = 0, min_hits: int = 1):
         self.subjects = SUBJECTS
         self.authors = AUTHORS
         self.keywords = KEYWORDS
+        
+        self.frontier_budget = frontier_budget
+        self.min_hits = min_hits
+        self.frontier_queued = 0
+        self.frontier_hits: Dict[str, int] = {}
+        self.frontier_queries: Dict[str, Dict] = {}
+        # Lower-cased query strings already executed or queued
+        self.known_queries = {query_info["query"].lower() for query_info in self.get_all_queries()}
+    
+    def build_query(self, query_type: str, value: str) -> Dict:
+        """
+        Build the query dictionary of a subject, author or keyword
+        """
+        query = value if query_type == "keyword" else f"{query_type}:{value}"
+        return {
+            "type": query_type,
+            "value": value,
+            "query": query
+        }
     
     def get_subject_queries(self):
         """
         Generate search queries for subjects
         Returns list of query dictionaries with type and value
         """
-        queries = []
-        for subject in self.subjects:
-            queries.append({
-                "type": "subject",
-                "value": subject,
-                "query": f"subject:{subject}"
-            })
-        return queries
+        return [self.build_query("subject", subject) for subject in self.subjects]
     
     def get_author_queries(self):
         """
         Generate search queries for authors
         Returns list of query dictionaries with type and value
         """
-        queries = []
-        for author in self.authors:
-            queries.append({
-                "type": "author",
-                "value": author,
-                "query": f"author:{author}"
-            })
-        return queries
+        return [self.build_query("author", author) for author in self.authors]
     
     def get_keyword_queries(self):
         """
         Generate search queries for keywords
         Returns list of query dictionaries with type and value
         """
-        queries = []
-        for keyword in self.keywords:
-            queries.append({
-                "type": "keyword",
-                "value": keyword,
-                "query": keyword
-            })
-        return queries
+        return [self.build_query("keyword", keyword) for keyword in self.keywords]
     
     def get_all_queries(self):
         """
@@ -134,4 +138,42 @@ class SearchStrategy:
         all_queries.extend(self.get_author_queries())
         all_queries.extend(self.get_keyword_queries())
         return all_queries
-
+    
+    def harvest(self, query_type: str, values: Iterable[str]):
+        """
+        Count author names or subjects seen in search results as frontier candidates
+        Terms that are already queries are ignored
+        """
+        if self.frontier_queued >= self.frontier_budget:
+            return
+        for value in values:
+            query_info = self.build_query(query_type, value)
+            key = query_info["query"].lower()
+            if key in self.known_queries:
+                continue
+            self.frontier_hits[key] = self.frontier_hits.get(key, 0) + 1
+            self.frontier_queries.setdefault(key, query_info)
+    
+    def take_frontier_queries(self, limit: int) -> List[Dict]:
+        """
+        Promote up to limit of the most often seen candidates to queries
+        Returns list of new query dictionaries
+        """
+        limit = min(limit, self.frontier_budget - self.frontier_queued)
+        if limit <= 0:
+            return []
+        
+        candidates = [key for key, hits in self.frontier_hits.items() if hits >= self.min_hits]
+        candidates.sort(key=lambda key: self.frontier_hits[key], reverse=True)
+        queries = []
+        for key in candidates[:limit]:
+            queries.append(self.frontier_queries.pop(key))
+            del self.frontier_hits[key]
+            self.known_queries.add(key)
+        
+        self.frontier_queued += len(queries)
+        if self.frontier_queued >= self.frontier_budget:
+            # Budget spent: drop the remaining candidates
+            self.frontier_hits.clear()
+            self.frontier_queries.clear()
+        return queries
@@ -0,0 +1,11 @@
+"""
+Test setup for the Open Library crawler
+Puts the crawler and the shared modules on the import path, as running a script from its directory does
+"""
+
+import os
+import sys
+
+CRAWLER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(CRAWLER_DIR, "..", "crawler_common"))
+sys.path.insert(0, CRAWLER_DIR)
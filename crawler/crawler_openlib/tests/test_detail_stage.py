@@ -0,0 +1,88 @@
+"""
+Detail stage tests with Open Library replaced by an in-memory client, so no HTTP requests are made
+"""
+
+import asyncio
+import pytest
+
+import config
+from scraper import BookScraper
+
+
+class FakeClient:
+    """
+    Serves first editions and bibkeys lookups from dictionaries and counts detail requests
+    """
+
+    def __init__(self, first_editions, editions):
+        self.first_editions = first_editions
+        self.editions = editions
+        self.detail_requests = []
+        self.isbn_requests = []
+
+    async def get_first_edition_key(self, work_key):
+        return self.first_editions.get(work_key)
+
+    async def get_books_by_olids(self, edition_ids):
+        return {edition_id: self.editions.get(edition_id) for edition_id in edition_ids}
+
+    async def get_books_by_isbns(self, isbns):
+        self.isbn_requests.extend(isbns)
+        return {isbn: self.editions.get(isbn) for isbn in isbns}
+
+    async def get_work_details(self, key):
+        self.detail_requests.append(key)
+        return None
+
+    async def get_book_details(self, key):
+        self.detail_requests.append(key)
+        return None
+
+
+@pytest.fixture
+def scraper(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "JOURNAL_PATH", str(tmp_path / "crawl_journal.jsonl"))
+    monkeypatch.setattr(config, "DEDUPE_PATH", str(tmp_path / "dedupe.db"))
+    monkeypatch.setattr(config, "AUTHOR_STORE_PATH", str(tmp_path / "authors.db"))
+    monkeypatch.setattr(config, "QUERY_YIELD_PATH", str(tmp_path / "query_yield.db"))
+    scraper = BookScraper()
+    yield scraper
+    scraper.journal.close()
+
+
+def test_edition_listed_and_first_edition_of_work_resolves_both(scraper):
+    client = FakeClient(
+        first_editions={"/works/OL1W": "/books/OL1M", "/works/OL2W": "/books/OL2M"},
+        editions={"OL1M": {"key": "/books/OL1M", "title": "One"}, "OL2M": {"key": "/books/OL2M", "title": "Two"}}
+    )
+
+    records = asyncio.run(scraper._fetch_books_by_keys(client, ["/books/OL1M", "/works/OL1W", "/works/OL2W"]))
+
+    assert sorted(source_url for _, _, source_url, _ in records) == sorted([
+        f"{config.OPEN_LIBRARY_BOOKS_DETAIL_URL}/books/OL1M",
+        f"{config.OPEN_LIBRARY_WORKS_URL}/works/OL1W",
+        f"{config.OPEN_LIBRARY_WORKS_URL}/works/OL2W"
+    ])
+    assert client.detail_requests == []
+
+
+def test_key_identifier_with_isbn_is_fetched_once(scraper):
+    client = FakeClient(
+        first_editions={},
+        editions={"OL1M": {"key": "/books/OL1M", "title": "One"}, "9780000000002": {"key": "/books/OL2M", "title": "Two"}}
+    )
+    identifier_queue = asyncio.Queue()
+    raw_queue = asyncio.Queue()
+    for item in (
+        {"type": "key", "value": "/books/OL1M", "work_key": "/works/OL1W", "isbn": "9780000000001"},
+        {"type": "isbn", "value": "9780000000002", "isbn": "9780000000002"},
+        None
+    ):
+        identifier_queue.put_nowait(item)
+
+    asyncio.run(scraper.fetch_book_details(client, identifier_queue, raw_queue, asyncio.Queue()))
+
+    assert client.isbn_requests == ["9780000000002"]
+    titles = sorted(raw_queue.get_nowait()[0]["title"] for _ in range(raw_queue.qsize()))
+    assert titles == ["One", "Two"]
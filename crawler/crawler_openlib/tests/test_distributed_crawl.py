@@ -0,0 +1,243 @@
+"""
+Work queue and distributed crawl tests against a local PostgreSQL server
+Open Library is replaced by an in-memory search client, so no HTTP requests are made
+
+Set TEST_DATABASE_URL (e.g. postgresql://postgres@localhost:5432/postgres) to run them;
+each test creates and drops its own scratch database on that server
+"""
+
+import os
+import uuid
+import asyncio
+import threading
+import datetime
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+from psycopg2.extensions import parse_dsn
+
+import config
+from database_handler import DatabaseHandler
+from distributed_crawl import QueueWorker
+from identity_index import IdentityIndex
+from work_queue import WorkQueue
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+QUERIES = ["subject:art", "subject:history", "subject:science", "subject:travel"]
+PAGE_SIZE = 5
+
+
+@pytest.fixture
+def db_config(monkeypatch, tmp_path):
+    """
+    Create a scratch database and point the crawler config (and its local files) at it
+    """
+    params = parse_dsn(DATABASE_URL)
+    name = f"crawler_test_{uuid.uuid4().hex[:12]}"
+    admin = psycopg2.connect(DATABASE_URL)
+    admin.autocommit = True
+    admin.cursor().execute(f"CREATE DATABASE {name}")
+
+    db_config = {
+        "host": params.get("host", "localhost"),
+        "port": int(params.get("port", 5432)),
+        "database": name,
+        "user": params.get("user"),
+        "password": params.get("password")
+    }
+    monkeypatch.setattr(config, "DB_CONFIG", db_config)
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "JOURNAL_PATH", str(tmp_path / "crawl_journal.jsonl"))
+    monkeypatch.setattr(config, "DEDUPE_PATH", str(tmp_path / "dedupe.db"))
+    monkeypatch.setattr(config, "AUTHOR_STORE_PATH", str(tmp_path / "authors.db"))
+    monkeypatch.setattr(config, "QUERY_YIELD_PATH", str(tmp_path / "query_yield.db"))
+    monkeypatch.setattr(config, "WORK_QUEUE_POLL_INTERVAL", 0.05)
+    monkeypatch.setattr(config, "FLUSH_INTERVAL", 0.05)
+    try:
+        yield db_config
+    finally:
+        admin.cursor().execute(f"DROP DATABASE {name} WITH (FORCE)")
+        admin.close()
+
+
+@pytest.fixture
+def db_handler(db_config):
+    """
+    Connected handler with the books and work queue tables created
+    """
+    handler = DatabaseHandler()
+    handler.connect()
+    handler.create_table_if_not_exists()
+    with handler.connection() as connection:
+        WorkQueue(connection).create_table_if_not_exists()
+    try:
+        yield handler
+    finally:
+        handler.disconnect()
+
+
+def search_doc(number: int) -> dict:
+    return {
+        "key": f"/works/OL{number}W",
+        "edition_key": [f"OL{number}M"],
+        "title": f"Book {number}",
+        "publisher": ["Test Press"],
+        "author_name": [f"Author {number % 7}"]
+    }
+
+
+class FakeSearchClient:
+    """
+    Stand-in for AsyncOpenLibraryClient serving two pages per query
+    Neighbouring queries share half their books, and the first request for
+    subject:science fails once
+    """
+
+    def __init__(self, rate_controller=None, response_cache=None):
+        self.coalesced = 0
+        self.failed = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def search_books(self, query, limit=100, offset=0, fields=None):
+        await asyncio.sleep(0.01)
+        if query == "subject:science" and query not in self.failed:
+            self.failed.add(query)
+            return None
+        first = QUERIES.index(query) * PAGE_SIZE + offset
+        return {"numFound": 2 * PAGE_SIZE, "docs": [search_doc(first + i) for i in range(limit)]}
+
+
+def make_worker(worker_id: str) -> QueueWorker:
+    worker = QueueWorker(worker_id)
+    worker.client_factory = FakeSearchClient
+    worker.search_only_mode = True
+    worker.search_limit = PAGE_SIZE
+    worker.related_terms = 0
+    worker.target_count = 1000
+    return worker
+
+
+def run_worker(worker_id: str, workers: list):
+    # Each worker owns SQLite stores, so it is built on the thread that runs it
+    worker = make_worker(worker_id)
+    workers.append(worker)
+    worker.initialize_database()
+    try:
+        asyncio.run(worker.run_pipeline())
+    finally:
+        worker.db_handler.disconnect()
+        worker.author_store.close()
+        worker.scheduler.close()
+        worker.journal.close()
+        worker.identity_index.close()
+
+
+def test_claim_complete_fail_and_release_stale(db_handler):
+    with db_handler.connection() as connection:
+        queue = WorkQueue(connection)
+        assert queue.enqueue([{"query": query, "type": "subject", "offset": 0} for query in QUERIES[:3]]) == 3
+        assert queue.enqueue([{"query": QUERIES[0], "type": "subject", "offset": 0}]) == 0
+
+        first = queue.claim("worker-a")
+        assert (first["query"], first["offset"]) == (QUERIES[0], 0)
+        queue.complete(first["id"], 4)
+        assert queue.total_new_books() == 4
+        assert queue.new_books_for_query(QUERIES[0]) == 4
+
+        # A failed item is retried until it has been claimed max_attempts times
+        second = queue.claim("worker-a")
+        queue.fail(second["id"], 2)
+        assert queue.claim("worker-b")["id"] == second["id"]
+        queue.fail(second["id"], 2)
+        assert queue.status_counts() == {"done": 1, "failed": 1, "pending": 1}
+
+        # Items of a worker that stopped responding go back to the queue
+        third = queue.claim("worker-a")
+        assert queue.release_stale(3600) == 0
+        connection.cursor().execute(
+            "UPDATE crawl_work_items SET claimed_at = NOW() - INTERVAL '1 hour' WHERE id = %s", (third["id"],)
+        )
+        connection.commit()
+        assert queue.release_stale(60) == 1
+        assert queue.claim("worker-b")["id"] == third["id"]
+        assert queue.claim("worker-b") is None
+
+
+def test_concurrent_claims_never_share_an_item(db_handler):
+    with db_handler.connection() as connection:
+        WorkQueue(connection).enqueue([
+            {"query": f"subject:{number}", "type": "subject", "offset": 0} for number in range(200)
+        ])
+
+    claimed = {"worker-a": [], "worker-b": []}
+
+    def claim_all(worker_id: str):
+        with db_handler.connection() as connection:
+            queue = WorkQueue(connection)
+            while True:
+                item = queue.claim(worker_id)
+                if not item:
+                    break
+                claimed[worker_id].append(item["id"])
+
+    threads = [threading.Thread(target=claim_all, args=(worker_id,)) for worker_id in claimed]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = claimed["worker-a"] + claimed["worker-b"]
+    assert len(ids) == 200
+    assert len(set(ids)) == 200
+
+
+def test_sync_reads_rows_committed_after_the_watermark(db_handler):
+    index = IdentityIndex()
+    book = {"book_id": "OL1M", "name": "Book 1", "publisher": "Test Press", "author": "Author 1", "isbn": None,
+            "open_library_id": "OL1M", "source_url": None}
+    assert db_handler.insert_books_batch([book]) == 1
+    assert db_handler.load_identity_index(index) == 1
+
+    # A transaction that started earlier but committed later stamps an older created_at
+    late = dict(book, book_id="OL2M", name="Book 2", open_library_id="OL2M")
+    db_handler.insert_books_batch([late])
+    with db_handler.cursor() as cursor:
+        cursor.execute(
+            "UPDATE books SET created_at = %s WHERE book_id = 'OL2M'",
+            (index.identities.synced_until - datetime.timedelta(seconds=1),)
+        )
+
+    db_handler.load_identity_index(index)
+    assert index.contains_identifier({"type": "key", "value": "/books/OL2M"})
+
+
+def test_two_workers_drain_the_queue_without_duplicates(db_handler):
+    with db_handler.connection() as connection:
+        WorkQueue(connection).enqueue([{"query": query, "type": "subject", "offset": 0} for query in QUERIES])
+
+    workers = []
+    threads = [threading.Thread(target=run_worker, args=(worker_id, workers)) for worker_id in ("host-0", "host-1")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+    assert not any(thread.is_alive() for thread in threads)
+
+    with db_handler.connection() as connection:
+        queue = WorkQueue(connection)
+        # Two pages per query, all crawled once the failed search was retried
+        assert queue.status_counts() == {"done": 2 * len(QUERIES)}
+
+    # Neighbouring queries overlap, so the books table holds each book once
+    expected = {f"OL{number}M" for number in range((len(QUERIES) + 1) * PAGE_SIZE)}
+    with db_handler.cursor() as cursor:
+        cursor.execute("SELECT book_id FROM books")
+        assert {row[0] for row in cursor.fetchall()} == expected
+    assert sum(worker.stats["work_items"] for worker in workers) == 2 * len(QUERIES)
@@ -0,0 +1,96 @@
+"""
+Dump importer tests on small editions/works/authors dumps in tests/fixtures
+"""
+
+import os
+import sys
+import pytest
+
+import config
+import dump_importer
+from dump_importer import DumpImporter
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+AUTHORS = os.path.join(FIXTURES, "ol_dump_authors.txt.gz")
+WORKS = os.path.join(FIXTURES, "ol_dump_works.txt.gz")
+EDITIONS = os.path.join(FIXTURES, "ol_dump_editions.txt.gz")
+
+
+class RecordingHandler:
+    """
+    Stand-in for DatabaseHandler that keeps inserted books in memory
+    """
+
+    def __init__(self):
+        self.books = {}
+
+    def insert_books_batch(self, books):
+        self.books.update((book["book_id"], book) for book in books)
+        return len(books)
+
+
+@pytest.fixture(autouse=True)
+def local_indexes(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "AUTHOR_STORE_PATH", str(tmp_path / "authors.db"))
+    monkeypatch.setattr(config, "DUMP_INDEX_PATH", str(tmp_path / "dump_index.db"))
+    monkeypatch.setattr(config, "DUMP_BATCH_SIZE", 2)
+
+
+def import_fixtures(db_handler=None) -> DumpImporter:
+    importer = DumpImporter(db_handler)
+    try:
+        importer.index_authors(AUTHORS)
+        importer.index_works(WORKS)
+        importer.import_editions(EDITIONS)
+    finally:
+        importer.close()
+    return importer
+
+
+def test_dry_run_processes_fixtures_without_a_database(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", [
+        "dump_importer.py", "--authors", AUTHORS, "--works", WORKS, "--editions", EDITIONS, "--dry-run"
+    ])
+    monkeypatch.setattr(dump_importer, "DatabaseHandler", None)
+    dump_importer.main()
+
+    output = capsys.readouterr().out
+    assert "Indexed 2 authors" in output
+    assert "Indexed 3 works" in output
+    # Malformed lines are skipped; the edition without a title or work fails
+    assert "Editions read: 5" in output
+    assert "Books processed: 4" in output
+    assert "Books inserted: 0" in output
+    assert "Failed: 1" in output
+
+
+def test_editions_inherit_work_title_and_author_names():
+    handler = RecordingHandler()
+    importer = import_fixtures(handler)
+    books = handler.books
+    assert importer.stats["total_inserted"] == 4
+    assert set(books) == {"OL100M", "OL101M", "OL102M", "OL103M"}
+
+    # Own title and author key, named through the authors dump
+    assert books["OL100M"]["name"] == "A Wizard of Earthsea"
+    assert books["OL100M"]["author"] == "Ursula K. Le Guin"
+    assert books["OL100M"]["isbn"] == "9780547773742"
+
+    # Title and author both inherited from the work
+    assert books["OL101M"]["name"] == "Invisible Cities"
+    assert books["OL101M"]["author"] == "Italo Calvino"
+
+    # The edition's own title wins over the work's
+    assert books["OL102M"]["name"] == "Le città invisibili"
+    assert books["OL102M"]["author"] == "Italo Calvino"
+
+    # The work's author is missing from the authors dump
+    assert books["OL103M"]["author"] is None
+    assert books["OL103M"]["source_url"] == f"{config.OPEN_LIBRARY_BOOKS_DETAIL_URL}/OL103M"
+
+
+def test_dry_run_counts_processed_books():
+    importer = import_fixtures()
+    assert importer.stats["editions_read"] == 5
+    assert importer.stats["total_processed"] == 4
+    assert importer.stats["total_inserted"] == 0
@@ -0,0 +1,83 @@
+"""
+Search stage tests with search pages served from memory, so no HTTP requests are made
+"""
+
+import asyncio
+import pytest
+
+import config
+from scraper import BookScraper
+
+
+@pytest.fixture
+def scraper(monkeypatch, tmp_path):
+    """
+    Scraper with its local files in tmp_path and a target of three books
+    """
+    monkeypatch.setattr(config, "CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "JOURNAL_PATH", str(tmp_path / "crawl_journal.jsonl"))
+    monkeypatch.setattr(config, "DEDUPE_PATH", str(tmp_path / "dedupe.db"))
+    monkeypatch.setattr(config, "AUTHOR_STORE_PATH", str(tmp_path / "authors.db"))
+    monkeypatch.setattr(config, "QUERY_YIELD_PATH", str(tmp_path / "query_yield.db"))
+    monkeypatch.setattr(config, "FRONTIER_MAX_QUERIES", 0)
+    scraper = BookScraper()
+    scraper.target_count = 3
+    yield scraper
+    scraper.journal.close()
+
+
+def identifier(number: int):
+    return {"type": "key", "value": f"/books/OL{number}M", "work_key": f"/works/OL{number}W"}
+
+
+def test_identifiers_past_target_stay_unknown(scraper):
+    # One page of five books, the second repeated
+    page = [identifier(1), identifier(2), identifier(2), identifier(3), identifier(4), identifier(5)]
+
+    async def search_page(client, query_string, offset):
+        return page, len(page)
+
+    scraper._search_page = search_page
+    identifier_queue = asyncio.Queue()
+    queued = asyncio.run(scraper.search_and_collect_books(None, identifier_queue))
+
+    assert queued == 3
+    assert [identifier_queue.get_nowait()["value"] for _ in range(3)] == ["/books/OL1M", "/books/OL2M", "/books/OL3M"]
+    assert identifier_queue.empty()
+    for number in (1, 2, 3):
+        assert scraper.identity_index.contains_identifier(identifier(number))
+    for number in (4, 5):
+        assert not scraper.identity_index.contains_identifier(identifier(number))
+
+
+class RecordingHandler:
+    """
+    Stand-in for DatabaseHandler that reports every book it is given as inserted
+    """
+
+    def insert_books_batch(self, books):
+        return len(books)
+
+
+def test_resume_skips_books_stored_under_another_id(scraper):
+    # A work key and a search ISBN that both differ from the stored edition
+    work_identifier = {"type": "key", "value": "/works/OL7W", "work_key": "/works/OL7W", "isbn": "9780000000001"}
+    scraper.journal.record_page("subject:art", 0, [work_identifier])
+    scraper.db_handler = RecordingHandler()
+    scraper._insert_batch([{
+        "book_id": "OL70M",
+        "name": "Seven",
+        "isbn": "9780000000070",
+        "origin_ids": scraper._origin_ids(work_identifier)
+    }])
+    scraper.journal.close()
+
+    resumed = BookScraper(resume=True)
+    identifier_queue = asyncio.Queue()
+    try:
+        journaled = asyncio.run(resumed._requeue_journal_items(identifier_queue))
+    finally:
+        resumed.journal.close()
+
+    assert journaled == 1
+    assert identifier_queue.empty()
@@ -55,8 +55,9 @@ def view_all_books(limit: int = None):
         else:
             query = "SELECT book_id, name, author, publisher, isbn, price, created_at FROM books ORDER BY created_at DESC"
         
-        db_handler.cursor.execute(query)
-        books = db_handler.cursor.fetchall()
+        with db_handler.cursor() as cursor:
+            cursor.execute(query)
+            books = cursor.fetchall()
         
         if not books:
             print("No books found in database.")
@@ -99,20 +100,21 @@ def view_statistics():
         db_handler.connect()
         
         # Get various statistics
-        db_handler.cursor.execute("SELECT COUNT(*) FROM books")
-        total_books = db_handler.cursor.fetchone()[0]
-        
-        db_handler.cursor.execute("SELECT COUNT(DISTINCT author) FROM books WHERE author IS NOT NULL")
-        unique_authors = db_handler.cursor.fetchone()[0]
-        
-        db_handler.cursor.execute("SELECT COUNT(DISTINCT publisher) FROM books WHERE publisher IS NOT NULL")
-        unique_publishers = db_handler.cursor.fetchone()[0]
-        
-        db_handler.cursor.execute("SELECT COUNT(*) FROM books WHERE isbn IS NOT NULL")
-        books_with_isbn = db_handler.cursor.fetchone()[0]
-        
-        db_handler.cursor.execute("SELECT name, author FROM books ORDER BY created_at DESC LIMIT 5")
-        recent_books = db_handler.cursor.fetchall()
+        with db_handler.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM books")
+            total_books = cursor.fetchone()[0]
+            
+            cursor.execute("SELECT COUNT(DISTINCT author) FROM books WHERE author IS NOT NULL")
+            unique_authors = cursor.fetchone()[0]
+            
+            cursor.execute("SELECT COUNT(DISTINCT publisher) FROM books WHERE publisher IS NOT NULL")
+            unique_publishers = cursor.fetchone()[0]
+            
+            cursor.execute("SELECT COUNT(*) FROM books WHERE isbn IS NOT NULL")
+            books_with_isbn = cursor.fetchone()[0]
+            
+            cursor.execute("SELECT name, author FROM books ORDER BY created_at DESC LIMIT 5")
+            recent_books = cursor.fetchall()
         
         print(f"\n{'='*70}")
         print("Database Statistics")
@@ -160,8 +162,9 @@ def search_books(keyword: str):
         """
         
         search_pattern = f"%{keyword}%"
-        db_handler.cursor.execute(search_query, (search_pattern, search_pattern, search_pattern))
-        books = db_handler.cursor.fetchall()
+        with db_handler.cursor() as cursor:
+            cursor.execute(search_query, (search_pattern, search_pattern, search_pattern))
+            books = cursor.fetchall()
         
         if not books:
             print(f"\nNo books found matching '{keyword}'")
@@ -0,0 +1,205 @@
+"""
+Work queue module
+PostgreSQL-backed claim table of search pages shared by distributed crawl workers
+"""
+
+import psycopg2
+from psycopg2.extras import execute_values
+from typing import Dict, List, Optional
+
+
+class WorkQueue:
+    """
+    Queue of (query, offset) search pages stored in the crawl_work_items table
+
+    Workers claim pending items with SELECT ... FOR UPDATE SKIP LOCKED, so any
+    number of processes on any number of hosts can pull from the same table
+    without handing out an item twice. Items claimed by a worker that died are
+    returned to the queue by release_stale().
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.cursor()
+
+    def create_table_if_not_exists(self):
+        """
+        Create the work item table, and the books.created_at index used to
+        refresh worker dedupe indexes incrementally
+        """
+        try:
+            self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_work_items (
+                id SERIAL PRIMARY KEY,
+                query TEXT NOT NULL,
+                query_type VARCHAR(20) NOT NULL,
+                query_offset INTEGER NOT NULL,
+                status VARCHAR(10) NOT NULL DEFAULT 'pending',
+                claimed_by TEXT,
+                claimed_at TIMESTAMP,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                new_books INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (query, query_offset)
+            )
+            """)
+            self.cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_crawl_work_items_pending ON crawl_work_items (id) WHERE status = 'pending'"
+            )
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_books_created_at ON books (created_at)")
+            self.connection.commit()
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            print(f"Error creating work queue table: {e}")
+            raise
+
+    def enqueue(self, items: List[Dict]) -> int:
+        """
+        Add {"query", "type", "offset"} items; pages already queued are ignored
+        Returns number of new items
+        """
+        if not items:
+            return 0
+        try:
+            added = execute_values(
+                self.cursor,
+                """
+                INSERT INTO crawl_work_items (query, query_type, query_offset)
+                VALUES %s
+                ON CONFLICT (query, query_offset) DO NOTHING
+                RETURNING id
+                """,
+                [(item["query"], item["type"], item["offset"]) for item in items],
+                fetch=True
+            )
+            self.connection.commit()
+            return len(added)
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            print(f"Error enqueuing work items: {e}")
+            return 0
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """
+        Claim the oldest pending item for worker_id
+        Returns the item or None if nothing is pending
+        """
+        try:
+            self.cursor.execute("""
+            UPDATE crawl_work_items
+            SET status = 'claimed', claimed_by = %s, claimed_at = NOW(), attempts = attempts + 1
+            WHERE id = (
+                SELECT id FROM crawl_work_items
+                WHERE status = 'pending'
+                ORDER BY id
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING id, query, query_type, query_offset
+            """, (worker_id,))
+            row = self.cursor.fetchone()
+            self.connection.commit()
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            print(f"Error claiming work item: {e}")
+            return None
+
+        if not row:
+            return None
+        return {"id": row[0], "query": row[1], "type": row[2], "offset": row[3]}
+
+    def complete(self, item_id: int, new_books: int):
+        """
+        Mark an item done with the number of new books it yielded
+        """
+        self._execute(
+            "UPDATE crawl_work_items SET status = 'done', new_books = %s WHERE id = %s",
+            (new_books, item_id)
+        )
+
+    def fail(self, item_id: int, max_attempts: int):
+        """
+        Return a failed item to the queue, or give up after max_attempts
+        """
+        self._execute("""
+            UPDATE crawl_work_items
+            SET status = CASE WHEN attempts < %s THEN 'pending' ELSE 'failed' END,
+                claimed_by = NULL
+            WHERE id = %s
+        """, (max_attempts, item_id))
+
+    def release_stale(self, timeout_seconds: int) -> int:
+        """
+        Return items claimed longer than timeout_seconds ago (crashed workers) to the queue
+        Returns number of released items
+        """
+        return self._execute("""
+            UPDATE crawl_work_items
+            SET status = 'pending', claimed_by = NULL
+            WHERE status = 'claimed' AND claimed_at < NOW() - make_interval(secs => %s)
+        """, (timeout_seconds,))
+
+    def new_books_for_query(self, query: str) -> int:
+        """
+        Get number of new books yielded so far by all completed pages of a query
+        """
+        return self._fetch_value(
+            "SELECT COALESCE(SUM(new_books), 0) FROM crawl_work_items WHERE query = %s AND status = 'done'",
+            (query,)
+        )
+
+    def total_new_books(self) -> int:
+        """
+        Get number of new books yielded by all completed items
+        """
+        return self._fetch_value(
+            "SELECT COALESCE(SUM(new_books), 0) FROM crawl_work_items WHERE status = 'done'"
+        )
+
+    def status_counts(self) -> Dict[str, int]:
+        """
+        Get number of items per status
+        """
+        try:
+            self.cursor.execute("SELECT status, COUNT(*) FROM crawl_work_items GROUP BY status")
+            counts = dict(self.cursor.fetchall())
+            self.connection.commit()
+            return counts
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            print(f"Error getting work queue status: {e}")
+            return {}
+
+    def clear(self):
+        """
+        Delete all work items
+        """
+        self._execute("DELETE FROM crawl_work_items")
+
+    def _execute(self, query: str, params: tuple = ()) -> int:
+        """
+        Run one statement in its own transaction
+        Returns number of affected rows
+        """
+        try:
+            self.cursor.execute(query, params)
+            affected = self.cursor.rowcount
+            self.connection.commit()
+            return affected
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            print(f"Error updating work queue: {e}")
+            return 0
+
+    def _fetch_value(self, query: str, params: tuple = ()) -> int:
+        """
+        Run a single-value query in its own transaction
+        """
+        try:
+            self.cursor.execute(query, params)
+            value = self.cursor.fetchone()[0]
+            self.connection.commit()
+            return value
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            print(f"Error reading work queue: {e}")
+            return 0
@@ -10,9 +10,11 @@ from typing import List, Dict, Optional
 import sys
 import os
 
-# Add crawler_openlib to path to import config
+# Add crawler_openlib to path to import config, and crawler_common for the shared database
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'crawler_openlib'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'crawler_common'))
 import config
+from book_database import BookDatabase
 
 
 class BookExporter:
@@ -22,37 +24,19 @@ class BookExporter:
     """
     
     def __init__(self):
-        self.db_config = config.DB_CONFIG
-        self.connection = None
-        self.cursor = None
+        self.database = BookDatabase.from_config(config)
     
     def connect(self):
         """
-        Establish connection to PostgreSQL database
+        Open the shared database connection pool
         """
-        try:
-            self.connection = psycopg2.connect(
-                host=self.db_config["host"],
-                port=self.db_config["port"],
-                database=self.db_config["database"],
-                user=self.db_config["user"],
-                password=self.db_config["password"]
-            )
-            self.cursor = self.connection.cursor()
-            print("Database connection established successfully")
-        except psycopg2.Error as e:
-            print(f"Error connecting to database: {e}")
-            raise
+        self.database.connect()
     
     def disconnect(self):
         """
-        Close database connection
+        Close database connections
         """
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
-        print("Database connection closed")
+        self.database.disconnect()
     
     def fetch_all_books(self) -> List[Dict]:
         """
@@ -65,8 +49,9 @@ class BookExporter:
                 FROM books
                 ORDER BY book_id
             """
-            self.cursor.execute(query)
-            rows = self.cursor.fetchall()
+            with self.database.cursor() as cursor:
+                cursor.execute(query)
+                rows = cursor.fetchall()
             
             books = []
             for row in rows:
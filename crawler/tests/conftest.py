@@ -0,0 +1,9 @@
+"""
+Test setup for the tools shared by the crawlers
+Puts the crawler directory on the import path, as running a script from it does
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,82 @@
+"""
+Bulk loader tests against a local PostgreSQL server
+
+Set TEST_DATABASE_URL (e.g. postgresql://postgres@localhost:5432/postgres) to run them;
+each test creates and drops its own scratch database on that server
+"""
+
+import os
+import uuid
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+from psycopg2.extensions import make_dsn
+
+from crawler_common.bulk_loader import copy_books, insert_books_values
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+@pytest.fixture
+def cursor():
+    """
+    Cursor on a scratch database with an empty books table
+    """
+    name = f"loader_test_{uuid.uuid4().hex[:12]}"
+    admin = psycopg2.connect(DATABASE_URL)
+    admin.autocommit = True
+    admin.cursor().execute(f"CREATE DATABASE {name}")
+    connection = psycopg2.connect(make_dsn(DATABASE_URL, dbname=name))
+    try:
+        cursor = connection.cursor()
+        cursor.execute("""
+        CREATE TABLE books (
+            book_id VARCHAR(255) PRIMARY KEY,
+            name TEXT NOT NULL,
+            publisher TEXT,
+            author TEXT,
+            price NUMERIC(10, 2) DEFAULT 0,
+            isbn VARCHAR(20),
+            open_library_id VARCHAR(255),
+            source_url TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        connection.commit()
+        yield cursor
+    finally:
+        connection.close()
+        admin.cursor().execute(f"DROP DATABASE {name} WITH (FORCE)")
+        admin.close()
+
+
+def book(book_id: str, isbn=None) -> dict:
+    return {"book_id": book_id, "name": f"Book {book_id}", "price": 100, "isbn": isbn}
+
+
+@pytest.mark.parametrize("loader", [insert_books_values, copy_books])
+def test_batch_duplicates_and_stored_books_are_skipped(cursor, loader):
+    assert loader(cursor, [book("stored", "9780000000001")]) == 1
+    cursor.connection.commit()
+
+    batch = [
+        book("b", "9780000000002"),
+        book("a", "9780000000002"),   # same ISBN in the batch: lowest book_id wins
+        book("c", "9780000000001"),   # ISBN already stored
+        book("stored", "9780000000009"),
+        book("d"),
+        book("e"),                    # books without ISBN never collide
+        book("d"),                    # same book_id in the batch
+    ]
+    assert loader(cursor, batch) == 3
+    cursor.connection.commit()
+
+    cursor.execute("SELECT book_id, isbn FROM books ORDER BY book_id")
+    assert cursor.fetchall() == [
+        ("a", "9780000000002"),
+        ("d", None),
+        ("e", None),
+        ("stored", "9780000000001"),
+    ]
@@ -0,0 +1,45 @@
+"""
+Crawl journal tests: resuming and keeping the previous journal on a fresh run
+"""
+
+import os
+
+from crawler_common.crawl_journal import CrawlJournal
+
+
+def test_resume_continues_journal(tmp_path):
+    path = str(tmp_path / "crawl_journal.jsonl")
+    journal = CrawlJournal(path)
+    journal.record_page("query:python", 0, [{"key": "/works/OL1W"}])
+    journal.record_fetched(["/books/OL1M"])
+    journal.close()
+
+    journal = CrawlJournal(path, resume=True)
+    assert journal.last_cursor("query:python") == 0
+    assert journal.source_items("query:python") == [{"key": "/works/OL1W"}]
+    assert journal.was_fetched("/books/OL1M")
+    journal.close()
+
+
+def test_fresh_run_keeps_previous_journal(tmp_path):
+    path = str(tmp_path / "crawl_journal.jsonl")
+    journal = CrawlJournal(path)
+    journal.record_page("query:python", 100, [])
+    journal.close()
+    os.utime(path, (0, 0))
+
+    journal = CrawlJournal(path)
+    assert journal.last_cursor("query:python") is None
+    journal.record_page("query:rust", 0, [])
+    journal.close()
+
+    rotated = [name for name in os.listdir(tmp_path) if name.startswith("crawl_journal.jsonl.")]
+    assert len(rotated) == 1
+    previous = CrawlJournal(str(tmp_path / rotated[0]), resume=True)
+    assert previous.last_cursor("query:python") == 100
+    previous.close()
+
+    # A second fresh run within the same second does not overwrite the first rotation
+    os.utime(path, (0, 0))
+    CrawlJournal(path).close()
+    assert len([name for name in os.listdir(tmp_path) if name.startswith("crawl_journal.jsonl.")]) == 2
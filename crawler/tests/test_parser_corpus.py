@@ -0,0 +1,46 @@
+"""
+Parser parity tests: every HTML backend must reproduce the golden results of parser_corpus
+"""
+
+import os
+import json
+import pytest
+
+import benchmark_parsers
+from benchmark_parsers import BACKENDS, KINDS, SITES, golden_path, load_pages, normalize, parse_page
+
+CORPUS = os.path.join(benchmark_parsers.CRAWLER_DIR, "parser_corpus")
+
+PAGES = [
+    (site, kind, path, html)
+    for site in SITES
+    for kind in KINDS
+    for path, html in load_pages(CORPUS, site, kind)
+]
+
+
+def test_corpus_covers_every_site_and_page_kind():
+    assert {(site, kind) for site, kind, _, _ in PAGES} == {(site, kind) for site in SITES for kind in KINDS}
+    for _, _, path, _ in PAGES:
+        assert os.path.exists(golden_path(path)), f"missing golden result for {path}"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize(
+    "site,kind,path,html",
+    PAGES,
+    ids=[os.path.relpath(path, CORPUS) for _, _, path, _ in PAGES]
+)
+def test_backend_matches_golden_result(backend, site, kind, path, html):
+    if backend == "lxml":
+        pytest.importorskip("lxml.html")
+        pytest.importorskip("cssselect")
+    elif backend == "selectolax":
+        pytest.importorskip("selectolax")
+    else:
+        pytest.importorskip("bs4")
+
+    with open(golden_path(path), "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    parser = SITES[site][0](backend)
+    assert normalize(parse_page(parser, site, kind, path, html)) == expected
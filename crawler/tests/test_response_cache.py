@@ -0,0 +1,78 @@
+"""
+Response cache tests: key normalization and size-bounded eviction
+"""
+
+import os
+import sqlite3
+
+from crawler_common.response_cache import ResponseCache
+
+
+def test_key_ignores_param_types_and_order():
+    url = "https://openlibrary.org/search.json"
+    key = ResponseCache.make_key("get", url, {"q": "python", "page": 2, "limit": 100})
+
+    assert key == ResponseCache.make_key("GET", url, {"limit": "100", "page": "2", "q": "python"})
+    assert key == ResponseCache.make_key("GET", url, {"q": "python", "page": 2, "limit": 100, "fields": None})
+    assert key != ResponseCache.make_key("GET", url, {"q": "python", "page": 3, "limit": 100})
+
+
+def test_total_size_follows_puts_and_deletes(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_size_bytes=10 ** 6, ttl=60)
+    cache.put("aa1", b"x" * 1000)
+    cache.put("bb2", os.urandom(2000))
+    cache.put("aa1", os.urandom(3000))
+    sizes = [os.path.getsize(cache._path_for(key)) for key in ("aa1", "bb2")]
+    assert cache.total_size() == sum(sizes)
+
+    # A body removed behind the cache's back drops its entry on the next lookup
+    os.remove(cache._path_for("bb2"))
+    assert cache.get("bb2") is None
+    assert cache.total_size() == sizes[0]
+    cache.close()
+
+
+def test_eviction_keeps_cache_under_limit(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_size_bytes=5000, ttl=60)
+    for i in range(20):
+        cache.put(f"{i:02d}key", os.urandom(1000))
+
+    assert cache.total_size() <= 5000
+    assert cache.stats["evicted"] > 0
+    # The most recent entry survives, the oldest does not
+    assert cache.get("19key")["body"]
+    assert cache.get("00key") is None
+    cache.close()
+
+
+def test_existing_index_is_summed_once(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_size_bytes=10 ** 6, ttl=60)
+    cache.put("aa1", os.urandom(1500))
+    expected = cache.total_size()
+    cache.close()
+
+    # An index written before the meta row existed
+    index = sqlite3.connect(str(tmp_path / "index.db"))
+    index.execute("DROP TABLE meta")
+    index.commit()
+    index.close()
+
+    cache = ResponseCache(str(tmp_path), max_size_bytes=10 ** 6, ttl=60)
+    assert cache.total_size() == expected
+    cache.close()
+
+
+def test_caches_sharing_a_directory(tmp_path):
+    # Worker processes on one host open the same index
+    first = ResponseCache(str(tmp_path), max_size_bytes=10 ** 6, ttl=60)
+    second = ResponseCache(str(tmp_path), max_size_bytes=10 ** 6, ttl=60)
+    first.put("aa1", os.urandom(1000))
+    second.put("bb2", os.urandom(2000))
+
+    assert first._index.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert second.get("aa1") is not None
+    assert first.total_size() == second.total_size() == sum(
+        os.path.getsize(first._path_for(key)) for key in ("aa1", "bb2")
+    )
+    first.close()
+    second.close()